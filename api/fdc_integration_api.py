@@ -5,7 +5,7 @@ Endpoint conformi a RAILWAY_AI_INTEGRATION_SPECS.md
 """
 
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 import asyncio
 import time
 from fastapi import FastAPI, HTTPException, Depends, status, WebSocket, WebSocketDisconnect
@@ -145,7 +145,7 @@ class ConflictInput(BaseModel):
     conflict_type: str  # "platform_conflict", "timing_conflict", etc.
     location: str  # Station ID
     trains: List[TrainInfo]
-    severity: str = "medium"
+    severity: Literal["low", "medium", "high"] = "medium"  # valori di Severity
     time_overlap_seconds: Optional[int] = None
 
 
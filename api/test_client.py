@@ -5,56 +5,86 @@ Demonstrates how to interact with the API endpoints.
 """
 
 import requests
+import asyncio
 import json
-from typing import List, Dict
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional
+
+import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
 
 API_BASE_URL = "http://localhost:8000"
 
+# Reusable encoders instead of rebuilding one per json.dumps call
+_PRETTY = json.JSONEncoder(indent=2).encode
+_COMPACT = json.JSONEncoder(separators=(",", ":")).encode
+
+# -q: skip per-test banners and details, print one status line per test
+QUIET = "-q" in sys.argv
+
+
+def log(msg: str = ""):
+    """Print test details unless running in quiet mode"""
+    if not QUIET:
+        print(msg)
+
 
 def test_health_check():
     """Test health check endpoint"""
-    print("\n" + "="*70)
-    print("  Testing Health Check")
-    print("="*70)
+    log("\n" + "="*70)
+    log("  Testing Health Check")
+    log("="*70)
     
     response = requests.get(f"{API_BASE_URL}/api/v1/health")
-    print(f"Status Code: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    log(f"Status Code: {response.status_code}")
+    log(f"Response: {_PRETTY(response.json())}")
     
     return response.status_code == 200
 
 
 def test_model_info():
     """Test model info endpoint"""
-    print("\n" + "="*70)
-    print("  Testing Model Info")
-    print("="*70)
+    log("\n" + "="*70)
+    log("  Testing Model Info")
+    log("="*70)
     
     response = requests.get(f"{API_BASE_URL}/api/v1/model/info")
-    print(f"Status Code: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    log(f"Status Code: {response.status_code}")
+    log(f"Response: {_PRETTY(response.json())}")
     
     return response.status_code == 200
 
 
 def test_metrics():
     """Test metrics endpoint"""
-    print("\n" + "="*70)
-    print("  Testing Metrics")
-    print("="*70)
+    log("\n" + "="*70)
+    log("  Testing Metrics")
+    log("="*70)
     
     response = requests.get(f"{API_BASE_URL}/api/v1/metrics")
-    print(f"Status Code: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    log(f"Status Code: {response.status_code}")
+    log(f"Response: {_PRETTY(response.json())}")
     
     return response.status_code == 200
 
 
 def test_optimize_simple():
     """Test optimization with simple scenario"""
-    print("\n" + "="*70)
-    print("  Testing Simple Optimization")
-    print("="*70)
+    log("\n" + "="*70)
+    log("  Testing Simple Optimization")
+    log("="*70)
     
     # Simple scenario: 2 trains, potential conflict
     request_data = {
@@ -83,7 +113,7 @@ def test_optimize_simple():
         "max_iterations": 100
     }
     
-    print(f"\nSending {len(request_data['trains'])} trains for optimization...")
+    log(f"\nSending {len(request_data['trains'])} trains for optimization...")
     
     response = requests.post(
         f"{API_BASE_URL}/api/v1/optimize",
@@ -91,34 +121,34 @@ def test_optimize_simple():
         headers={"Content-Type": "application/json"}
     )
     
-    print(f"Status Code: {response.status_code}")
+    log(f"Status Code: {response.status_code}")
     
     if response.status_code == 200:
         result = response.json()
-        print(f"\nOptimization Result:")
-        print(f"  Success: {result['success']}")
-        print(f"  Inference Time: {result['inference_time_ms']:.2f} ms")
-        print(f"  Total Delay: {result['total_delay_minutes']:.2f} min")
-        print(f"  Conflicts Detected: {result['conflicts_detected']}")
-        print(f"  Conflicts Resolved: {result['conflicts_resolved']}")
-        print(f"  Resolutions: {len(result['resolutions'])}")
+        log(f"\nOptimization Result:")
+        log(f"  Success: {result['success']}")
+        log(f"  Inference Time: {result['inference_time_ms']:.2f} ms")
+        log(f"  Total Delay: {result['total_delay_minutes']:.2f} min")
+        log(f"  Conflicts Detected: {result['conflicts_detected']}")
+        log(f"  Conflicts Resolved: {result['conflicts_resolved']}")
+        log(f"  Resolutions: {len(result['resolutions'])}")
         
         for res in result['resolutions']:
-            print(f"\n    Train {res['train_id']}:")
-            print(f"      Time Adjustment: {res['time_adjustment_min']:.2f} min")
-            print(f"      Track Assignment: {res['track_assignment']}")
-            print(f"      Confidence: {res['confidence']:.2f}")
+            log(f"\n    Train {res['train_id']}:")
+            log(f"      Time Adjustment: {res['time_adjustment_min']:.2f} min")
+            log(f"      Track Assignment: {res['track_assignment']}")
+            log(f"      Confidence: {res['confidence']:.2f}")
     else:
-        print(f"Error: {response.text}")
+        log(f"Error: {response.text}")
     
     return response.status_code == 200
 
 
 def test_optimize_complex():
     """Test optimization with complex scenario"""
-    print("\n" + "="*70)
-    print("  Testing Complex Optimization")
-    print("="*70)
+    log("\n" + "="*70)
+    log("  Testing Complex Optimization")
+    log("="*70)
     
     # More complex scenario: multiple trains with delays
     trains = []
@@ -139,30 +169,85 @@ def test_optimize_complex():
         "max_iterations": 100
     }
     
-    print(f"\nSending {len(trains)} trains for optimization...")
+    log(f"\nSending {len(trains)} trains for optimization...")
     
     response = requests.post(
         f"{API_BASE_URL}/api/v1/optimize",
         json=request_data
     )
     
-    print(f"Status Code: {response.status_code}")
+    log(f"Status Code: {response.status_code}")
     
     if response.status_code == 200:
         result = response.json()
-        print(f"\nOptimization Result:")
-        print(f"  Success: {result['success']}")
-        print(f"  Inference Time: {result['inference_time_ms']:.2f} ms")
-        print(f"  Total Delay: {result['total_delay_minutes']:.2f} min")
-        print(f"  Resolutions: {len(result['resolutions'])}")
+        log(f"\nOptimization Result:")
+        log(f"  Success: {result['success']}")
+        log(f"  Inference Time: {result['inference_time_ms']:.2f} ms")
+        log(f"  Total Delay: {result['total_delay_minutes']:.2f} min")
+        log(f"  Resolutions: {len(result['resolutions'])}")
     else:
-        print(f"Error: {response.text}")
+        log(f"Error: {response.text}")
     
     return response.status_code == 200
 
 
-def benchmark_api(num_requests: int = 100):
-    """Benchmark API performance"""
+def _start_progress_printer():
+    """Start a background thread printing queued progress lines.
+    
+    Keeps stdout writes out of the timed benchmark loop: the loop only
+    enqueues messages. Put ``None`` on the queue to stop the printer.
+    """
+    messages = queue.SimpleQueue()
+    
+    def drain():
+        while (msg := messages.get()) is not None:
+            print(msg)
+    
+    printer = threading.Thread(target=drain, daemon=True)
+    printer.start()
+    return messages, printer
+
+
+def _make_session(pool_size: int) -> requests.Session:
+    """Create a keep-alive session whose pool fits `pool_size` threads.
+    
+    Transient 502/503/504 responses are retried with exponential backoff,
+    so a request only counts as failed once its retries are exhausted.
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.05,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False
+    )
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                          max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Content-Type"] = "application/json"
+    return session
+
+
+def _timed_post(session: requests.Session, url: str, payload: bytes):
+    """POST `payload` and return (elapsed ns, status code, retries used)."""
+    start = time.perf_counter_ns()
+    response = session.post(url, data=payload)
+    elapsed_ns = time.perf_counter_ns() - start
+    history = response.raw.retries.history if response.raw.retries else ()
+    return elapsed_ns, response.status_code, len(history)
+
+
+def benchmark_api(num_requests: int = 100, warmup: Optional[int] = None,
+                  max_workers: int = 16):
+    """Benchmark API performance
+    
+    The first `warmup` requests (default: max(5, num_requests // 20)) are
+    sent before timing starts, so connection setup and lazy server-side
+    initialization do not pollute the measured samples. Timed requests run
+    on a pool of `max_workers` threads sharing one keep-alive session.
+    """
     print("\n" + "="*70)
     print(f"  Benchmarking API ({num_requests} requests)")
     print("="*70)
@@ -182,42 +267,152 @@ def benchmark_api(num_requests: int = 100):
             for i in range(5)
         ]
     }
+    payload = _COMPACT(request_data).encode()
+    url = f"{API_BASE_URL}/api/v1/optimize"
+    session = _make_session(max_workers)
     
-    import time
+    if warmup is None:
+        warmup = max(5, num_requests // 20)
     
-    times = []
-    successes = 0
+    for _ in range(warmup):
+        session.post(url, data=payload)
+    print(f"\nWarmup: {warmup} discarded requests")
     
-    print(f"\nSending {num_requests} requests...")
+    times_ns = np.empty(num_requests, dtype=np.int64)
+    successes = 0
+    retries = 0
     
-    for i in range(num_requests):
-        start = time.time()
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/optimize",
-            json=request_data
-        )
-        end = time.time()
-        
-        if response.status_code == 200:
-            successes += 1
-            times.append((end - start) * 1000.0)
-        
-        if (i + 1) % 10 == 0:
-            print(f"  Progress: {i+1}/{num_requests}")
+    print(f"Sending {num_requests} requests ({max_workers} workers)...")
+    progress, printer = _start_progress_printer()
     
-    if times:
-        avg_time = sum(times) / len(times)
-        min_time = min(times)
-        max_time = max(times)
+    wall_start = time.perf_counter_ns()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_timed_post, session, url, payload)
+            for _ in range(num_requests)
+        ]
+        for i, future in enumerate(as_completed(futures)):
+            elapsed_ns, status_code, num_retries = future.result()
+            retries += num_retries
+            
+            if status_code == 200:
+                times_ns[successes] = elapsed_ns
+                successes += 1
+            
+            if (i + 1) % 10 == 0:
+                progress.put(f"  Progress: {i+1}/{num_requests}")
+    wall_ms = (time.perf_counter_ns() - wall_start) / 1e6
+    
+    progress.put(None)
+    printer.join()
+    session.close()
+    
+    if successes:
+        times = times_ns[:successes].astype(np.float64) / 1e6
+        avg_time = times.mean()
+        min_time = times.min()
+        max_time = times.max()
         
         print(f"\nBenchmark Results:")
         print(f"  Total Requests: {num_requests}")
         print(f"  Successful: {successes}")
         print(f"  Failed: {num_requests - successes}")
+        print(f"  Retries: {retries}")
         print(f"  Avg Response Time: {avg_time:.2f} ms")
         print(f"  Min Response Time: {min_time:.2f} ms")
         print(f"  Max Response Time: {max_time:.2f} ms")
-        print(f"  Throughput: {1000.0/avg_time:.1f} requests/sec")
+        print(f"  Wall Time: {wall_ms:.2f} ms")
+        print(f"  Throughput: {successes * 1000.0 / wall_ms:.1f} requests/sec")
+
+
+async def _fanout_optimize(payload: bytes, num_requests: int):
+    """Send `num_requests` concurrent optimize calls over one HTTP/2 connection.
+    
+    Falls back to a small HTTP/1.1 pool when `h2` is not installed or the
+    server does not negotiate HTTP/2 (e.g. plain uvicorn).
+    
+    Returns:
+        (http_version, list of per-request latencies in ns or None on error)
+    """
+    headers = {"Content-Type": "application/json"}
+    
+    async def timed_post(client):
+        start = time.perf_counter_ns()
+        response = await client.post("/api/v1/optimize", content=payload, headers=headers)
+        elapsed_ns = time.perf_counter_ns() - start
+        return elapsed_ns if response.status_code == 200 else None
+    
+    def make_client(http2: bool):
+        max_connections = 1 if http2 else 16
+        return httpx.AsyncClient(
+            base_url=API_BASE_URL,
+            http2=http2,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections)
+        )
+    
+    try:
+        probe_client = make_client(http2=True)
+    except ImportError:
+        probe_client = make_client(http2=False)
+    
+    async with probe_client:
+        http_version = (await probe_client.get("/api/v1/health")).http_version
+    
+    async with make_client(http2=http_version == "HTTP/2") as client:
+        results = await asyncio.gather(
+            *(timed_post(client) for _ in range(num_requests)),
+            return_exceptions=True
+        )
+    
+    return http_version, [r if isinstance(r, int) else None for r in results]
+
+
+def benchmark_api_concurrent(num_requests: int = 100):
+    """Benchmark API with concurrent requests multiplexed via httpx"""
+    print("\n" + "="*70)
+    print(f"  Concurrent Benchmark ({num_requests} requests)")
+    print("="*70)
+    
+    if not HAS_HTTPX:
+        print("\n  httpx not installed, skipping (pip install 'httpx[http2]')")
+        return
+    
+    payload = _COMPACT({
+        "trains": [
+            {
+                "id": i,
+                "position_km": float(i * 5),
+                "velocity_kmh": 120.0,
+                "current_track": i % 2,
+                "destination_station": (i + 2) % 3,
+                "delay_minutes": 0.0,
+                "priority": 5,
+                "is_delayed": False
+            }
+            for i in range(5)
+        ]
+    }).encode()
+    
+    wall_start = time.perf_counter_ns()
+    http_version, results = asyncio.run(_fanout_optimize(payload, num_requests))
+    wall_ms = (time.perf_counter_ns() - wall_start) / 1e6
+    
+    times_ns = np.array([r for r in results if r is not None], dtype=np.int64)
+    successes = len(times_ns)
+    
+    print(f"\nConcurrent Benchmark Results ({http_version}):")
+    print(f"  Total Requests: {num_requests}")
+    print(f"  Successful: {successes}")
+    print(f"  Failed: {num_requests - successes}")
+    
+    if successes:
+        times = times_ns.astype(np.float64) / 1e6
+        print(f"  Avg Response Time: {times.mean():.2f} ms")
+        print(f"  Max Response Time: {times.max():.2f} ms")
+        print(f"  Wall Time: {wall_ms:.2f} ms")
+        print(f"  Throughput: {successes * 1000.0 / wall_ms:.1f} requests/sec")
 
 
 def main():
@@ -237,21 +432,24 @@ def main():
         return
     
     # Run tests
-    tests = [
+    tests = OrderedDict([
         ("Health Check", test_health_check),
         ("Model Info", test_model_info),
         ("Metrics", test_metrics),
         ("Simple Optimization", test_optimize_simple),
         ("Complex Optimization", test_optimize_complex),
-    ]
+    ])
     
     results = {}
-    for name, test_func in tests:
+    for name, test_func in tests.items():
         try:
             results[name] = test_func()
         except Exception as e:
-            print(f"\n✗ Test failed: {e}")
+            log(f"\n✗ Test failed: {e}")
             results[name] = False
+        
+        if QUIET:
+            print(f"  {'✓ PASS' if results[name] else '✗ FAIL'}: {name}")
     
     # Benchmark (optional)
     try:
@@ -259,14 +457,20 @@ def main():
     except Exception as e:
         print(f"\n✗ Benchmark failed: {e}")
     
+    try:
+        benchmark_api_concurrent(num_requests=50)
+    except Exception as e:
+        print(f"\n✗ Concurrent benchmark failed: {e}")
+    
     # Summary
     print("\n" + "="*70)
     print("  Test Summary")
     print("="*70)
     
-    for name, passed in results.items():
-        status = "✓ PASS" if passed else "✗ FAIL"
-        print(f"  {status}: {name}")
+    if not QUIET:
+        for name, passed in results.items():
+            status = "✓ PASS" if passed else "✗ FAIL"
+            print(f"  {status}: {name}")
     
     passed = sum(1 for p in results.values() if p)
     total = len(results)
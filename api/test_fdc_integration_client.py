@@ -6,11 +6,97 @@ Dimostra l'uso dell'endpoint /api/v2/optimize.
 
 import requests
 import json
+import sys
 from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from pydantic import TypeAdapter, ValidationError
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from python.integration.fdc_integration import ModificationType
 
 
 API_BASE = "http://localhost:8002"
 
+# Encoder riutilizzato invece di ricostruirlo a ogni json.dumps
+_PRETTY = json.JSONEncoder(indent=2).encode
+
+
+# Stesso schema del corpo di /api/v2/validate (ValidationRequest.modifications),
+# compilato una sola volta all'import
+_MODIFICATIONS_ADAPTER = TypeAdapter(List[Dict[str, Any]])
+
+_REQUIRED_FIELDS = ["train_id", "modification_type", "section", "parameters", "impact"]
+_VALID_TYPES = [t.value for t in ModificationType]
+
+
+def validate_locally(modifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Valida le modifiche lato client, senza round-trip verso il server.
+    
+    Applica gli stessi controlli di /api/v2/validate: campi obbligatori
+    presenti e modification_type tra i valori di ModificationType, con gli
+    stessi messaggi di errore. Gli elementi che non sono dizionari (che il
+    server rifiuterebbe con 422) vengono segnalati senza sollevare eccezioni.
+    
+    Returns:
+        Lista di errori nello stesso formato di /api/v2/validate (vuota se valide)
+    """
+    try:
+        _MODIFICATIONS_ADAPTER.validate_python(modifications)
+    except ValidationError as e:
+        return [
+            {
+                "modification_index": err["loc"][0] if err["loc"] else None,
+                "train_id": "unknown",
+                "error": err["msg"]
+            }
+            for err in e.errors()
+        ]
+    
+    errors = []
+    for i, mod in enumerate(modifications):
+        # Valida campi obbligatori
+        missing = [f for f in _REQUIRED_FIELDS if f not in mod]
+        
+        if missing:
+            errors.append({
+                "modification_index": i,
+                "train_id": mod.get("train_id", "unknown"),
+                "error": f"Campi mancanti: {', '.join(missing)}"
+            })
+        
+        # Valida modification_type
+        mod_type = mod.get("modification_type")
+        if mod_type and mod_type not in _VALID_TYPES:
+            errors.append({
+                "modification_index": i,
+                "train_id": mod.get("train_id"),
+                "error": f"modification_type '{mod_type}' non valido. Validi: {_VALID_TYPES}"
+            })
+    return errors
+
+
+def post_validated(modifications: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Invia le modifiche a /api/v2/validate solo se superano la validazione locale.
+    
+    I payload strutturalmente non validi vengono rifiutati subito con la
+    stessa forma di risposta del server.
+    """
+    errors = validate_locally(modifications)
+    if errors:
+        return {"valid": False, "errors": errors, "source": "client"}
+    
+    response = requests.post(
+        f"{API_BASE}/api/v2/validate",
+        json={"modifications": modifications}
+    )
+    response.raise_for_status()
+    return response.json()
+
 
 def test_platform_conflict():
     """Test: Conflitto binario a MONZA."""
@@ -55,7 +141,7 @@ def test_platform_conflict():
     }
     
     print("\n📤 Request:")
-    print(json.dumps(request_data, indent=2))
+    print(_PRETTY(request_data))
     
     response = requests.post(f"{API_BASE}/api/v2/optimize", json=request_data)
     
@@ -63,7 +149,7 @@ def test_platform_conflict():
     
     if response.status_code == 200:
         data = response.json()
-        print(json.dumps(data, indent=2))
+        print(_PRETTY(data))
         
         # Verifica risultati
         print("\n✅ VERIFICHE:")
@@ -126,7 +212,7 @@ def test_timing_conflict():
     }
     
     print("\n📤 Request:")
-    print(json.dumps(request_data, indent=2))
+    print(_PRETTY(request_data))
     
     response = requests.post(f"{API_BASE}/api/v2/optimize", json=request_data)
     
@@ -134,7 +220,7 @@ def test_timing_conflict():
     
     if response.status_code == 200:
         data = response.json()
-        print(json.dumps(data, indent=2))
+        print(_PRETTY(data))
         
         print("\n✅ VERIFICHE:")
         print(f"   Success: {data['success']}")
@@ -169,7 +255,7 @@ def test_simple_endpoint():
     }
     
     print("\n📤 Request:")
-    print(json.dumps(request_data, indent=2))
+    print(_PRETTY(request_data))
     
     response = requests.post(f"{API_BASE}/api/v2/optimize/simple", json=request_data)
     
@@ -177,7 +263,7 @@ def test_simple_endpoint():
     
     if response.status_code == 200:
         data = response.json()
-        print(json.dumps(data, indent=2))
+        print(_PRETTY(data))
         
         print("\n✅ VERIFICHE:")
         print(f"   Success: {data['success']}")
@@ -196,7 +282,7 @@ def test_modification_types():
     
     if response.status_code == 200:
         data = response.json()
-        print(json.dumps(data, indent=2))
+        print(_PRETTY(data))
         
         print(f"\n✅ Trovati {len(data['modification_types'])} tipi supportati")
     else:
@@ -239,21 +325,21 @@ def test_validate():
     }
     
     print("\n📤 Request:")
-    print(json.dumps(request_data, indent=2))
+    print(_PRETTY(request_data))
+    
+    try:
+        data = post_validated(request_data["modifications"])
+    except requests.HTTPError as e:
+        print(f"❌ Error: {e.response.text}")
+        return
     
-    response = requests.post(f"{API_BASE}/api/v2/validate", json=request_data)
+    print(f"\n📥 Response:")
+    print(_PRETTY(data))
     
-    if response.status_code == 200:
-        data = response.json()
-        print(f"\n📥 Response:")
-        print(json.dumps(data, indent=2))
-        
-        if data['valid']:
-            print("\n✅ Tutte le modifiche sono valide")
-        else:
-            print(f"\n❌ Trovati {len(data['errors'])} errori di validazione")
+    if data['valid']:
+        print("\n✅ Tutte le modifiche sono valide")
     else:
-        print(f"❌ Error: {response.text}")
+        print(f"\n❌ Trovati {len(data['errors'])} errori di validazione")
 
 
 def main():
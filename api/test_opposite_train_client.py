@@ -5,23 +5,29 @@ Esempi di utilizzo dell'API JSON.
 """
 
 import requests
+import asyncio
 import json
+import functools
 from datetime import datetime, timedelta
 
+import numpy as np
+
 
 API_BASE_URL = "http://localhost:8001"
 
 
-def example_simple_line():
-    """
-    Esempio 1: Linea semplice con una sezione singolo binario 
-    e una stazione di incrocio centrale.
-    """
-    print("\n" + "="*70)
-    print("📝 ESEMPIO 1: Linea Semplice con Incrocio Centrale")
-    print("="*70)
-    
-    request_data = {
+def _post_optimize(request_data: dict) -> requests.Response:
+    """Invia una richiesta all'endpoint di ottimizzazione treni opposti."""
+    return requests.post(
+        f"{API_BASE_URL}/api/v1/optimize-opposite-trains",
+        json=request_data,
+        headers={"Content-Type": "application/json"}
+    )
+
+
+def _simple_line_request() -> dict:
+    """Richiesta dell'Esempio 1 (linea semplice con incrocio centrale)."""
+    return {
         "track_sections": [
             # Stazione A (partenza)
             {
@@ -99,6 +105,13 @@ def example_simple_line():
         "time_window_end": "2025-11-19T10:00:00",
         "frequency_minutes": 30  # Ogni 30 minuti
     }
+
+
+def _report_simple_line(request_data: dict, response: requests.Response):
+    """Stampa richiesta e risultato dell'Esempio 1."""
+    print("\n" + "="*70)
+    print("📝 ESEMPIO 1: Linea Semplice con Incrocio Centrale")
+    print("="*70)
     
     print("\n📤 Invio richiesta all'API...")
     print(f"   Linea: {request_data['track_sections'][0]['station_name']} → "
@@ -106,12 +119,6 @@ def example_simple_line():
     print(f"   Lunghezza totale: 40 km")
     print(f"   Sezioni singolo binario: 2 (totale 32 km)")
     
-    response = requests.post(
-        f"{API_BASE_URL}/api/v1/optimize-opposite-trains",
-        json=request_data,
-        headers={"Content-Type": "application/json"}
-    )
-    
     if response.status_code == 200:
         result = response.json()
         print(f"\n✅ Risposta ricevuta (computation time: {result['computation_time_ms']:.2f} ms)")
@@ -139,61 +146,80 @@ def example_simple_line():
         print(response.text)
 
 
-def example_complex_network():
+def example_simple_line():
     """
-    Esempio 2: Rete complessa con multiple sezioni singolo binario
-    e varie stazioni di incrocio.
+    Esempio 1: Linea semplice con una sezione singolo binario 
+    e una stazione di incrocio centrale.
     """
-    print("\n" + "="*70)
-    print("📝 ESEMPIO 2: Rete Complessa Multi-Sezione")
-    print("="*70)
+    request_data = _simple_line_request()
+    _report_simple_line(request_data, _post_optimize(request_data))
+
+
+@functools.lru_cache(maxsize=None)
+def _complex_network_sections(num_blocks: int = 4):
+    """
+    Genera le sezioni della rete complessa (calcolate una sola volta).
     
-    # Definisci rete più complessa
-    sections = []
-    km = 0.0
+    Pattern per blocco: doppio 5km, singolo 15km, doppio 5km (stazione),
+    ripetuto `num_blocks` volte senza la stazione finale dopo l'ultimo.
     
-    # Pattern: doppio 5km, singolo 15km, doppio 5km (stazione), ripeti
-    for i in range(4):
-        # Doppio binario iniziale
-        sections.append({
-            "section_id": len(sections) + 1,
-            "start_km": km,
-            "end_km": km + 5.0,
-            "num_tracks": 2,
-            "max_speed_kmh": 100.0,
-            "has_station": i == 0 or i == 3,
-            "station_name": f"Stazione {chr(65+i)}" if i == 0 or i == 3 else None,
-            "can_cross": True
-        })
-        km += 5.0
-        
-        # Singolo binario
-        sections.append({
-            "section_id": len(sections) + 1,
-            "start_km": km,
-            "end_km": km + 15.0,
-            "num_tracks": 1,
-            "max_speed_kmh": 120.0,
-            "has_station": False,
-            "can_cross": False
-        })
-        km += 15.0
-        
-        # Doppio binario con stazione
-        if i < 3:  # Non dopo l'ultima
-            sections.append({
-                "section_id": len(sections) + 1,
-                "start_km": km,
-                "end_km": km + 5.0,
+    Returns:
+        Tupla di dict sezione (da copiare prima di modificarli)
+    """
+    # 0 = doppio binario iniziale, 1 = singolo binario, 2 = doppio con stazione
+    kinds = np.tile(np.arange(3), num_blocks)[:-1]
+    blocks = np.repeat(np.arange(num_blocks), 3)[:-1]
+    lengths = np.array([5.0, 15.0, 5.0])[kinds]
+    end_km = np.cumsum(lengths)
+    start_km = end_km - lengths
+    
+    def section(section_id, kind, block, start, end):
+        if kind == 0:
+            is_terminal = block == 0 or block == num_blocks - 1
+            return {
+                "section_id": section_id,
+                "start_km": start,
+                "end_km": end,
                 "num_tracks": 2,
-                "max_speed_kmh": 80.0,
-                "has_station": True,
-                "station_name": f"Stazione {chr(66+i)}",
+                "max_speed_kmh": 100.0,
+                "has_station": is_terminal,
+                "station_name": f"Stazione {chr(65+block)}" if is_terminal else None,
                 "can_cross": True
-            })
-            km += 5.0
+            }
+        if kind == 1:
+            return {
+                "section_id": section_id,
+                "start_km": start,
+                "end_km": end,
+                "num_tracks": 1,
+                "max_speed_kmh": 120.0,
+                "has_station": False,
+                "can_cross": False
+            }
+        return {
+            "section_id": section_id,
+            "start_km": start,
+            "end_km": end,
+            "num_tracks": 2,
+            "max_speed_kmh": 80.0,
+            "has_station": True,
+            "station_name": f"Stazione {chr(66+block)}",
+            "can_cross": True
+        }
     
-    request_data = {
+    return tuple(
+        section(i + 1, int(k), int(b), float(s), float(e))
+        for i, (k, b, s, e) in enumerate(zip(kinds, blocks, start_km, end_km))
+    )
+
+
+def _complex_network_request() -> dict:
+    """Richiesta dell'Esempio 2 (rete complessa multi-sezione)."""
+    # Definisci rete più complessa
+    sections = [dict(s) for s in _complex_network_sections()]
+    km = sections[-1]["end_km"]
+    
+    return {
         "track_sections": sections,
         "train1": {
             "train_id": "IC 101",
@@ -226,6 +252,16 @@ def example_complex_network():
             }
         ]
     }
+
+
+def _report_complex_network(request_data: dict, response: requests.Response):
+    """Stampa richiesta e risultato dell'Esempio 2."""
+    print("\n" + "="*70)
+    print("📝 ESEMPIO 2: Rete Complessa Multi-Sezione")
+    print("="*70)
+    
+    sections = request_data["track_sections"]
+    km = request_data["train1"]["end_km"]
     
     print(f"\n📤 Invio richiesta rete complessa...")
     print(f"   Lunghezza totale: {km:.0f} km")
@@ -234,12 +270,6 @@ def example_complex_network():
     print(f"   Stazioni incrocio: {sum(1 for s in sections if s.get('can_cross', False))}")
     print(f"   Traffico esistente: {len(request_data['existing_traffic'])} treni")
     
-    response = requests.post(
-        f"{API_BASE_URL}/api/v1/optimize-opposite-trains",
-        json=request_data,
-        headers={"Content-Type": "application/json"}
-    )
-    
     if response.status_code == 200:
         result = response.json()
         print(f"\n✅ Risposta ricevuta (computation time: {result['computation_time_ms']:.2f} ms)")
@@ -258,6 +288,36 @@ def example_complex_network():
         print(response.text)
 
 
+def example_complex_network():
+    """
+    Esempio 2: Rete complessa con multiple sezioni singolo binario
+    e varie stazioni di incrocio.
+    """
+    request_data = _complex_network_request()
+    _report_complex_network(request_data, _post_optimize(request_data))
+
+
+async def run_examples_concurrently():
+    """
+    Esegue gli esempi con le richieste in volo contemporaneamente.
+    
+    I risultati vengono stampati nell'ordine di completamento, così il
+    tempo totale è circa quello dell'esempio più lento.
+    """
+    async def run(build, report):
+        request_data = build()
+        response = await asyncio.to_thread(_post_optimize, request_data)
+        return report, request_data, response
+    
+    examples = [
+        run(_simple_line_request, _report_simple_line),
+        run(_complex_network_request, _report_complex_network),
+    ]
+    for completed in asyncio.as_completed(examples):
+        report, request_data, response = await completed
+        report(request_data, response)
+
+
 def health_check():
     """Verifica che API sia attiva."""
     try:
@@ -285,8 +345,7 @@ def main():
     
     # Esegui esempi
     try:
-        example_simple_line()
-        example_complex_network()
+        asyncio.run(run_examples_concurrently())
         
         print("\n" + "="*70)
         print("✅ TEST COMPLETATI CON SUCCESSO")
@@ -68,6 +68,12 @@ public:
      */
     void add_train(const Train& train);
     
+    /**
+     * Aggiunge più treni in una sola chiamata (un solo lock e,
+     * da Python, un solo attraversamento del binding).
+     */
+    void add_trains(const std::vector<Train>& trains);
+    
     /**
      * Rimuove un treno dal sistema.
      */
@@ -6,14 +6,65 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include <pybind11/chrono.h>
+#include <pybind11/numpy.h>
 #include "railway_scheduler.h"
 
 namespace py = pybind11;
 using namespace railway;
 
+namespace {
+
+// Record POD per il caricamento massivo dei treni da array strutturati NumPy
+// (Train non è POD: contiene planned_route e last_update)
+struct TrainRecord {
+    int32_t id;
+    int32_t current_track;
+    double position_km;
+    double velocity_kmh;
+    double scheduled_arrival_minutes;
+    int32_t destination_station;
+    int32_t priority;
+    bool is_delayed;
+    double delay_minutes;
+};
+
+void add_train_records(
+    RailwayScheduler& scheduler,
+    py::array_t<TrainRecord, py::array::c_style | py::array::forcecast> records) {
+    auto r = records.unchecked<1>();
+    std::vector<Train> trains;
+    trains.reserve(static_cast<size_t>(r.shape(0)));
+    
+    for (py::ssize_t i = 0; i < r.shape(0); ++i) {
+        const TrainRecord& rec = r(i);
+        Train train;
+        train.id = rec.id;
+        train.current_track = rec.current_track;
+        train.position_km = rec.position_km;
+        train.velocity_kmh = rec.velocity_kmh;
+        train.scheduled_arrival_minutes = rec.scheduled_arrival_minutes;
+        train.destination_station = rec.destination_station;
+        train.priority = rec.priority;
+        train.is_delayed = rec.is_delayed;
+        train.delay_minutes = rec.delay_minutes;
+        trains.push_back(std::move(train));
+    }
+    
+    scheduler.add_trains(trains);
+}
+
+}  // namespace
+
+
 PYBIND11_MODULE(railway_cpp, m) {
     m.doc() = "Railway AI Scheduler - C++ Bindings";
     
+    // dtype NumPy dei record accettati da RailwayScheduler.add_trains
+    PYBIND11_NUMPY_DTYPE(TrainRecord, id, current_track, position_km, velocity_kmh,
+                         scheduled_arrival_minutes, destination_station, priority,
+                         is_delayed, delay_minutes);
+    m.attr("TRAIN_DTYPE") = py::dtype::of<TrainRecord>();
+    
     // ========================================================================
     // Structures
     // ========================================================================
@@ -127,6 +178,9 @@ PYBIND11_MODULE(railway_cpp, m) {
         
         .def("initialize_network", &RailwayScheduler::initialize_network)
         .def("add_train", &RailwayScheduler::add_train)
+        .def("add_trains", &RailwayScheduler::add_trains)
+        .def("add_trains", &add_train_records, py::arg("records"),
+             "Aggiunge treni da un array strutturato NumPy con dtype TRAIN_DTYPE")
         .def("remove_train", &RailwayScheduler::remove_train)
         .def("update_train_state", &RailwayScheduler::update_train_state)
         .def("step", &RailwayScheduler::step)
@@ -61,6 +61,15 @@ void RailwayScheduler::add_train(const Train& train) {
               std::to_string(train.current_track));
 }
 
+void RailwayScheduler::add_trains(const std::vector<Train>& trains) {
+    std::lock_guard<std::recursive_mutex> lock(mutex_);
+    trains_.reserve(trains_.size() + trains.size());
+    
+    for (const auto& train : trains) {
+        add_train(train);
+    }
+}
+
 void RailwayScheduler::remove_train(int train_id) {
     std::lock_guard<std::recursive_mutex> lock(mutex_);
     if (trains_.count(train_id)) {
@@ -3,156 +3,303 @@
 Diagnostic script to analyze the railway network scenario and identify the problem.
 """
 
+import functools
 import json
+import os
+import pickle
 import sys
+from collections import defaultdict
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Pass-through decorator used when numba is not installed."""
+        def decorator(func):
+            return func
+        return decorator
+
+# Read buffer size for scenario files (1 MiB)
+READ_BUFFER_SIZE = 1 << 20
+
+
+def load_scenario(scenario_file):
+    """
+    Load a scenario JSON file, reading it in one buffered pass.
+    
+    The parsed data is pickled to a `<scenario>.cache.pkl` sidecar and reused
+    on later runs as long as it is not older than the JSON file.
+    """
+    cache_file = f"{scenario_file}.cache.pkl"
+    try:
+        if os.path.getmtime(cache_file) >= os.path.getmtime(scenario_file):
+            with open(cache_file, 'rb') as f:
+                return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    
+    with open(scenario_file, 'rb', buffering=READ_BUFFER_SIZE) as f:
+        raw = f.read()
+    data = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+    
+    try:
+        with open(cache_file, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # Read-only location: just skip the cache
+    return data
+
+
+@dataclass(slots=True)
+class Train:
+    """Train record parsed once from the scenario JSON."""
+    id: int
+    current_track: int
+    position_km: float
+    velocity_kmh: float
+    destination_station: int
+    priority: int
+    is_delayed: bool
+    delay_minutes: float
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Train from a scenario dict, ignoring any extra keys."""
+        return cls(**{name: data[name] for name in _TRAIN_FIELDS})
+
+
+_TRAIN_FIELDS = tuple(f.name for f in fields(Train))
+
+
+@njit(cache=True)
+def _analyze_numeric(positions, velocities, track_lengths, pairs):
+    """
+    Numeric core of the diagnosis.
+    
+    Args:
+        positions, velocities: per-train arrays
+        track_lengths: per-train length of the current track (NaN if unknown)
+        pairs: (P, 2) train indices sharing a single-track section
+    
+    Returns:
+        (head_on mask [P], meeting time in minutes [P] (NaN if not moving),
+         position status [N]: 0 valid, 1 negative, 2 beyond track end, -1 unknown track)
+    """
+    num_pairs = pairs.shape[0]
+    head_on = np.zeros(num_pairs, dtype=np.bool_)
+    meeting_minutes = np.full(num_pairs, np.nan)
+    
+    for k in range(num_pairs):
+        i, j = pairs[k, 0], pairs[k, 1]
+        v1, v2 = velocities[i], velocities[j]
+        # Opposite, non-zero directions: the relative speed is then always positive
+        if v1 * v2 < 0:
+            head_on[k] = True
+            distance = abs(positions[i] - positions[j])
+            relative_speed = abs(v1) + abs(v2)
+            meeting_minutes[k] = distance / relative_speed * 60
+    
+    position_status = np.zeros(positions.shape[0], dtype=np.int8)
+    for i in range(positions.shape[0]):
+        if np.isnan(track_lengths[i]):
+            position_status[i] = -1
+        elif positions[i] < 0:
+            position_status[i] = 1
+        elif positions[i] > track_lengths[i]:
+            position_status[i] = 2
+    
+    return head_on, meeting_minutes, position_status
+
 
 def analyze_scenario(scenario_file):
     """Analyze the railway scenario to identify issues."""
     
-    with open(scenario_file, 'r') as f:
-        data = json.load(f)
+    data = load_scenario(scenario_file)
     
-    print("=" * 80)
-    print("RAILWAY AI SOLVER DIAGNOSTIC ANALYSIS")
-    print("=" * 80)
-    print()
+    # Collect the report and write it out once at the end
+    out = []
+    emit = out.append
+    
+    emit("=" * 80)
+    emit("RAILWAY AI SOLVER DIAGNOSTIC ANALYSIS")
+    emit("=" * 80)
+    emit("")
     
     # Analyze trains
-    print("TRAIN ANALYSIS")
-    print("-" * 80)
-    trains = data['trains']
+    emit("TRAIN ANALYSIS")
+    emit("-" * 80)
+    trains = [Train.from_dict(t) for t in data['trains']]
+    
+    # Nothing to analyze: skip building the network lookups entirely
+    if not trains:
+        emit("No trains in scenario - nothing to analyze")
+        emit("")
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
+        return False
+    
     for train in trains:
-        print(f"Train {train['id']}:")
-        print(f"  Current Track: {train['current_track']}")
-        print(f"  Position: {train['position_km']} km")
-        print(f"  Velocity: {train['velocity_kmh']} km/h")
-        print(f"  Destination Station: {train['destination_station']}")
-        print(f"  Priority: {train['priority']}")
-        print(f"  Delayed: {train['is_delayed']} ({train['delay_minutes']} min)")
-        print()
+        emit(f"Train {train.id}:")
+        emit(f"  Current Track: {train.current_track}")
+        emit(f"  Position: {train.position_km} km")
+        emit(f"  Velocity: {train.velocity_kmh} km/h")
+        emit(f"  Destination Station: {train.destination_station}")
+        emit(f"  Priority: {train.priority}")
+        emit(f"  Delayed: {train.is_delayed} ({train.delay_minutes} min)")
+        emit("")
     
     # Analyze tracks
-    print("\nTRACK ANALYSIS")
-    print("-" * 80)
+    emit("\nTRACK ANALYSIS")
+    emit("-" * 80)
+    
+    # Resolve each train's current track once
     track_dict = {t['id']: t for t in data['tracks']}
+    resolved = [(train, track_dict.get(train.current_track)) for train in trains]
     
     # Check tracks where trains are located
-    for train in trains:
-        track_id = train['current_track']
-        if track_id in track_dict:
-            track = track_dict[track_id]
-            print(f"Track {track_id} (Train {train['id']} is here):")
-            print(f"  Length: {track['length_km']} km")
-            print(f"  Single Track: {track['is_single_track']}")
-            print(f"  Capacity: {track['capacity']}")
-            print(f"  Connects Stations: {track['station_ids']}")
-            print()
+    for train, track in resolved:
+        if track is not None:
+            emit(f"Track {train.current_track} (Train {train.id} is here):")
+            emit(f"  Length: {track['length_km']} km")
+            emit(f"  Single Track: {track['is_single_track']}")
+            emit(f"  Capacity: {track['capacity']}")
+            emit(f"  Connects Stations: {track['station_ids']}")
+            emit("")
     
     # CRITICAL ISSUE DETECTION
-    print("\nCRITICAL ISSUE DETECTION")
-    print("-" * 80)
+    emit("\nCRITICAL ISSUE DETECTION")
+    emit("-" * 80)
     
     # Issue 1: Check if trains are on the same track
-    train_tracks = {}
-    for train in trains:
-        track_id = train['current_track']
-        if track_id not in train_tracks:
-            train_tracks[track_id] = []
-        train_tracks[track_id].append(train)
-    
-    conflicts_found = False
-    for track_id, track_trains in train_tracks.items():
-        if len(track_trains) > 1:
-            print(f"⚠️  CONFLICT: Multiple trains on track {track_id}")
-            track = track_dict[track_id]
-            print(f"   Track is {'SINGLE' if track['is_single_track'] else 'DOUBLE'}, Capacity: {track['capacity']}")
-            for train in track_trains:
-                print(f"   - Train {train['id']}: pos={train['position_km']}km, vel={train['velocity_kmh']}km/h")
-            
-            # Check for head-on collision
-            if track['is_single_track'] and len(track_trains) == 2:
-                t1, t2 = track_trains[0], track_trains[1]
-                if (t1['velocity_kmh'] > 0 and t2['velocity_kmh'] < 0) or \
-                   (t1['velocity_kmh'] < 0 and t2['velocity_kmh'] > 0):
-                    print(f"   🚨 HEAD-ON COLLISION RISK: Trains moving in opposite directions!")
-                    
-                    # Calculate meeting time
-                    distance = abs(t1['position_km'] - t2['position_km'])
-                    relative_speed = abs(t1['velocity_kmh']) + abs(t2['velocity_kmh'])
-                    if relative_speed > 0:
-                        meeting_time_hours = distance / relative_speed
-                        meeting_time_minutes = meeting_time_hours * 60
-                        print(f"   ⏱️  Estimated collision in {meeting_time_minutes:.2f} minutes")
-            conflicts_found = True
-            print()
+    train_tracks = defaultdict(list)
+    for index, train in enumerate(trains):
+        train_tracks[train.current_track].append(index)
+    shared_tracks = {
+        track_id: track_trains
+        for track_id, track_trains in train_tracks.items()
+        if len(track_trains) > 1
+    }
+    
+    # Pairs of trains alone together on a single-track section
+    pair_tracks = [
+        track_id for track_id, track_trains in shared_tracks.items()
+        if track_dict[track_id]['is_single_track'] and len(track_trains) == 2
+    ]
+    pairs = np.array([shared_tracks[t] for t in pair_tracks], dtype=np.int64).reshape(-1, 2)
+    
+    # Numeric views of the trains for the analysis kernel
+    positions = np.array([t.position_km for t in trains], dtype=np.float64)
+    velocities = np.array([t.velocity_kmh for t in trains], dtype=np.float64)
+    track_lengths = np.array(
+        [track['length_km'] if track else np.nan for _, track in resolved],
+        dtype=np.float64
+    )
+    head_on, meeting_minutes, position_status = _analyze_numeric(
+        positions, velocities, track_lengths, pairs
+    )
+    pair_results = dict(zip(pair_tracks, zip(head_on, meeting_minutes)))
+    
+    conflicts_found = bool(shared_tracks)
+    for track_id, track_trains in shared_tracks.items():
+        emit(f"⚠️  CONFLICT: Multiple trains on track {track_id}")
+        track = track_dict[track_id]
+        emit(f"   Track is {'SINGLE' if track['is_single_track'] else 'DOUBLE'}, Capacity: {track['capacity']}")
+        for index in track_trains:
+            train = trains[index]
+            emit(f"   - Train {train.id}: pos={train.position_km}km, vel={train.velocity_kmh}km/h")
+        
+        # Check for head-on collision
+        if track_id in pair_results:
+            is_head_on, meeting_time_minutes = pair_results[track_id]
+            if is_head_on:
+                emit(f"   🚨 HEAD-ON COLLISION RISK: Trains moving in opposite directions!")
+                if not np.isnan(meeting_time_minutes):
+                    emit(f"   ⏱️  Estimated collision in {meeting_time_minutes:.2f} minutes")
+        emit("")
     
     # Issue 2: Check destination reachability
-    print("\nDESTINATION REACHABILITY ANALYSIS")
-    print("-" * 80)
+    emit("\nDESTINATION REACHABILITY ANALYSIS")
+    emit("-" * 80)
     
     station_dict = {s['id']: s for s in data['stations']}
     
-    for train in trains:
-        dest_station = train['destination_station']
-        current_track = train['current_track']
+    # Trains often share destinations: look each station name up once
+    @functools.lru_cache(maxsize=None)
+    def get_name(station_id):
+        station = station_dict.get(station_id)
+        return station['name'] if station is not None else None
+    
+    for train, track in resolved:
+        dest_station = train.destination_station
+        current_track = train.current_track
+        dest_name = get_name(dest_station)
         
-        if dest_station not in station_dict:
-            print(f"❌ Train {train['id']}: Destination station {dest_station} does not exist!")
+        if dest_name is None:
+            emit(f"❌ Train {train.id}: Destination station {dest_station} does not exist!")
             continue
         
-        if current_track not in track_dict:
-            print(f"❌ Train {train['id']}: Current track {current_track} does not exist!")
+        if track is None:
+            emit(f"❌ Train {train.id}: Current track {current_track} does not exist!")
             continue
         
-        track = track_dict[current_track]
-        dest_name = station_dict[dest_station]['name']
-        
-        print(f"Train {train['id']} → Destination: {dest_name} (Station {dest_station})")
-        print(f"  Current track {current_track} connects: {track['station_ids']}")
+        emit(f"Train {train.id} → Destination: {dest_name} (Station {dest_station})")
+        emit(f"  Current track {current_track} connects: {track['station_ids']}")
         
         if dest_station in track['station_ids']:
-            print(f"  ✅ Destination is on current track")
+            emit(f"  ✅ Destination is on current track")
         else:
-            print(f"  ⚠️  Destination NOT on current track - needs route planning")
-        print()
+            emit(f"  ⚠️  Destination NOT on current track - needs route planning")
+        emit("")
     
     # Issue 3: Check for impossible states
-    print("\nSTATE VALIDATION")
-    print("-" * 80)
+    emit("\nSTATE VALIDATION")
+    emit("-" * 80)
     
-    for train in trains:
-        track = track_dict.get(train['current_track'])
-        if track:
-            if train['position_km'] < 0:
-                print(f"❌ Train {train['id']}: Negative position ({train['position_km']} km)")
-            elif train['position_km'] > track['length_km']:
-                print(f"❌ Train {train['id']}: Position ({train['position_km']} km) exceeds track length ({track['length_km']} km)")
-            else:
-                print(f"✅ Train {train['id']}: Position is valid")
-    
-    print()
-    print("=" * 80)
-    print("DIAGNOSIS SUMMARY")
-    print("=" * 80)
+    for (train, track), status in zip(resolved, position_status):
+        if status == 1:
+            emit(f"❌ Train {train.id}: Negative position ({train.position_km} km)")
+        elif status == 2:
+            emit(f"❌ Train {train.id}: Position ({train.position_km} km) exceeds track length ({track['length_km']} km)")
+        elif status == 0:
+            emit(f"✅ Train {train.id}: Position is valid")
+    
+    emit("")
+    emit("=" * 80)
+    emit("DIAGNOSIS SUMMARY")
+    emit("=" * 80)
     
     if not conflicts_found:
-        print("✅ No immediate conflicts detected")
-        print()
-        print("POSSIBLE REASONS WHY AI IS NOT SOLVING:")
-        print("1. The scenario may be too simple (only 2 trains, no actual conflict)")
-        print("2. The ML model may not be loaded properly")
-        print("3. The conflict detection logic may have bugs")
-        print("4. The trains may not actually be in conflict on their current paths")
+        emit("✅ No immediate conflicts detected")
+        emit("")
+        emit("POSSIBLE REASONS WHY AI IS NOT SOLVING:")
+        emit("1. The scenario may be too simple (only 2 trains, no actual conflict)")
+        emit("2. The ML model may not be loaded properly")
+        emit("3. The conflict detection logic may have bugs")
+        emit("4. The trains may not actually be in conflict on their current paths")
     else:
-        print("⚠️  Conflicts detected - AI should be resolving these!")
-        print()
-        print("POSSIBLE REASONS WHY AI IS NOT SOLVING:")
-        print("1. ML model not loaded - check MODEL_PATH environment variable")
-        print("2. Conflict detection logic not triggering properly")
-        print("3. Resolution logic not finding alternative tracks")
-        print("4. API request format mismatch")
-    
-    print()
+        emit("⚠️  Conflicts detected - AI should be resolving these!")
+        emit("")
+        emit("POSSIBLE REASONS WHY AI IS NOT SOLVING:")
+        emit("1. ML model not loaded - check MODEL_PATH environment variable")
+        emit("2. Conflict detection logic not triggering properly")
+        emit("3. Resolution logic not finding alternative tracks")
+        emit("4. API request format mismatch")
+    
+    emit("")
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
     return conflicts_found
 
 if __name__ == "__main__":
@@ -0,0 +1,11 @@
+"""
+Percorsi condivisi dagli script di esempio.
+
+Calcolati una sola volta per processo, qualunque sia il numero di esempi
+importati.
+"""
+
+from pathlib import Path
+
+# Directory dei moduli Python del progetto (data, models, training, ...)
+PYTHON_DIR = str(Path(__file__).resolve().parent.parent / 'python')
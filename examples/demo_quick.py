@@ -4,8 +4,9 @@ Mostra generazione dati, rilevamento conflitti e risoluzione.
 """
 
 import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'python'))
+from _bootstrap import PYTHON_DIR
+if PYTHON_DIR not in sys.path:
+    sys.path.insert(0, PYTHON_DIR)
 
 import numpy as np
 from data.data_generator import RailwayNetworkGenerator
@@ -32,20 +33,29 @@ def main():
         single_track_ratio=0.4
     )
     
-    print(f"✓ Rete generata:")
-    print(f"  • Stazioni: {len(generator.stations)}")
-    print(f"  • Binari totali: {len(generator.tracks)}")
+    # Rete congelata: stazioni e binari non cambiano per il resto della demo
+    stations = tuple(generator.stations)
+    tracks = tuple(generator.tracks)
+    n_stations = len(stations)
+    n_tracks = len(tracks)
+    
+    single_track_mask = np.fromiter((t.is_single_track for t in tracks),
+                                    dtype=bool, count=n_tracks)
+    n_single = int(single_track_mask.sum())
+    single_ratio = n_single / n_tracks * 100
     
-    single_tracks = [t for t in generator.tracks if t.is_single_track]
-    print(f"  • Binari singoli: {len(single_tracks)} ({len(single_tracks)/len(generator.tracks)*100:.0f}%)")
+    print(f"✓ Rete generata:")
+    print(f"  • Stazioni: {n_stations}")
+    print(f"  • Binari totali: {n_tracks}")
+    print(f"  • Binari singoli: {n_single} ({single_ratio:.0f}%)")
     
     print("\n📍 Stazioni principali:")
-    for station in generator.stations[:3]:
+    for station in stations[:3]:
         print(f"  - {station.name}: {station.num_platforms} binari, " +
               f"{len(station.connected_tracks)} collegamenti")
     
     print("\n🛤️  Binari esempio:")
-    for track in generator.tracks[:3]:
+    for track in tracks[:3]:
         track_type = "SINGOLO" if track.is_single_track else "DOPPIO"
         print(f"  - Binario {track.id}: {track.length_km:.1f}km ({track_type})")
     
@@ -63,13 +73,23 @@ def main():
     trains = scenario['trains']
     conflicts = scenario['conflicts']
     
+    # Layout SoA: attributi dei treni come array (indice = id treno)
+    positions = np.fromiter((t.position_km for t in trains), dtype=np.float64, count=len(trains))
+    priorities = np.fromiter((t.priority for t in trains), dtype=np.int32, count=len(trains))
+    current_tracks = np.fromiter((t.current_track for t in trains), dtype=np.int32, count=len(trains))
+    is_delayed = np.fromiter((t.is_delayed for t in trains), dtype=bool, count=len(trains))
+    
+    # Coppie in conflitto dalla matrice simmetrica (triangolo superiore)
+    conflict_matrix = scenario['conflict_matrix']
+    conflict_pairs = np.argwhere(np.triu(conflict_matrix, k=1))
+    
     print(f"✓ Scenario generato:")
     print(f"  • Treni attivi: {len(trains)}")
     print(f"  • Conflitti rilevati: {len(conflicts)}")
     
     # Statistiche treni
-    delayed = sum(1 for t in trains if t.is_delayed)
-    avg_priority = sum(t.priority for t in trains) / len(trains)
+    delayed = int(is_delayed.sum())
+    avg_priority = priorities.mean()
     
     print(f"\n📊 Statistiche treni:")
     print(f"  • In ritardo: {delayed}/{len(trains)} ({delayed/len(trains)*100:.0f}%)")
@@ -94,21 +114,21 @@ def main():
     else:
         print(f"⚠️  Rilevati {len(conflicts)} conflitti:\n")
         
-        for i, (t1_id, t2_id) in enumerate(conflicts[:5], 1):
-            train1 = trains[t1_id]
-            train2 = trains[t2_id]
-            
+        distances = np.abs(positions[conflict_pairs[:, 0]] - positions[conflict_pairs[:, 1]])
+        conflict_tracks = current_tracks[conflict_pairs[:, 0]]
+        is_critical = single_track_mask[conflict_tracks]
+        
+        for i, ((t1_id, t2_id), distance, track_id, critical) in enumerate(
+                zip(conflict_pairs[:5].tolist(), distances, conflict_tracks, is_critical), 1):
             print(f"  Conflitto #{i}:")
-            print(f"    • Treno {t1_id} (priorità {train1.priority}) ↔ " +
-                  f"Treno {t2_id} (priorità {train2.priority})")
-            print(f"    • Entrambi su binario {train1.current_track}")
+            print(f"    • Treno {t1_id} (priorità {priorities[t1_id]}) ↔ " +
+                  f"Treno {t2_id} (priorità {priorities[t2_id]})")
+            print(f"    • Entrambi su binario {track_id}")
             
-            distance = abs(train1.position_km - train2.position_km)
             print(f"    • Distanza: {distance:.1f}km")
             
             # Determina tipo conflitto
-            track = generator.tracks[train1.current_track]
-            if track.is_single_track:
+            if critical:
                 print(f"    • ⚠️  CRITICO: Binario singolo!")
             else:
                 print(f"    • Binario doppio (gestibile)")
@@ -125,27 +145,24 @@ def main():
         
         resolutions = []
         
-        for t1_id, t2_id in conflicts[:5]:
-            train1 = trains[t1_id]
-            train2 = trains[t2_id]
-            
-            if train1.priority < train2.priority:
-                delayed_train = train1
-                priority_train = train2
-            else:
-                delayed_train = train2
-                priority_train = train1
-            
-            delay_minutes = 10  # Ritardo fisso per demo
-            
+        # Il treno a priorità minore cede (a parità cede il secondo)
+        c0, c1 = conflict_pairs[:5, 0], conflict_pairs[:5, 1]
+        first_yields = priorities[c0] < priorities[c1]
+        delayed_ids = np.where(first_yields, c0, c1)
+        priority_ids = np.where(first_yields, c1, c0)
+        
+        delay_minutes = 10  # Ritardo fisso per demo
+        
+        for t1_id, t2_id, delayed_id, priority_id in zip(
+                c0.tolist(), c1.tolist(), delayed_ids.tolist(), priority_ids.tolist()):
             print(f"  Conflitto {t1_id} ↔ {t2_id}:")
-            print(f"    → Treno {delayed_train.id}: +{delay_minutes} min ritardo")
-            print(f"    → Treno {priority_train.id}: nessun cambiamento")
+            print(f"    → Treno {delayed_id}: +{delay_minutes} min ritardo")
+            print(f"    → Treno {priority_id}: nessun cambiamento")
             
             resolutions.append({
-                'train_id': delayed_train.id,
+                'train_id': delayed_id,
                 'delay': delay_minutes,
-                'reason': f'Priorità a treno {priority_train.id}'
+                'reason': f'Priorità a treno {priority_id}'
             })
         
         # Calcola impatto
@@ -163,7 +180,6 @@ def main():
     
     network_state = scenario['network_state']
     train_states = scenario['train_states']
-    conflict_matrix = scenario['conflict_matrix']
     
     print("📦 Formato dati per training:")
     print(f"  • Network state shape: {network_state.shape}")
@@ -181,7 +197,7 @@ def main():
     print_header("✅ DEMO COMPLETATA")
     
     print("🎯 Risultati:")
-    print(f"  • Rete: {len(generator.stations)} stazioni, {len(generator.tracks)} binari")
+    print(f"  • Rete: {n_stations} stazioni, {n_tracks} binari")
     print(f"  • Traffico: {len(trains)} treni attivi")
     print(f"  • Conflitti: {len(conflicts)} rilevati")
     print(f"  • Risoluzione: Euristica basata su priorità")
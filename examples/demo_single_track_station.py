@@ -14,6 +14,7 @@ Scenario:
 
 import sys
 import os
+import functools
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'build', 'python'))
 
 import railway_cpp as rc
@@ -23,17 +24,17 @@ def print_section(title):
     print(f"  {title}")
     print(f"{'='*70}\n")
 
-def create_single_track_scenario():
+@functools.lru_cache(maxsize=1)
+def _build_topology():
     """
-    Crea uno scenario con:
-    - Track 0: Linea principale (binario unico, 50km)
-    - Track 1,2,3: Altri binari per test
+    Costruisce binari e stazioni dello scenario (una sola volta).
     
-    Simula conflitti su binario singolo con possibilità di deviazione
-    """
-    
-    scheduler = rc.RailwayScheduler(num_tracks=4, num_stations=2)
+    La configurazione è immutabile: gli scenari riusano gli stessi
+    oggetti, copiati lato C++ da initialize_network.
     
+    Returns:
+        Tupla (tracks, stations)
+    """
     # Crea binari
     tracks = []
     
@@ -90,66 +91,70 @@ def create_single_track_scenario():
     station1.connected_track_ids = [0, 1, 2, 3]
     stations.append(station1)
     
-    scheduler.initialize_network(tracks, stations)
-    
-    return scheduler
+    return tuple(tracks), tuple(stations)
 
-def scenario_1_opposite_directions():
+def create_single_track_scenario():
     """
-    Scenario 1: Due treni da direzioni opposte
-    - Treno 101: Arriva da Ovest (Track 1) verso stazione
-    - Treno 102: Arriva da Est (Track 3) verso stazione
+    Crea uno scenario con:
+    - Track 0: Linea principale (binario unico, 50km)
+    - Track 1,2,3: Altri binari per test
+    
+    Simula conflitti su binario singolo con possibilità di deviazione
     """
-    print_section("SCENARIO 1: Treni da Direzioni Opposte")
     
-    scheduler = create_single_track_scenario()
+    scheduler = rc.RailwayScheduler(num_tracks=4, num_stations=2)
     
-    # Treno 101: Da Ovest, su binario 0
-    train1 = rc.Train()
-    train1.id = 101
-    train1.current_track = 0  # Prima linea
-    train1.position_km = 15.0  # Sulla linea
-    train1.velocity_kmh = 100.0
-    train1.destination_station = 1
-    train1.priority = 7
-    train1.is_delayed = False
-    train1.delay_minutes = 0.0
-    
-    # Treno 102: Da Est, su binario 1 (stessa direzione per creare conflitto)
-    train2 = rc.Train()
-    train2.id = 102
-    train2.current_track = 0  # Stessa linea del train1 -> conflitto
-    train2.position_km = 25.0  # Più avanti
-    train2.velocity_kmh = 80.0  # Più lento -> train1 lo raggiungerà
-    train2.destination_station = 1
-    train2.priority = 6
-    train2.is_delayed = False
-    train2.delay_minutes = 0.0
-    
-    scheduler.add_train(train1)
-    scheduler.add_train(train2)
+    tracks, stations = _build_topology()
+    scheduler.initialize_network(list(tracks), list(stations))
     
+    return scheduler
+
+def make_train(train_id, position_km, velocity_kmh, priority,
+               current_track=0, destination_station=1):
+    """Crea un treno puntuale sulla linea."""
+    train = rc.Train()
+    train.id = train_id
+    train.current_track = current_track
+    train.position_km = position_km
+    train.velocity_kmh = velocity_kmh
+    train.destination_station = destination_station
+    train.priority = priority
+    train.is_delayed = False
+    train.delay_minutes = 0.0
+    return train
+
+def print_configuration(lines):
     print("Configurazione iniziale:")
-    print(f"  Treno 101: Track 0, pos=15km, vel=100km/h, dest=Stazione 1, priorità=7")
-    print(f"  Treno 102: Track 0, pos=25km, vel=80km/h, dest=Stazione 1, priorità=6")
-    print(f"\n  → Entrambi su stesso binario, train1 più veloce raggiungerà train2")
+    for line in lines:
+        print(f"  {line}")
+
+def detect_and_resolve(scheduler, show_conflicts=False):
+    """
+    Rileva e risolve i conflitti dello scenario, stampando le soluzioni.
+    
+    Args:
+        scheduler: Scheduler con rete e treni già caricati
+        show_conflicts: Se True stampa anche il dettaglio dei conflitti
     
-    # Rileva conflitti
+    Returns:
+        Lista di ScheduleAdjustment
+    """
     conflicts = scheduler.detect_conflicts()
     print(f"\n✗ Conflitti rilevati: {len(conflicts)}")
     
-    for i, conflict in enumerate(conflicts, 1):
-        print(f"\n  Conflitto {i}:")
-        print(f"    Treni: {conflict.train1_id} vs {conflict.train2_id}")
-        print(f"    Track: {conflict.track_id}")
-        print(f"    Tipo: {conflict.conflict_type}")
-        print(f"    Gravità: {conflict.severity}/10")
-        print(f"    Tempo stimato collisione: {conflict.estimated_collision_time_minutes:.1f} min")
+    if show_conflicts:
+        for i, conflict in enumerate(conflicts, 1):
+            print(f"\n  Conflitto {i}:")
+            print(f"    Treni: {conflict.train1_id} vs {conflict.train2_id}")
+            print(f"    Track: {conflict.track_id}")
+            print(f"    Tipo: {conflict.conflict_type}")
+            print(f"    Gravità: {conflict.severity}/10")
+            print(f"    Tempo stimato collisione: {conflict.estimated_time_min:.1f} min")
+        
+        # Risolvi con strategia binario singolo
+        print("\n📋 Risoluzione con strategia binario singolo...")
     
-    # Risolvi con strategia binario singolo
-    print("\n📋 Risoluzione con strategia binario singolo...")
     adjustments = scheduler.resolve_conflicts(conflicts)
-    
     print(f"\n✓ Soluzioni trovate: {len(adjustments)}")
     
     for i, adj in enumerate(adjustments, 1):
@@ -160,6 +165,37 @@ def scenario_1_opposite_directions():
         print(f"    Confidenza: {adj.confidence*100:.0f}%")
         print(f"    Motivo: {adj.reason}")
     
+    return adjustments
+
+def print_analysis(lines):
+    print("\n📊 Analisi:")
+    for line in lines:
+        print(f"  → {line}")
+
+def scenario_1_opposite_directions():
+    """
+    Scenario 1: Due treni da direzioni opposte
+    - Treno 101: Arriva da Ovest (Track 1) verso stazione
+    - Treno 102: Arriva da Est (Track 3) verso stazione
+    """
+    print_section("SCENARIO 1: Treni da Direzioni Opposte")
+    
+    scheduler = create_single_track_scenario()
+    
+    # Treno 101 sulla linea; treno 102 più avanti e più lento -> conflitto
+    scheduler.add_trains([
+        make_train(101, position_km=15.0, velocity_kmh=100.0, priority=7),
+        make_train(102, position_km=25.0, velocity_kmh=80.0, priority=6),
+    ])
+    
+    print_configuration([
+        "Treno 101: Track 0, pos=15km, vel=100km/h, dest=Stazione 1, priorità=7",
+        "Treno 102: Track 0, pos=25km, vel=80km/h, dest=Stazione 1, priorità=6",
+    ])
+    print(f"\n  → Entrambi su stesso binario, train1 più veloce raggiungerà train2")
+    
+    detect_and_resolve(scheduler, show_conflicts=True)
+    
     return scheduler
 
 def scenario_2_priority_conflict():
@@ -173,65 +209,24 @@ def scenario_2_priority_conflict():
     
     scheduler = create_single_track_scenario()
     
-    # Treno 201: Alta priorità
-    train1 = rc.Train()
-    train1.id = 201
-    train1.current_track = 0
-    train1.position_km = 10.0
-    train1.velocity_kmh = 120.0
-    train1.destination_station = 1
-    train1.priority = 9  # ALTA priorità
-    train1.is_delayed = False
-    train1.delay_minutes = 0.0
-    
-    # Treno 202: Bassa priorità
-    train2 = rc.Train()
-    train2.id = 202
-    train2.current_track = 0
-    train2.position_km = 20.0
-    train2.velocity_kmh = 90.0
-    train2.destination_station = 1
-    train2.priority = 4  # BASSA priorità
-    train2.is_delayed = False
-    train2.delay_minutes = 0.0
-    
-    # Treno 203: Media priorità
-    train3 = rc.Train()
-    train3.id = 203
-    train3.current_track = 0
-    train3.position_km = 15.0
-    train3.velocity_kmh = 100.0
-    train3.destination_station = 1
-    train3.priority = 6  # MEDIA priorità
-    train3.is_delayed = False
-    train3.delay_minutes = 0.0
-    
-    scheduler.add_train(train1)
-    scheduler.add_train(train2)
-    scheduler.add_train(train3)
-    
-    print("Configurazione iniziale:")
-    print(f"  Treno 201: Track 0, pos=10km, priorità=9 (ALTA)")
-    print(f"  Treno 202: Track 0, pos=20km, priorità=4 (BASSA)")
-    print(f"  Treno 203: Track 0, pos=15km, priorità=6 (MEDIA)")
+    scheduler.add_trains([
+        make_train(201, position_km=10.0, velocity_kmh=120.0, priority=9),  # ALTA priorità
+        make_train(202, position_km=20.0, velocity_kmh=90.0, priority=4),   # BASSA priorità
+        make_train(203, position_km=15.0, velocity_kmh=100.0, priority=6),  # MEDIA priorità
+    ])
     
-    conflicts = scheduler.detect_conflicts()
-    print(f"\n✗ Conflitti rilevati: {len(conflicts)}")
-    
-    adjustments = scheduler.resolve_conflicts(conflicts)
-    print(f"\n✓ Soluzioni trovate: {len(adjustments)}")
+    print_configuration([
+        "Treno 201: Track 0, pos=10km, priorità=9 (ALTA)",
+        "Treno 202: Track 0, pos=20km, priorità=4 (BASSA)",
+        "Treno 203: Track 0, pos=15km, priorità=6 (MEDIA)",
+    ])
     
-    for i, adj in enumerate(adjustments, 1):
-        print(f"\n  Soluzione {i}:")
-        print(f"    Treno: {adj.train_id}")
-        print(f"    Ritardo: {adj.time_adjustment_minutes:.1f} min")
-        print(f"    Nuovo binario: {adj.new_track_id if adj.new_track_id != -1 else 'Nessun cambio'}")
-        print(f"    Confidenza: {adj.confidence*100:.0f}%")
-        print(f"    Motivo: {adj.reason}")
+    detect_and_resolve(scheduler)
     
-    print("\n📊 Analisi:")
-    print(f"  → Il treno 201 (priorità 9) dovrebbe passare per primo")
-    print(f"  → I treni 202 e 203 dovrebbero essere deviati o ritardati")
+    print_analysis([
+        "Il treno 201 (priorità 9) dovrebbe passare per primo",
+        "I treni 202 e 203 dovrebbero essere deviati o ritardati",
+    ])
     
     return scheduler
 
@@ -245,67 +240,26 @@ def scenario_3_station_full():
     
     scheduler = create_single_track_scenario()
     
-    # Treno 301: In testa
-    train1 = rc.Train()
-    train1.id = 301
-    train1.current_track = 0
-    train1.position_km = 30.0
-    train1.velocity_kmh = 80.0
-    train1.destination_station = 1
-    train1.priority = 5
-    train1.is_delayed = False
-    train1.delay_minutes = 0.0
-    
-    # Treno 302: Nel mezzo
-    train2 = rc.Train()
-    train2.id = 302
-    train2.current_track = 0
-    train2.position_km = 20.0
-    train2.velocity_kmh = 100.0
-    train2.destination_station = 1
-    train2.priority = 7
-    train2.is_delayed = False
-    train2.delay_minutes = 0.0
-    
-    # Treno 303: In coda
-    train3 = rc.Train()
-    train3.id = 303
-    train3.current_track = 0
-    train3.position_km = 10.0
-    train3.velocity_kmh = 110.0
-    train3.destination_station = 1
-    train3.priority = 6
-    train3.is_delayed = False
-    train3.delay_minutes = 0.0
-    
-    scheduler.add_train(train1)
-    scheduler.add_train(train2)
-    scheduler.add_train(train3)
-    
-    print("Configurazione iniziale:")
-    print(f"  Treno 301: Track 0, pos=30km, vel=80km/h (lento)")
-    print(f"  Treno 302: Track 0, pos=20km, vel=100km/h (medio)")
-    print(f"  Treno 303: Track 0, pos=10km, vel=110km/h (veloce)")
+    scheduler.add_trains([
+        make_train(301, position_km=30.0, velocity_kmh=80.0, priority=5),   # In testa
+        make_train(302, position_km=20.0, velocity_kmh=100.0, priority=7),  # Nel mezzo
+        make_train(303, position_km=10.0, velocity_kmh=110.0, priority=6),  # In coda
+    ])
+    
+    print_configuration([
+        "Treno 301: Track 0, pos=30km, vel=80km/h (lento)",
+        "Treno 302: Track 0, pos=20km, vel=100km/h (medio)",
+        "Treno 303: Track 0, pos=10km, vel=110km/h (veloce)",
+    ])
     print(f"\n  → Tutti su stesso binario, i veloci raggiungeranno i lenti")
     
-    conflicts = scheduler.detect_conflicts()
-    print(f"\n✗ Conflitti rilevati: {len(conflicts)}")
-    
-    adjustments = scheduler.resolve_conflicts(conflicts)
-    print(f"\n✓ Soluzioni trovate: {len(adjustments)}")
-    
-    for i, adj in enumerate(adjustments, 1):
-        print(f"\n  Soluzione {i}:")
-        print(f"    Treno: {adj.train_id}")
-        print(f"    Ritardo: {adj.time_adjustment_minutes:.1f} min")
-        print(f"    Nuovo binario: {adj.new_track_id if adj.new_track_id != -1 else 'Nessun cambio'}")
-        print(f"    Confidenza: {adj.confidence*100:.0f}%")
-        print(f"    Motivo: {adj.reason}")
+    detect_and_resolve(scheduler)
     
-    print("\n📊 Analisi:")
-    print(f"  → Tre treni su stesso binario con velocità diverse")
-    print(f"  → Sistema deve gestire sorpassi o ritardi")
-    print(f"  → Possibile deviazione su binari alternativi se disponibili")
+    print_analysis([
+        "Tre treni su stesso binario con velocità diverse",
+        "Sistema deve gestire sorpassi o ritardi",
+        "Possibile deviazione su binari alternativi se disponibili",
+    ])
     
     return scheduler
 
@@ -3,49 +3,90 @@ Playground per sperimentare con diversi scenari ferroviari.
 Modifica i parametri per vedere come cambiano conflitti e complessità.
 """
 
+import random
 import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'python'))
+from concurrent.futures import ProcessPoolExecutor
+from _bootstrap import PYTHON_DIR
+if PYTHON_DIR not in sys.path:
+    sys.path.insert(0, PYTHON_DIR)
 
 from data.data_generator import RailwayNetworkGenerator
+from data.scenario_stats import conflict_stats
 import numpy as np
 
 
+def scenario_stats(generator, scenario):
+    """Statistiche dei conflitti dello scenario (kernel JIT se numba è disponibile)."""
+    return conflict_stats(
+        scenario['train_priorities'],
+        scenario['train_tracks'],
+        generator.track_is_single,
+        scenario['train_positions'],
+        scenario['conflict_pairs']
+    )
+
+
+def _run_single_ratio(single_ratio, seed):
+    """Genera e analizza uno scenario con la percentuale di binari singoli data."""
+    random.seed(seed)
+    
+    generator = RailwayNetworkGenerator(
+        num_stations=10,
+        num_tracks=15,
+        single_track_ratio=single_ratio
+    )
+    
+    scenario = generator.generate_scenario(
+        num_trains=25,
+        conflict_probability=0.4
+    )
+    
+    # Conta conflitti critici su binari singoli
+    critical, _, _, _ = scenario_stats(generator, scenario)
+    
+    return {
+        'single_ratio': single_ratio,
+        'num_conflicts': len(scenario['conflicts']),
+        'num_trains': len(scenario['trains']),
+        'critical': critical
+    }
+
+
 def experiment_single_vs_double_track():
     """Confronta scenari con diversa percentuale di binari singoli."""
     print("\n" + "=" * 70)
     print("  ESPERIMENTO: Binari Singoli vs Doppi")
     print("=" * 70 + "\n")
     
-    for single_ratio in [0.2, 0.5, 0.8]:
-        print(f"\n📊 Scenario con {single_ratio*100:.0f}% binari singoli:")
-        
-        generator = RailwayNetworkGenerator(
-            num_stations=10,
-            num_tracks=15,
-            single_track_ratio=single_ratio
-        )
-        
-        scenario = generator.generate_scenario(
-            num_trains=25,
-            conflict_probability=0.4
-        )
-        
-        conflicts = scenario['conflicts']
-        trains = scenario['trains']
-        
-        print(f"  • Conflitti: {len(conflicts)}")
-        print(f"  • Conflitti/treno: {len(conflicts)/len(trains):.2f}")
-        
-        # Conta conflitti critici su binari singoli
-        critical = 0
-        for t1_id, t2_id in conflicts:
-            train = trains[t1_id]
-            track = generator.tracks[train.current_track]
-            if track.is_single_track:
-                critical += 1
-        
-        print(f"  • Conflitti CRITICI (binario singolo): {critical}/{len(conflicts)}")
+    ratios = [0.2, 0.5, 0.8]
+    # Un seed per scenario: i processi figli non condividono lo stato del RNG
+    seeds = [random.getrandbits(32) for _ in ratios]
+    
+    # Scenari indipendenti: generati in parallelo, stampati in ordine
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(_run_single_ratio, ratios, seeds))
+    
+    for r in results:
+        print(f"\n📊 Scenario con {r['single_ratio']*100:.0f}% binari singoli:")
+        print(f"  • Conflitti: {r['num_conflicts']}")
+        print(f"  • Conflitti/treno: {r['num_conflicts']/r['num_trains']:.2f}")
+        print(f"  • Conflitti CRITICI (binario singolo): {r['critical']}/{r['num_conflicts']}")
+
+
+def _run_density(generator, num_trains, seed):
+    """Genera e analizza uno scenario con il numero di treni dato."""
+    random.seed(seed)
+    
+    scenario = generator.generate_scenario(
+        num_trains=num_trains,
+        conflict_probability=0.3
+    )
+    
+    return {
+        'num_trains': num_trains,
+        'num_conflicts': len(scenario['conflicts']),
+        'delayed': int(scenario['train_delayed'].sum())
+    }
 
 
 def experiment_train_density():
@@ -60,17 +101,19 @@ def experiment_train_density():
         single_track_ratio=0.4
     )
     
-    for num_trains in [10, 20, 30, 40]:
-        scenario = generator.generate_scenario(
-            num_trains=num_trains,
-            conflict_probability=0.3
-        )
-        
-        conflicts = scenario['conflicts']
-        delayed = sum(1 for t in scenario['trains'] if t.is_delayed)
-        
+    train_counts = [10, 20, 30, 40]
+    seeds = [random.getrandbits(32) for _ in train_counts]
+    
+    # Stessa rete per tutti gli scenari, generati in parallelo
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(
+            _run_density, [generator] * len(train_counts), train_counts, seeds
+        ))
+    
+    for r in results:
+        num_trains, delayed = r['num_trains'], r['delayed']
         print(f"\n🚂 {num_trains} treni:")
-        print(f"  • Conflitti totali: {len(conflicts)}")
+        print(f"  • Conflitti totali: {r['num_conflicts']}")
         print(f"  • In ritardo: {delayed} ({delayed/num_trains*100:.1f}%)")
         print(f"  • Densità: {num_trains/len(generator.tracks):.1f} treni/binario")
 
@@ -92,30 +135,20 @@ def experiment_priority_distribution():
         conflict_probability=0.5
     )
     
-    trains = scenario['trains']
     conflicts = scenario['conflicts']
     
     # Analisi priorità
-    priorities = [t.priority for t in trains]
+    priorities = scenario['train_priorities']
     print(f"📈 Distribuzione priorità:")
-    print(f"  • Media: {np.mean(priorities):.1f}")
-    print(f"  • Min/Max: {min(priorities)}/{max(priorities)}")
-    print(f"  • Std Dev: {np.std(priorities):.1f}")
+    print(f"  • Media: {priorities.mean():.1f}")
+    print(f"  • Min/Max: {priorities.min()}/{priorities.max()}")
+    print(f"  • Std Dev: {priorities.std():.1f}")
     
     # Simula risoluzione
     print(f"\n⚖️ Simulazione risoluzione {len(conflicts)} conflitti:")
     
-    total_delay_high_priority = 0
-    total_delay_low_priority = 0
-    
-    for t1_id, t2_id in conflicts:
-        t1 = trains[t1_id]
-        t2 = trains[t2_id]
-        
-        if t1.priority < t2.priority:
-            total_delay_low_priority += 10
-        else:
-            total_delay_high_priority += 10
+    # Il treno a priorità minore cede: 10 minuti di ritardo per conflitto
+    _, total_delay_low_priority, total_delay_high_priority, _ = scenario_stats(generator, scenario)
     
     print(f"  • Ritardo treni alta priorità (>5): {total_delay_high_priority} min")
     print(f"  • Ritardo treni bassa priorità (≤5): {total_delay_low_priority} min")
@@ -158,8 +191,12 @@ def generate_custom_scenario():
     print(f"  • Conflitti rilevati: {len(conflicts)}")
     
     if conflicts:
+        shown = scenario['conflict_pairs'][:3]
+        positions = scenario['train_positions']
+        distances = np.abs(positions[shown[:, 0]] - positions[shown[:, 1]])
+        
         print(f"\n⚠️ CONFLITTI CRITICI:")
-        for i, (t1_id, t2_id) in enumerate(conflicts[:3], 1):
+        for i, ((t1_id, t2_id), dist) in enumerate(zip(conflicts[:3], distances), 1):
             t1, t2 = trains[t1_id], trains[t2_id]
             track = generator.tracks[t1.current_track]
             
@@ -168,8 +205,6 @@ def generate_custom_scenario():
             print(f"    Treno {t2_id}: {t2.velocity_kmh:.0f}km/h, priorità {t2.priority}")
             print(f"    Binario {track.id}: {track.length_km:.0f}km " + 
                   ("(SINGOLO - CRITICO!)" if track.is_single_track else "(doppio)"))
-            
-            dist = abs(t1.position_km - t2.position_km)
             print(f"    Distanza: {dist:.1f}km")
 
 
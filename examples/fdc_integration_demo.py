@@ -11,10 +11,24 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from python.integration.fdc_integration import (
     FDCIntegrationBuilder,
     ConflictType,
+    Severity,
     create_minimal_fdc_response
 )
 import json
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def dumps(obj):
+    """Serializza in JSON indentato (orjson se disponibile, altrimenti json)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
 
 def example_1_platform_change():
     """
@@ -23,9 +37,9 @@ def example_1_platform_change():
     Scenario: IC101 e R203 arrivano entrambi a MONZA sul binario 1.
     Soluzione: Sposta R203 al binario 2 → conflitto risolto senza ritardi!
     """
-    print("\n" + "="*80)
-    print("📍 ESEMPIO 1: CAMBIO BINARIO (Zero Delay)")
-    print("="*80)
+    print("\n" + "="*80,
+          "📍 ESEMPIO 1: CAMBIO BINARIO (Zero Delay)",
+          "="*80, sep="\n")
     
     builder = FDCIntegrationBuilder()
     
@@ -34,7 +48,7 @@ def example_1_platform_change():
         conflict_type=ConflictType.PLATFORM_CONFLICT,
         location="MONZA",
         trains=["IC101", "R203"],
-        severity="high",
+        severity=Severity.HIGH,
         time_overlap_seconds=300
     )
     
@@ -71,14 +85,14 @@ def example_1_platform_change():
     
     response = builder.build_success()
     
-    print("\n✅ Risposta generata:")
-    print(json.dumps(response.to_dict(), indent=2, ensure_ascii=False))
+    print("\n✅ Risposta generata:",
+          dumps(response.to_dict()), sep="\n")
     
-    print(f"\n📊 Metriche:")
-    print(f"   Ritardo totale: {response.total_impact_minutes} minuti")
-    print(f"   Conflitti risolti: {response.conflict_analysis.resolved_conflicts}")
-    print(f"   Alternative fornite: {len(response.alternatives) if response.alternatives else 0}")
-    print(f"   ML Confidence: {response.ml_confidence:.1%}")
+    print(f"\n📊 Metriche:",
+          f"   Ritardo totale: {response.total_impact_minutes} minuti",
+          f"   Conflitti risolti: {response.conflict_analysis.resolved_conflicts}",
+          f"   Alternative fornite: {len(response.alternatives) if response.alternatives else 0}",
+          f"   ML Confidence: {response.ml_confidence:.1%}", sep="\n")
 
 
 def example_2_speed_reduction():
@@ -88,9 +102,9 @@ def example_2_speed_reduction():
     Scenario: IC101 troppo veloce, raggiungerebbe MONZA in conflitto con R203.
     Soluzione: Riduce velocità da 140 a 100 km/h sulla tratta MILANO-MONZA.
     """
-    print("\n" + "="*80)
-    print("🐌 ESEMPIO 2: RIDUZIONE VELOCITÀ")
-    print("="*80)
+    print("\n" + "="*80,
+          "🐌 ESEMPIO 2: RIDUZIONE VELOCITÀ",
+          "="*80, sep="\n")
     
     builder = FDCIntegrationBuilder()
     
@@ -98,7 +112,7 @@ def example_2_speed_reduction():
         conflict_type=ConflictType.TIMING_CONFLICT,
         location="MONZA",
         trains=["IC101", "R203"],
-        severity="medium",
+        severity=Severity.MEDIUM,
         time_overlap_seconds=120
     )
     
@@ -118,10 +132,9 @@ def example_2_speed_reduction():
     builder.set_ml_confidence(0.95)
     builder.set_optimization_type("speed_coordination")
     
-    response = builder.build_success()
-    
-    print("\n✅ Risposta generata:")
-    print(json.dumps(response.to_dict(), indent=2, ensure_ascii=False))
+    # Serializzazione diretta, senza passare da to_dict() nel chiamante
+    print("\n✅ Risposta generata:",
+          builder.build_success_json().decode(), sep="\n")
 
 
 def example_3_multi_train_coordination():
@@ -131,9 +144,9 @@ def example_3_multi_train_coordination():
     Scenario: 3 treni con conflitti multipli.
     Soluzione: Combinazione di cambio binario, riduzione velocità e aumento sosta.
     """
-    print("\n" + "="*80)
-    print("🚦 ESEMPIO 3: COORDINAMENTO MULTI-TRENO")
-    print("="*80)
+    print("\n" + "="*80,
+          "🚦 ESEMPIO 3: COORDINAMENTO MULTI-TRENO",
+          "="*80, sep="\n")
     
     builder = FDCIntegrationBuilder()
     
@@ -142,74 +155,75 @@ def example_3_multi_train_coordination():
         conflict_type=ConflictType.PLATFORM_CONFLICT,
         location="MONZA",
         trains=["IC101", "R203"],
-        severity="high"
+        severity=Severity.HIGH
     )
     
     builder.add_conflict(
         conflict_type=ConflictType.SPEED_CONFLICT,
         location="COMO",
         trains=["R203", "R205"],
-        severity="medium"
+        severity=Severity.MEDIUM
     )
     
+    # Una chiamata per tipo di modifica
     # Modifica 1: Riduzione velocità IC101
-    builder.add_speed_modification(
-        train_id="IC101",
-        from_station="MILANO_CENTRALE",
-        to_station="MONZA",
-        new_speed_kmh=100.0,
-        original_speed_kmh=140.0,
-        time_increase_seconds=180,
-        affected_stations=["MONZA", "COMO"],
-        reason="Riduzione velocità per coordinamento con R203",
-        confidence=0.95
-    )
+    builder.add_modifications_bulk("speed", [{
+        "train_id": "IC101",
+        "from_station": "MILANO_CENTRALE",
+        "to_station": "MONZA",
+        "new_speed_kmh": 100.0,
+        "original_speed_kmh": 140.0,
+        "time_increase_seconds": 180,
+        "affected_stations": ["MONZA", "COMO"],
+        "reason": "Riduzione velocità per coordinamento con R203",
+        "confidence": 0.95
+    }])
     
     # Modifica 2: Cambio binario R203
-    builder.add_platform_change(
-        train_id="R203",
-        station="MONZA",
-        new_platform=2,
-        original_platform=1,
-        affected_stations=["MONZA"],
-        reason="Cambio binario per evitare conflitto con IC101",
-        confidence=0.98
-    )
+    builder.add_modifications_bulk("platform_change", [{
+        "train_id": "R203",
+        "station": "MONZA",
+        "new_platform": 2,
+        "original_platform": 1,
+        "affected_stations": ["MONZA"],
+        "reason": "Cambio binario per evitare conflitto con IC101",
+        "confidence": 0.98
+    }])
     
     # Modifica 3: Aumento sosta R205
-    builder.add_dwell_time_change(
-        train_id="R205",
-        station="COMO",
-        additional_seconds=120,
-        original_dwell_seconds=180,
-        affected_stations=["MONZA", "MILANO_CENTRALE"],
-        reason="Aumento sosta per separazione temporale",
-        confidence=0.88
-    )
+    builder.add_modifications_bulk("dwell_time", [{
+        "train_id": "R205",
+        "station": "COMO",
+        "additional_seconds": 120,
+        "original_dwell_seconds": 180,
+        "affected_stations": ["MONZA", "MILANO_CENTRALE"],
+        "reason": "Aumento sosta per separazione temporale",
+        "confidence": 0.88
+    }])
     
     builder.set_ml_confidence(0.92)
     builder.set_optimization_type("multi_train_coordination")
     
     response = builder.build_success()
     
-    print("\n✅ Risposta generata:")
-    print(json.dumps(response.to_dict(), indent=2, ensure_ascii=False))
+    print("\n✅ Risposta generata:",
+          dumps(response.to_dict()), sep="\n")
     
-    print(f"\n📊 Riepilogo:")
-    print(f"   Treni modificati: {len(set(m.train_id for m in response.modifications))}")
-    print(f"   Modifiche totali: {len(response.modifications)}")
-    print(f"   Ritardo totale: {response.total_impact_minutes:.1f} minuti")
-    print(f"   Conflitti originali: {len(response.conflict_analysis.original_conflicts)}")
-    print(f"   Conflitti risolti: {response.conflict_analysis.resolved_conflicts}")
+    print(f"\n📊 Riepilogo:",
+          f"   Treni modificati: {len(set(m.train_id for m in response.modifications))}",
+          f"   Modifiche totali: {len(response.modifications)}",
+          f"   Ritardo totale: {response.total_impact_minutes:.1f} minuti",
+          f"   Conflitti originali: {len(response.conflict_analysis.original_conflicts)}",
+          f"   Conflitti risolti: {response.conflict_analysis.resolved_conflicts}", sep="\n")
 
 
 def example_4_failure_response():
     """
     Esempio 4: Risposta di fallimento quando l'ottimizzazione non è possibile.
     """
-    print("\n" + "="*80)
-    print("❌ ESEMPIO 4: FALLIMENTO OTTIMIZZAZIONE")
-    print("="*80)
+    print("\n" + "="*80,
+          "❌ ESEMPIO 4: FALLIMENTO OTTIMIZZAZIONE",
+          "="*80, sep="\n")
     
     builder = FDCIntegrationBuilder()
     
@@ -218,10 +232,10 @@ def example_4_failure_response():
         conflict_type=ConflictType.CAPACITY_CONFLICT,
         location="MONZA",
         trains=["IC101", "R203", "IC104", "R207"],
-        severity="high"
+        severity=Severity.HIGH
     )
     
-    response = builder.build_failure(
+    response_json = builder.build_failure_json(
         error_message="Impossibile risolvere conflitti senza violare vincoli di capacità",
         error_code="CAPACITY_EXCEEDED",
         suggestions=[
@@ -231,8 +245,8 @@ def example_4_failure_response():
         ]
     )
     
-    print("\n❌ Risposta di fallimento:")
-    print(json.dumps(response.to_dict(), indent=2, ensure_ascii=False))
+    print("\n❌ Risposta di fallimento:",
+          response_json.decode(), sep="\n")
 
 
 def example_5_minimal_backward_compatible():
@@ -241,9 +255,9 @@ def example_5_minimal_backward_compatible():
     
     Per sistemi legacy che non supportano ancora tutte le feature.
     """
-    print("\n" + "="*80)
-    print("🔄 ESEMPIO 5: FORMATO MINIMALE (Backward Compatible)")
-    print("="*80)
+    print("\n" + "="*80,
+          "🔄 ESEMPIO 5: FORMATO MINIMALE (Backward Compatible)",
+          "="*80, sep="\n")
     
     response = create_minimal_fdc_response(
         train_id="IC101",
@@ -254,16 +268,16 @@ def example_5_minimal_backward_compatible():
         confidence=0.85
     )
     
-    print("\n✅ Risposta minimale:")
-    print(json.dumps(response, indent=2, ensure_ascii=False))
+    print("\n✅ Risposta minimale:",
+          dumps(response), sep="\n")
 
 
 def run_all_examples():
     """Esegue tutti gli esempi."""
-    print("\n" + "="*80)
-    print("🚂 TEST FDC INTEGRATION MODULE")
-    print("   Esempi conformi a RAILWAY_AI_INTEGRATION_SPECS.md")
-    print("="*80)
+    print("\n" + "="*80,
+          "🚂 TEST FDC INTEGRATION MODULE",
+          "   Esempi conformi a RAILWAY_AI_INTEGRATION_SPECS.md",
+          "="*80, sep="\n")
     
     example_1_platform_change()
     example_2_speed_reduction()
@@ -271,22 +285,22 @@ def run_all_examples():
     example_4_failure_response()
     example_5_minimal_backward_compatible()
     
-    print("\n" + "="*80)
-    print("✅ TUTTI GLI ESEMPI COMPLETATI")
-    print("="*80)
-    
-    print("\n📝 Esempi dimostrati:")
-    print("   1. Cambio binario (zero delay)")
-    print("   2. Riduzione velocità su tratta")
-    print("   3. Coordinamento multi-treno complesso")
-    print("   4. Gestione fallimento ottimizzazione")
-    print("   5. Formato minimale backward-compatible")
-    
-    print("\n💡 Prossimi passi:")
-    print("   • Integrare con railway_scheduler.cpp esistente")
-    print("   • Creare endpoint API che usa questo formato")
-    print("   • Testare con dati reali FDC")
-    print("   • Implementare ML model per scegliere modification_type ottimale")
+    print("\n" + "="*80,
+          "✅ TUTTI GLI ESEMPI COMPLETATI",
+          "="*80, sep="\n")
+    
+    print("\n📝 Esempi dimostrati:",
+          "   1. Cambio binario (zero delay)",
+          "   2. Riduzione velocità su tratta",
+          "   3. Coordinamento multi-treno complesso",
+          "   4. Gestione fallimento ottimizzazione",
+          "   5. Formato minimale backward-compatible", sep="\n")
+    
+    print("\n💡 Prossimi passi:",
+          "   • Integrare con railway_scheduler.cpp esistente",
+          "   • Creare endpoint API che usa questo formato",
+          "   • Testare con dati reali FDC",
+          "   • Implementare ML model per scegliere modification_type ottimale", sep="\n")
 
 
 if __name__ == '__main__':
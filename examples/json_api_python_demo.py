@@ -4,25 +4,38 @@ Mostra come chiamare le API JSON native della libreria C++ da Python.
 """
 
 import ctypes
+import functools
 import json
+import os
 import sys
 from pathlib import Path
 
+LIB_PATH = Path(__file__).parent.parent / "build" / "librailwayai.dylib"
+
+@functools.lru_cache(maxsize=1)
+def _load_lib(lib_path=LIB_PATH):
+    """
+    Carica la libreria C++ una sola volta per processo.
+    
+    RTLD_NOW risolve tutti i simboli al caricamento invece che alla prima
+    chiamata. Solleva FileNotFoundError se la libreria non esiste.
+    """
+    os.stat(lib_path)
+    return ctypes.CDLL(str(lib_path), mode=os.RTLD_NOW | os.RTLD_LOCAL)
+
 def main():
     print("\n" + "="*70)
     print("  🐍 Railway AI Scheduler - JSON API Demo (Python)")
     print("="*70 + "\n")
     
-    # Carica la libreria C++
-    lib_path = Path(__file__).parent.parent / "build" / "librailwayai.dylib"
-    if not lib_path.exists():
-        print(f"❌ Libreria non trovata: {lib_path}")
+    # Carica la libreria C++ (handle riusato tra chiamate successive)
+    try:
+        lib = _load_lib()
+        print(f"✅ Libreria caricata: {LIB_PATH}\n")
+    except FileNotFoundError:
+        print(f"❌ Libreria non trovata: {LIB_PATH}")
         print("   Compila prima con: cd build && cmake --build . --target railwayai")
         return 1
-    
-    try:
-        lib = ctypes.CDLL(str(lib_path))
-        print(f"✅ Libreria caricata: {lib_path}\n")
     except Exception as e:
         print(f"❌ Errore caricamento libreria: {e}")
         return 1
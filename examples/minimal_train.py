@@ -2,14 +2,21 @@
 Training minimale senza complessità per validare il sistema end-to-end.
 """
 
+import argparse
 import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'python'))
+from _bootstrap import PYTHON_DIR
+if PYTHON_DIR not in sys.path:
+    sys.path.insert(0, PYTHON_DIR)
 
 import torch
 import torch.nn as nn
+from torch.utils.data import DataLoader, TensorDataset
 import numpy as np
-from tqdm import tqdm
+from training.checkpoint import AsyncCheckpointer
+from training.precision import add_precision_argument, resolve_amp_dtype
+
+# Device scelto una sola volta per processo
+DEVICE = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
 
 class SimpleSchedulerNetwork(nn.Module):
@@ -22,19 +29,23 @@ class SimpleSchedulerNetwork(nn.Module):
         # Encoder per network state
         self.net_encoder = nn.Sequential(
             nn.Linear(network_dim, hidden),
-            nn.ReLU(),
+            nn.ReLU(inplace=True),
             nn.Linear(hidden, hidden//2)
         )
         
-        # Encoder per train states
-        self.train_encoder = nn.LSTM(train_dim, hidden//2, batch_first=True)
-        
-        # Decoder per aggiustamenti temporali
-        self.time_predictor = nn.Sequential(
-            nn.Linear(hidden, hidden),
-            nn.ReLU(),
-            nn.Linear(hidden, num_trains)
+        # Encoder per train states: l'ordine dei treni è arbitrario e viene
+        # comunque perso dal mean-pooling, quindi basta un encoder per treno
+        self.train_encoder = nn.Sequential(
+            nn.Linear(train_dim, hidden//2),
+            nn.ReLU(inplace=True)
         )
+        
+        # Decoder per aggiustamenti temporali: il primo Linear su [net, train]
+        # è diviso in due blocchi di pesi, così non serve concatenare
+        self.tp_net = nn.Linear(hidden//2, hidden)
+        self.tp_train = nn.Linear(hidden//2, hidden, bias=False)
+        self.tp_relu = nn.ReLU(inplace=True)
+        self.tp_out = nn.Linear(hidden, num_trains)
     
     def forward(self, network_state, train_states):
         batch_size = network_state.size(0)
@@ -43,19 +54,59 @@ class SimpleSchedulerNetwork(nn.Module):
         net_enc = self.net_encoder(network_state)  # [batch, 64]
         
         # Encode trains
-        train_enc, _ = self.train_encoder(train_states)  # [batch, num_trains, 64]
-        train_enc = train_enc.mean(dim=1)  # [batch, 64] - average pooling
-        
-        # Combina
-        combined = torch.cat([net_enc, train_enc], dim=1)  # [batch, 128]
+        train_enc = self.train_encoder(train_states).mean(dim=1)  # [batch, 64] - average pooling
         
-        # Predici aggiustamenti
-        time_adj = self.time_predictor(combined)  # [batch, num_trains]
+        # Combina e predici aggiustamenti (equivale a Linear su cat([net, train]))
+        hidden = self.tp_relu(self.tp_net(net_enc) + self.tp_train(train_enc))  # [batch, 128]
+        time_adj = self.tp_out(hidden)  # [batch, num_trains]
         
         return time_adj
 
 
-def main():
+def preload_to_device(tensors, device, max_fraction=0.5):
+    """
+    Sposta i tensori sulla GPU una sola volta, se occupano meno di
+    max_fraction della memoria libera. Altrimenti li lascia in RAM e il
+    trasferimento resta per batch.
+    """
+    if device.type != 'cuda':
+        return tensors
+    free_bytes, _ = torch.cuda.mem_get_info(device)
+    total_bytes = sum(t.numel() * t.element_size() for t in tensors)
+    if total_bytes >= max_fraction * free_bytes:
+        return tensors
+    return [t.to(device, non_blocking=True) for t in tensors]
+
+
+def make_loader(tensors, batch_size, device):
+    """
+    Batch di un dataset in ordine, riutilizzabili a ogni epoca.
+    
+    Tensori già sul device (preload su GPU o training su CPU): viste in
+    ordine, nessuna copia. Tensori in RAM con device CUDA: DataLoader con
+    memoria pinned, così la copia non_blocking si sovrappone al calcolo.
+    """
+    if tensors[0].device.type == device.type:
+        return [tuple(t[i:i+batch_size] for t in tensors)
+                for i in range(0, len(tensors[0]), batch_size)]
+    return DataLoader(
+        TensorDataset(*tensors),
+        batch_size=batch_size,
+        pin_memory=True,
+        num_workers=2,
+        persistent_workers=True
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Training minimale del SimpleSchedulerNetwork")
+    add_precision_argument(parser)
+    parser.add_argument('--no-compile', dest='compile', action='store_false',
+                        help="Disabilita torch.compile (utile per il debug)")
+    return parser.parse_args()
+
+
+def main(args):
     print("\n" + "="*70)
     print("  🚀 TRAINING MINIMALE - Sistema Semplificato")
     print("="*70 + "\n")
@@ -65,20 +116,37 @@ def main():
     train_data = np.load('../data/training_data.npz')
     val_data = np.load('../data/validation_data.npz')
     
-    X_train_net = torch.FloatTensor(train_data['network_states'])
-    X_train_trains = torch.FloatTensor(train_data['train_states'])
-    X_val_net = torch.FloatTensor(val_data['network_states'])
-    X_val_trains = torch.FloatTensor(val_data['train_states'])
+    # Layout contiguo garantito: gli slice per batch restano viste senza copie
+    X_train_net = torch.from_numpy(np.ascontiguousarray(train_data['network_states'])).float()
+    X_train_trains = torch.from_numpy(np.ascontiguousarray(train_data['train_states'])).float()
+    X_val_net = torch.from_numpy(np.ascontiguousarray(val_data['network_states'])).float()
+    X_val_trains = torch.from_numpy(np.ascontiguousarray(val_data['train_states'])).float()
     
     print(f"  • Training: {len(X_train_net)} samples")
     print(f"  • Validation: {len(X_val_net)} samples")
     print(f"  • Network state dim: {X_train_net.shape[1]}")
     print(f"  • Train state dim: {X_train_trains.shape[1:]}")
     
+    device = DEVICE
+    
+    # Dataset intero su GPU se entra in memoria, altrimenti DataLoader pinned
+    X_train_net, X_train_trains, X_val_net, X_val_trains = preload_to_device(
+        [X_train_net, X_train_trains, X_val_net, X_val_trains], device
+    )
+    
     # Crea target semplici (min delay necessario per risolvere conflitti)
-    # Per ora: target = piccoli aggiustamenti casuali come placeholder
-    y_train = torch.randn(len(X_train_net), 50) * 2  # [-6, +6] minuti
-    y_val = torch.randn(len(X_val_net), 50) * 2
+    # Per ora: target = piccoli aggiustamenti casuali come placeholder,
+    # generati direttamente dove stanno gli input e con seed fisso
+    target_device = X_train_net.device
+    gen = torch.Generator(device=target_device).manual_seed(0)
+    y_train = torch.randn(len(X_train_net), 50, generator=gen, device=target_device) * 2  # [-6, +6] minuti
+    y_val = torch.randn(len(X_val_net), 50, generator=gen, device=target_device) * 2
+    
+    # TF32 sui Tensor Core (Ampere+) e autotuning cuDNN per le shape fisse
+    torch.set_float32_matmul_precision('high')
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    torch.backends.cudnn.benchmark = True
     
     # Modello
     print("\n🧠 Inizializzazione modello semplificato...")
@@ -89,16 +157,28 @@ def main():
         num_trains=50
     )
     
-    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
     model = model.to(device)
+    # Checkpoint salvati dal modulo originale, senza prefisso _orig_mod
+    base_model = model
+    if device.type == 'cuda' and args.compile:
+        # CUDA graphs: elimina l'overhead di lancio kernel per batch
+        model = torch.compile(model, mode='reduce-overhead')
+    
+    # Mixed precision: solo su GPU, dove i matmul usano i Tensor Core
+    amp_dtype = resolve_amp_dtype(args.precision, device)
+    use_amp = amp_dtype is not None
     
     params = sum(p.numel() for p in model.parameters())
     print(f"  • Device: {device}")
     print(f"  • Parametri: {params:,}")
+    print(f"  • Mixed precision: {amp_dtype or 'off'}")
     
     # Training setup
-    optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+    # Fused: un solo kernel CUDA per l'update di tutti i parametri
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.001, fused=(device.type == 'cuda'))
     criterion = nn.MSELoss()
+    # Loss scaling necessario solo in FP16
+    scaler = torch.cuda.amp.GradScaler(enabled=(amp_dtype == torch.float16))
     
     # Training loop
     print("\n🏃 Training (5 epoche)...")
@@ -107,54 +187,64 @@ def main():
     batch_size = 16
     best_val_loss = float('inf')
     
+    # Scrittura dei checkpoint sovrapposta all'epoca successiva
+    checkpointer = AsyncCheckpointer()
+    
+    train_loader = make_loader([X_train_net, X_train_trains, y_train], batch_size, device)
+    val_loader = make_loader([X_val_net, X_val_trains, y_val], batch_size, device)
+    
     for epoch in range(5):
         # Training
         model.train()
-        train_loss = 0
+        # Loss accumulata sul device: nessuna sincronizzazione per batch
+        train_loss = torch.zeros((), device=device)
         num_batches = 0
         
-        for i in range(0, len(X_train_net), batch_size):
-            batch_net = X_train_net[i:i+batch_size].to(device)
-            batch_trains = X_train_trains[i:i+batch_size].to(device)
-            batch_y = y_train[i:i+batch_size].to(device)
+        for batch_net, batch_trains, batch_y in train_loader:
+            batch_net = batch_net.to(device, non_blocking=True)
+            batch_trains = batch_trains.to(device, non_blocking=True)
+            batch_y = batch_y.to(device, non_blocking=True)
             
-            optimizer.zero_grad()
-            pred = model(batch_net, batch_trains)
-            loss = criterion(pred, batch_y)
-            loss.backward()
-            optimizer.step()
+            optimizer.zero_grad(set_to_none=True)
+            with torch.autocast(device_type=device.type, dtype=amp_dtype, enabled=use_amp):
+                pred = model(batch_net, batch_trains)
+                loss = criterion(pred, batch_y)
+            scaler.scale(loss).backward()
+            scaler.step(optimizer)
+            scaler.update()
             
-            train_loss += loss.item()
+            train_loss += loss.detach()
             num_batches += 1
         
-        train_loss /= num_batches
+        train_loss = (train_loss / num_batches).item()
         
         # Validation
         model.eval()
-        val_loss = 0
+        val_loss = torch.zeros((), device=device)
         num_val_batches = 0
         
-        with torch.no_grad():
-            for i in range(0, len(X_val_net), batch_size):
-                batch_net = X_val_net[i:i+batch_size].to(device)
-                batch_trains = X_val_trains[i:i+batch_size].to(device)
-                batch_y = y_val[i:i+batch_size].to(device)
+        with torch.inference_mode():
+            for batch_net, batch_trains, batch_y in val_loader:
+                batch_net = batch_net.to(device, non_blocking=True)
+                batch_trains = batch_trains.to(device, non_blocking=True)
+                batch_y = batch_y.to(device, non_blocking=True)
                 
-                pred = model(batch_net, batch_trains)
-                loss = criterion(pred, batch_y)
+                with torch.autocast(device_type=device.type, dtype=amp_dtype, enabled=use_amp):
+                    pred = model(batch_net, batch_trains)
+                    loss = criterion(pred, batch_y)
                 
-                val_loss += loss.item()
+                val_loss += loss
                 num_val_batches += 1
         
-        val_loss /= num_val_batches
+        val_loss = (val_loss / num_val_batches).item()
         
         # Salva best model
         marker = ""
         if val_loss < best_val_loss:
             best_val_loss = val_loss
-            torch.save({
+            checkpointer.save({
                 'epoch': epoch,
-                'model_state_dict': model.state_dict(),
+                'model_state_dict': base_model.state_dict(),
                 'train_loss': train_loss,
                 'val_loss': val_loss,
             }, '../models/scheduler_minimal.pth')
@@ -162,18 +252,24 @@ def main():
         
         print(f"Epoca {epoch+1}/5 - Train: {train_loss:.4f} | Val: {val_loss:.4f}{marker}")
     
+    checkpointer.wait()
+    
     # Test
     print("\n🧪 Test predizione...")
     model.eval()
-    with torch.no_grad():
+    with torch.inference_mode():
         test_net = X_val_net[:1].to(device)
         test_trains = X_val_trains[:1].to(device)
         pred = model(test_net, test_trains)
         
+        # Riduzioni sul device: verso la CPU vanno solo 2 scalari e 10 valori
+        pred_min, pred_max = (v.item() for v in torch.aminmax(pred))
+        pred_head = pred[0, :10].cpu().numpy()
+        
         print(f"  • Input shape: {test_trains.shape}")
         print(f"  • Output shape: {pred.shape}")
-        print(f"  • Predizioni (primi 10 treni): {pred[0, :10].cpu().numpy()}")
-        print(f"  • Range: [{pred.min():.2f}, {pred.max():.2f}] minuti")
+        print(f"  • Predizioni (primi 10 treni): {pred_head}")
+        print(f"  • Range: [{pred_min:.2f}, {pred_max:.2f}] minuti")
     
     print("\n✅ Training completato!")
     print(f"  • Best val loss: {best_val_loss:.4f}")
@@ -191,4 +287,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(parse_args())
@@ -3,17 +3,31 @@ Training veloce (5 epoche) per validare il sistema.
 Per training completo usare python/training/train_model.py
 """
 
+import argparse
 import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'python'))
+from _bootstrap import PYTHON_DIR
+if PYTHON_DIR not in sys.path:
+    sys.path.insert(0, PYTHON_DIR)
 
 import torch
-import numpy as np
 from models.scheduler_network import SchedulerNetwork
 from training.train_model import RailwaySchedulingDataset, train_epoch, validate
+from training.checkpoint import AsyncCheckpointer
+from training.precision import add_precision_argument, resolve_amp_dtype
 
+# Device scelto una sola volta per processo
+DEVICE = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
-def quick_train():
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Training veloce del SchedulerNetwork")
+    add_precision_argument(parser)
+    parser.add_argument('--no-compile', dest='compile', action='store_false',
+                        help="Disabilita torch.compile (utile per il debug)")
+    return parser.parse_args()
+
+
+def quick_train(args):
     print("\n" + "="*70)
     print("  🚀 QUICK TRAINING - Validazione Sistema")
     print("="*70 + "\n")
@@ -29,6 +43,12 @@ def quick_train():
     train_loader = torch.utils.data.DataLoader(train_dataset, batch_size=16, shuffle=True)
     val_loader = torch.utils.data.DataLoader(val_dataset, batch_size=16, shuffle=False)
     
+    # TF32 sui Tensor Core (Ampere+) e autotuning cuDNN per le shape fisse
+    torch.set_float32_matmul_precision('high')
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    torch.backends.cudnn.benchmark = True
+    
     # Inizializza modello (usa dimensione reale dei dati: 80)
     print("\n🧠 Inizializzazione rete neurale...")
     model = SchedulerNetwork(
@@ -39,30 +59,45 @@ def quick_train():
         num_stations=10
     )
     
-    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    device = DEVICE
     model = model.to(device)
+    # Checkpoint salvati dal modulo originale, senza prefisso _orig_mod
+    base_model = model
+    if device.type == 'cuda' and args.compile:
+        # CUDA graphs: elimina l'overhead di lancio kernel per batch
+        model = torch.compile(model, mode='reduce-overhead')
+    
+    # Mixed precision: solo su GPU, dove i matmul usano i Tensor Core
+    amp_dtype = resolve_amp_dtype(args.precision, device)
     print(f"  • Device: {device}")
     print(f"  • Parametri: {sum(p.numel() for p in model.parameters()):,}")
+    print(f"  • Mixed precision: {amp_dtype or 'off'}")
     
     # Optimizer
-    optimizer = torch.optim.AdamW(model.parameters(), lr=0.001)
+    # Fused: un solo kernel CUDA per l'update di tutti i parametri
+    optimizer = torch.optim.AdamW(model.parameters(), lr=0.001, fused=(device.type == 'cuda'))
+    # Loss scaling necessario solo in FP16
+    scaler = torch.cuda.amp.GradScaler(enabled=(amp_dtype == torch.float16))
     
     # Training veloce (5 epoche)
     print("\n🏃 Training veloce (5 epoche)...")
     print("="*70)
     
     best_val_loss = float('inf')
+    # Scrittura dei checkpoint sovrapposta all'epoca successiva
+    checkpointer = AsyncCheckpointer()
     
     for epoch in range(5):
-        train_loss = train_epoch(model, train_loader, optimizer, device, epoch)
-        val_loss = validate(model, val_loader, device)
+        train_loss = train_epoch(model, train_loader, optimizer, device, epoch,
+                                 scaler=scaler, amp_dtype=amp_dtype)
+        val_loss = validate(model, val_loader, device, amp_dtype=amp_dtype)
         
         # Salva best model
         if val_loss < best_val_loss:
             best_val_loss = val_loss
-            torch.save({
+            checkpointer.save({
                 'epoch': epoch,
-                'model_state_dict': model.state_dict(),
+                'model_state_dict': base_model.state_dict(),
                 'optimizer_state_dict': optimizer.state_dict(),
                 'train_loss': train_loss,
                 'val_loss': val_loss,
@@ -73,6 +108,8 @@ def quick_train():
         
         print(f"Epoca {epoch+1}/5 - Train Loss: {train_loss:.4f} | Val Loss: {val_loss:.4f}{marker}")
     
+    checkpointer.wait()
+    
     print("\n✅ Training completato!")
     print(f"  • Best validation loss: {best_val_loss:.4f}")
     print(f"  • Modello salvato: ../models/scheduler_quick.pth")
@@ -80,7 +117,7 @@ def quick_train():
     # Test predizione
     print("\n🧪 Test predizione...")
     model.eval()
-    with torch.no_grad():
+    with torch.inference_mode():
         sample_batch = next(iter(val_loader))
         network_state, train_states, conflict_matrix = sample_batch
         network_state = network_state.to(device)
@@ -95,11 +132,18 @@ def quick_train():
         print(f"  • Conflict priorities: {conflict_prio.shape}")
         
         # Analizza prima predizione
-        first_time_adj = time_adj[0].cpu().numpy()
+        # Riduzioni sul device, un solo trasferimento di 4 scalari
+        first_time_adj = time_adj[0]
+        adj_min, adj_max, adj_mean, significant = torch.stack([
+            first_time_adj.min(),
+            first_time_adj.max(),
+            first_time_adj.mean(),
+            (first_time_adj.abs() > 5).sum().to(first_time_adj.dtype)
+        ]).tolist()
         print(f"\n  📊 Prima predizione (sample 0):")
-        print(f"    • Range aggiustamenti: [{first_time_adj.min():.2f}, {first_time_adj.max():.2f}] minuti")
-        print(f"    • Media aggiustamenti: {first_time_adj.mean():.2f} minuti")
-        print(f"    • Aggiustamenti significativi (>5min): {(np.abs(first_time_adj) > 5).sum()}/{len(first_time_adj)}")
+        print(f"    • Range aggiustamenti: [{adj_min:.2f}, {adj_max:.2f}] minuti")
+        print(f"    • Media aggiustamenti: {adj_mean:.2f} minuti")
+        print(f"    • Aggiustamenti significativi (>5min): {int(significant)}/{len(first_time_adj)}")
     
     print("\n" + "="*70)
     print("  ✨ Sistema validato con successo!")
@@ -112,4 +156,4 @@ def quick_train():
 
 
 if __name__ == "__main__":
-    quick_train()
+    quick_train(parse_args())
@@ -17,9 +17,51 @@ from python.scheduling.opposite_train_optimizer import (
     TrainPath
 )
 from datetime import datetime, timedelta
+import numpy as np
 
 
-def test_forced_crossing_scenario():
+# Campi numerici di ScheduleProposal, orari in secondi dal riferimento
+PROPOSAL_DTYPE = np.dtype([
+    ('t1', 'f8'), ('t2', 'f8'), ('delay', 'f8'), ('conf', 'f8'), ('km', 'f8')
+])
+_TIME_REFERENCE = datetime(1970, 1, 1)
+
+
+def proposals_to_arrays(proposals):
+    """Impacchetta le proposte in un array strutturato (un solo passaggio)."""
+    return np.fromiter(
+        (((p.train1_departure - _TIME_REFERENCE).total_seconds(),
+          (p.train2_departure - _TIME_REFERENCE).total_seconds(),
+          p.total_delay_minutes,
+          p.confidence,
+          p.crossing_point_km) for p in proposals),
+        dtype=PROPOSAL_DTYPE, count=len(proposals)
+    )
+
+
+def departure_gaps(arr):
+    """Gap tra le partenze in minuti, per ogni proposta."""
+    return np.abs(arr['t2'] - arr['t1']) / 60
+
+
+def build_line_sections():
+    """
+    Linea di 30 km condivisa dagli scenari: 24 km a singolo binario, con
+    un'unica stazione di incrocio intermedia (Centrale, km 14-16).
+    """
+    return [
+        TrackSection(1, 0.0, 2.0, num_tracks=2, max_speed_kmh=80.0, has_station=True,
+                    station_name="Stazione A", can_cross=True),
+        TrackSection(2, 2.0, 14.0, num_tracks=1, max_speed_kmh=100.0, has_station=False),  # 12 km SINGOLO
+        TrackSection(3, 14.0, 16.0, num_tracks=2, max_speed_kmh=70.0, has_station=True,
+                    station_name="Stazione Centrale", can_cross=True),
+        TrackSection(4, 16.0, 28.0, num_tracks=1, max_speed_kmh=100.0, has_station=False),  # 12 km SINGOLO
+        TrackSection(5, 28.0, 30.0, num_tracks=2, max_speed_kmh=80.0, has_station=True,
+                    station_name="Stazione B", can_cross=True),
+    ]
+
+
+def test_forced_crossing_scenario(scheduler=None):
     """
     SCENARIO CRITICO: Incrocio Obbligatorio
     
@@ -35,18 +77,6 @@ def test_forced_crossing_scenario():
     print("⚠️  SCENARIO CRITICO: INCROCIO OBBLIGATORIO")
     print("="*80)
     
-    # Rete con sezione singolo binario molto lunga
-    sections = [
-        TrackSection(1, 0.0, 2.0, num_tracks=2, max_speed_kmh=80.0, has_station=True,
-                    station_name="Stazione A", can_cross=True),
-        TrackSection(2, 2.0, 14.0, num_tracks=1, max_speed_kmh=100.0, has_station=False),  # 12 km SINGOLO
-        TrackSection(3, 14.0, 16.0, num_tracks=2, max_speed_kmh=70.0, has_station=True,
-                    station_name="Stazione Centrale", can_cross=True),
-        TrackSection(4, 16.0, 28.0, num_tracks=1, max_speed_kmh=100.0, has_station=False),  # 12 km SINGOLO
-        TrackSection(5, 28.0, 30.0, num_tracks=2, max_speed_kmh=80.0, has_station=True,
-                    station_name="Stazione B", can_cross=True),
-    ]
-    
     # Orario base
     base_time = datetime(2025, 11, 19, 10, 0)
     
@@ -99,7 +129,8 @@ def test_forced_crossing_scenario():
     print(f"   Entrambi in sezione singolo binario → CONFLITTO INEVITABILE")
     
     # Ottimizza
-    scheduler = OppositeTrainScheduler(sections)
+    if scheduler is None:
+        scheduler = OppositeTrainScheduler(build_line_sections())
     
     # Test con finestra stretta
     print(f"\n🔄 Ottimizzazione con finestra stretta (±15 min)...")
@@ -117,11 +148,11 @@ def test_forced_crossing_scenario():
     
     print(f"\n✅ Trovate {len(proposals)} soluzioni")
     
+    gaps = departure_gaps(proposals_to_arrays(proposals))
+    
     # Analisi top 3
     print(f"\n🏆 TOP 3 SOLUZIONI:\n")
-    for i, p in enumerate(proposals[:3], 1):
-        gap_minutes = abs((p.train2_departure - p.train1_departure).total_seconds() / 60)
-        
+    for i, (p, gap_minutes) in enumerate(zip(proposals[:3], gaps), 1):
         print(f"   {i}. Confidence: {p.confidence:.1%}")
         print(f"      • {train1.train_id}: {p.train1_departure.strftime('%H:%M')}")
         print(f"      • {train2.train_id}: {p.train2_departure.strftime('%H:%M')}")
@@ -145,7 +176,7 @@ def test_forced_crossing_scenario():
     print(f"📈 ANALISI DETTAGLIATA MIGLIORE SOLUZIONE:")
     print(f"\n   Strategia adottata:")
     
-    gap = abs((best.train2_departure - best.train1_departure).total_seconds() / 60)
+    gap = gaps[0]
     if gap < 5:
         print(f"   • Partenze quasi simultanee (gap {gap:.1f} min)")
         print(f"   • Sistema ha coordinato incrocio alla stazione")
@@ -169,7 +200,7 @@ def test_forced_crossing_scenario():
     print(f"   • Qualità soluzione: {quality}")
 
 
-def test_high_frequency_conflict():
+def test_high_frequency_conflict(scheduler=None):
     """
     SCENARIO 2: Alta Frequenza con Conflitti Multipli
     
@@ -180,17 +211,6 @@ def test_high_frequency_conflict():
     print("🚦 SCENARIO 2: ALTA FREQUENZA CON CONFLITTI MULTIPLI")
     print("="*80)
     
-    sections = [
-        TrackSection(1, 0.0, 2.0, num_tracks=2, max_speed_kmh=80.0, has_station=True,
-                    station_name="Stazione A", can_cross=True),
-        TrackSection(2, 2.0, 14.0, num_tracks=1, max_speed_kmh=100.0, has_station=False),
-        TrackSection(3, 14.0, 16.0, num_tracks=2, max_speed_kmh=70.0, has_station=True,
-                    station_name="Stazione Centrale", can_cross=True),
-        TrackSection(4, 16.0, 28.0, num_tracks=1, max_speed_kmh=100.0, has_station=False),
-        TrackSection(5, 28.0, 30.0, num_tracks=2, max_speed_kmh=80.0, has_station=True,
-                    station_name="Stazione B", can_cross=True),
-    ]
-    
     base_time = datetime(2025, 11, 19, 14, 0)
     
     train1 = TrainPath(
@@ -219,7 +239,8 @@ def test_high_frequency_conflict():
     print(f"   Treni ogni 10 minuti in entrambe le direzioni")
     print(f"   Finestra: 14:00 - 15:00 (6 slot per direzione)")
     
-    scheduler = OppositeTrainScheduler(sections)
+    if scheduler is None:
+        scheduler = OppositeTrainScheduler(build_line_sections())
     
     proposals = scheduler.find_optimal_schedule(
         train1, train2,
@@ -232,17 +253,19 @@ def test_high_frequency_conflict():
         print(f"\n✅ Trovate {len(proposals)} combinazioni valide")
         print(f"\n🏆 MIGLIORI 5 SLOT ORARI:\n")
         
-        for i, p in enumerate(proposals[:5], 1):
-            gap = abs((p.train2_departure - p.train1_departure).total_seconds() / 60)
+        top5 = proposals_to_arrays(proposals[:5])
+        gaps = departure_gaps(top5)
+        
+        for i, (p, gap) in enumerate(zip(proposals[:5], gaps), 1):
             print(f"   {i}. {p.train1_departure.strftime('%H:%M')} ↔ {p.train2_departure.strftime('%H:%M')}")
             print(f"      Gap: {gap:.0f} min, Attesa: {p.total_delay_minutes:.1f} min, "
                   f"Confidence: {p.confidence:.0%}")
         
         best = proposals[0]
         print(f"\n📊 Statistiche:")
-        print(f"   Attesa media migliori 5: {sum(p.total_delay_minutes for p in proposals[:5])/5:.1f} min")
-        print(f"   Confidence media: {sum(p.confidence for p in proposals[:5])/5:.1%}")
-        print(f"   Range gap partenze: {min(abs((p.train2_departure - p.train1_departure).total_seconds()/60) for p in proposals[:5]):.0f}-{max(abs((p.train2_departure - p.train1_departure).total_seconds()/60) for p in proposals[:5]):.0f} min")
+        print(f"   Attesa media migliori 5: {top5['delay'].mean():.1f} min")
+        print(f"   Confidence media: {top5['conf'].mean():.1%}")
+        print(f"   Range gap partenze: {gaps.min():.0f}-{gaps.max():.0f} min")
 
 
 if __name__ == '__main__':
@@ -255,8 +278,10 @@ if __name__ == '__main__':
     
     start = time.time()
     
-    test_forced_crossing_scenario()
-    test_high_frequency_conflict()
+    # Stessa linea per entrambi gli scenari: scheduler costruito una volta
+    scheduler = OppositeTrainScheduler(build_line_sections())
+    test_forced_crossing_scenario(scheduler)
+    test_high_frequency_conflict(scheduler)
     
     elapsed = time.time() - start
     
@@ -13,6 +13,7 @@ Caratteristiche realistiche:
 - Traffico merci lento esistente
 """
 
+import functools
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -22,12 +23,36 @@ from python.scheduling.opposite_train_optimizer import (
     TrackSection,
     TrainPath,
     ExistingTrain,
-    ScheduleProposal
+    ScheduleProblem,
+    ScheduleProposal,
+    warm_up_kernels
 )
 from datetime import datetime, timedelta
+from typing import List
 import json
 
+# Compilazione JIT una volta per processo, prima degli scenari
+warm_up_kernels()
 
+
+# Blocco di testo di una proposta nel report dello scenario 1
+_PROPOSAL_TMPL = (
+    "\n   {i}. Proposta (Confidence: {confidence:.2%})\n"
+    "      • {train1}: Partenza {departure1}\n"
+    "      • {train2}: Partenza {departure2}\n"
+    "      • Incrocio: km {crossing_km:.1f} alle {crossing_time}\n"
+    "      • Attese: {wait1:.1f} + {wait2:.1f} = {total_delay:.1f} min\n"
+    "      • Conflitti risolti: {conflicts}\n"
+    "      • {reasoning}"
+)
+
+
+def hm(dt: datetime) -> str:
+    """Orario HH:MM (equivale a strftime('%H:%M') senza passare da strftime)."""
+    return f"{dt.hour:02d}:{dt.minute:02d}"
+
+
+@functools.lru_cache(maxsize=1)
 def create_realistic_italian_regional_line():
     """
     Simula linea regionale secondaria italiana tipica:
@@ -40,6 +65,9 @@ def create_realistic_italian_regional_line():
     Totale: 65 km
     - Doppio binario: 30 km (46%) nelle stazioni e dintorni
     - Singolo binario: 35 km (54%) tratte campagna/montagna
+    
+    Le sezioni sono immutabili: la tupla è costruita una sola volta e
+    condivisa da tutti gli scenari.
     """
     sections = []
     
@@ -139,10 +167,22 @@ def create_realistic_italian_regional_line():
         can_cross=True
     ))
     
-    return sections
+    return tuple(sections)
 
 
-def test_scenario_1_commuters_peak():
+# Scheduler condiviso dagli scenari: dipende solo dalla linea, non dai treni
+_SCHEDULER = None
+
+
+def get_scheduler() -> OppositeTrainScheduler:
+    """Restituisce lo scheduler della linea regionale, creato al primo uso."""
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        _SCHEDULER = OppositeTrainScheduler(create_realistic_italian_regional_line())
+    return _SCHEDULER
+
+
+def scenario_1_commuters_peak() -> ScheduleProblem:
     """
     SCENARIO 1: Ora di Punta Pendolari (7:00-9:00)
     
@@ -151,12 +191,6 @@ def test_scenario_1_commuters_peak():
     
     Sfida: Alta frequenza (ogni 30 min), entrambi fanno fermate.
     """
-    print("\n" + "="*80)
-    print("🌅 SCENARIO 1: ORA DI PUNTA PENDOLARI (7:00-9:00)")
-    print("="*80)
-    
-    sections = create_realistic_italian_regional_line()
-    
     # Orari iniziali (saranno ottimizzati dal sistema)
     start_time = datetime(2025, 11, 19, 7, 0)
     end_time = datetime(2025, 11, 19, 9, 0)
@@ -205,55 +239,86 @@ def test_scenario_1_commuters_peak():
         )
     ]
     
-    scheduler = OppositeTrainScheduler(sections)
-    
-    print(f"\n📊 Configurazione Rete:")
-    print(f"   Lunghezza totale: 65 km")
-    print(f"   Sezioni singolo binario: 3 (35 km = 54%)")
-    print(f"   Stazioni incrocio disponibili: 5")
-    
-    print(f"\n🚂 Treni:")
-    print(f"   {train1.train_id}: {train1.start_km}→{train1.end_km} km, {len(train1.stops)} fermate")
-    print(f"   {train2.train_id}: {train2.start_km}→{train2.end_km} km, {len(train2.stops)} fermate")
-    print(f"   Traffico esistente: {len(existing_traffic)} treno merci (km {existing_traffic[0].position_km})")
-    
-    print(f"\n⏰ Finestra temporale: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}")
-    print(f"   Frequenza: ogni 30 minuti (alta frequenza)")
-    
-    proposals = scheduler.find_optimal_schedule(
+    return ScheduleProblem(
         train1, train2,
         start_time, end_time,
         frequency_minutes=30,
         existing_traffic=existing_traffic
     )
+
+
+def report_scenario_1_commuters_peak(problem: ScheduleProblem, proposals: List[ScheduleProposal]):
+    """Stampa configurazione e risultati dello scenario 1."""
+    # Report accumulato e scritto in blocco alla fine
+    lines = []
+    lines.append("\n" + "="*80)
+    lines.append("🌅 SCENARIO 1: ORA DI PUNTA PENDOLARI (7:00-9:00)")
+    lines.append("="*80)
+    
+    train1, train2 = problem.train1, problem.train2
+    existing_traffic = problem.existing_traffic
+    start_time, end_time = problem.time_window_start, problem.time_window_end
+    
+    lines.append(f"\n📊 Configurazione Rete:")
+    lines.append(f"   Lunghezza totale: 65 km")
+    lines.append(f"   Sezioni singolo binario: 3 (35 km = 54%)")
+    lines.append(f"   Stazioni incrocio disponibili: 5")
+    
+    lines.append(f"\n🚂 Treni:")
+    lines.append(f"   {train1.train_id}: {train1.start_km}→{train1.end_km} km, {len(train1.stops)} fermate")
+    lines.append(f"   {train2.train_id}: {train2.start_km}→{train2.end_km} km, {len(train2.stops)} fermate")
+    lines.append(f"   Traffico esistente: {len(existing_traffic)} treno merci (km {existing_traffic[0].position_km})")
+    
+    lines.append(f"\n⏰ Finestra temporale: {hm(start_time)} - {hm(end_time)}")
+    lines.append(f"   Frequenza: ogni 30 minuti (alta frequenza)")
     
     if not proposals:
-        print("\n❌ NESSUNA SOLUZIONE TROVATA!")
+        lines.append("\n❌ NESSUNA SOLUZIONE TROVATA!")
+        print("\n".join(lines))
         return
     
-    print(f"\n✅ Trovate {len(proposals)} proposte valide")
+    lines.append(f"\n✅ Trovate {len(proposals)} proposte valide")
     
     # Mostra top 3
-    print(f"\n🏆 TOP 3 SOLUZIONI:")
-    for i, p in enumerate(proposals[:3], 1):
-        print(f"\n   {i}. Proposta (Confidence: {p.confidence:.2%})")
-        print(f"      • {train1.train_id}: Partenza {p.train1_departure.strftime('%H:%M')}")
-        print(f"      • {train2.train_id}: Partenza {p.train2_departure.strftime('%H:%M')}")
-        print(f"      • Incrocio: km {p.crossing_point_km:.1f} alle {p.crossing_time.strftime('%H:%M')}")
-        print(f"      • Attese: {p.train1_wait_minutes:.1f} + {p.train2_wait_minutes:.1f} = {p.total_delay_minutes:.1f} min")
-        print(f"      • Conflitti risolti: {p.conflicts_avoided}")
-        print(f"      • {p.reasoning}")
+    lines.append(f"\n🏆 TOP 3 SOLUZIONI:")
+    lines.extend(
+        _PROPOSAL_TMPL.format_map({
+            'i': i,
+            'confidence': p.confidence,
+            'train1': train1.train_id,
+            'departure1': hm(p.train1_departure),
+            'train2': train2.train_id,
+            'departure2': hm(p.train2_departure),
+            'crossing_km': p.crossing_point_km,
+            'crossing_time': hm(p.crossing_time),
+            'wait1': p.train1_wait_minutes,
+            'wait2': p.train2_wait_minutes,
+            'total_delay': p.total_delay_minutes,
+            'conflicts': p.conflicts_avoided,
+            'reasoning': p.reasoning,
+        })
+        for i, p in enumerate(proposals[:3], 1)
+    )
     
     # Analisi dettagliata migliore soluzione
     best = proposals[0]
-    print(f"\n📈 ANALISI DETTAGLIATA MIGLIORE SOLUZIONE:")
-    print(f"   Tempo viaggio {train1.train_id}: {calculate_journey_time(train1)} min")
-    print(f"   Tempo viaggio {train2.train_id}: {calculate_journey_time(train2)} min")
-    print(f"   Ritardo percentuale: {(best.total_delay_minutes / calculate_journey_time(train1)) * 100:.1f}%")
-    print(f"   Efficienza: {'OTTIMA' if best.confidence > 0.9 else 'BUONA' if best.confidence > 0.7 else 'ACCETTABILE'}")
+    lines.append(f"\n📈 ANALISI DETTAGLIATA MIGLIORE SOLUZIONE:")
+    lines.append(f"   Tempo viaggio {train1.train_id}: {train1.journey_time_minutes} min")
+    lines.append(f"   Tempo viaggio {train2.train_id}: {train2.journey_time_minutes} min")
+    lines.append(f"   Ritardo percentuale: {(best.total_delay_minutes / train1.journey_time_minutes) * 100:.1f}%")
+    lines.append(f"   Efficienza: {'OTTIMA' if best.confidence > 0.9 else 'BUONA' if best.confidence > 0.7 else 'ACCETTABILE'}")
+    
+    print("\n".join(lines))
 
 
-def test_scenario_2_low_frequency_tourist():
+def test_scenario_1_commuters_peak():
+    """Risolve e stampa lo scenario 1 da solo."""
+    problem = scenario_1_commuters_peak()
+    proposals = get_scheduler().find_optimal_schedule_batch([problem])[0]
+    report_scenario_1_commuters_peak(problem, proposals)
+
+
+def scenario_2_low_frequency_tourist() -> ScheduleProblem:
     """
     SCENARIO 2: Linea Turistica Bassa Frequenza
     
@@ -262,12 +327,6 @@ def test_scenario_2_low_frequency_tourist():
     
     Sfida: Velocità molto diverse, treno lento blocca singolo binario.
     """
-    print("\n" + "="*80)
-    print("🎭 SCENARIO 2: TRENO TURISTICO vs REGIONALE VELOCE")
-    print("="*80)
-    
-    sections = create_realistic_italian_regional_line()
-    
     # Finestra più ampia (bassa frequenza)
     start_time = datetime(2025, 11, 19, 10, 0)
     end_time = datetime(2025, 11, 19, 14, 0)
@@ -304,38 +363,56 @@ def test_scenario_2_low_frequency_tourist():
         priority=8  # Alta priorità
     )
     
-    scheduler = OppositeTrainScheduler(sections)
-    
-    print(f"\n🚂 Configurazione:")
-    print(f"   {train1.train_id}: {train1.avg_speed_kmh} km/h (lento), {len(train1.stops)} fermate, priorità {train1.priority}")
-    print(f"   {train2.train_id}: {train2.avg_speed_kmh} km/h (veloce), {len(train2.stops)} fermate, priorità {train2.priority}")
-    
-    proposals = scheduler.find_optimal_schedule(
+    return ScheduleProblem(
         train1, train2,
         start_time, end_time,
         frequency_minutes=60  # Ogni ora
     )
+
+
+def report_scenario_2_low_frequency_tourist(problem: ScheduleProblem, proposals: List[ScheduleProposal]):
+    """Stampa configurazione e risultati dello scenario 2."""
+    # Report accumulato e scritto in blocco alla fine
+    lines = []
+    lines.append("\n" + "="*80)
+    lines.append("🎭 SCENARIO 2: TRENO TURISTICO vs REGIONALE VELOCE")
+    lines.append("="*80)
+    
+    train1, train2 = problem.train1, problem.train2
+    
+    lines.append(f"\n🚂 Configurazione:")
+    lines.append(f"   {train1.train_id}: {train1.avg_speed_kmh} km/h (lento), {len(train1.stops)} fermate, priorità {train1.priority}")
+    lines.append(f"   {train2.train_id}: {train2.avg_speed_kmh} km/h (veloce), {len(train2.stops)} fermate, priorità {train2.priority}")
     
     if proposals:
         best = proposals[0]
-        print(f"\n🏆 SOLUZIONE OTTIMALE:")
-        print(f"   Turistico 99: {best.train1_departure.strftime('%H:%M')}")
-        print(f"   R 2305: {best.train2_departure.strftime('%H:%M')}")
-        print(f"   Gap partenze: {abs((best.train2_departure - best.train1_departure).total_seconds() / 60):.0f} min")
-        print(f"   Incrocio: km {best.crossing_point_km:.1f}")
-        print(f"   Attesa totale: {best.total_delay_minutes:.1f} min")
-        print(f"   Confidence: {best.confidence:.2%}")
+        lines.append(f"\n🏆 SOLUZIONE OTTIMALE:")
+        lines.append(f"   Turistico 99: {hm(best.train1_departure)}")
+        lines.append(f"   R 2305: {hm(best.train2_departure)}")
+        lines.append(f"   Gap partenze: {abs((best.train2_departure - best.train1_departure).total_seconds() / 60):.0f} min")
+        lines.append(f"   Incrocio: km {best.crossing_point_km:.1f}")
+        lines.append(f"   Attesa totale: {best.total_delay_minutes:.1f} min")
+        lines.append(f"   Confidence: {best.confidence:.2%}")
         
         # Chi attende di più?
         if best.train1_wait_minutes > best.train2_wait_minutes:
-            print(f"\n   ⚠️  Treno LENTO attende di più ({best.train1_wait_minutes:.1f} min)")
-            print(f"       → Strategia corretta: priorità al veloce")
+            lines.append(f"\n   ⚠️  Treno LENTO attende di più ({best.train1_wait_minutes:.1f} min)")
+            lines.append(f"       → Strategia corretta: priorità al veloce")
         else:
-            print(f"\n   ⚠️  Treno VELOCE attende di più ({best.train2_wait_minutes:.1f} min)")
-            print(f"       → Potrebbe causare ritardi a cascata")
+            lines.append(f"\n   ⚠️  Treno VELOCE attende di più ({best.train2_wait_minutes:.1f} min)")
+            lines.append(f"       → Potrebbe causare ritardi a cascata")
+    
+    print("\n".join(lines))
 
 
-def test_scenario_3_emergency_high_priority():
+def test_scenario_2_low_frequency_tourist():
+    """Risolve e stampa lo scenario 2 da solo."""
+    problem = scenario_2_low_frequency_tourist()
+    proposals = get_scheduler().find_optimal_schedule_batch([problem])[0]
+    report_scenario_2_low_frequency_tourist(problem, proposals)
+
+
+def scenario_3_emergency_high_priority() -> ScheduleProblem:
     """
     SCENARIO 3: Treno Prioritario (Ambulanza/VIP)
     
@@ -344,12 +421,6 @@ def test_scenario_3_emergency_high_priority():
     
     Sfida: Garantire passaggio immediato al treno prioritario.
     """
-    print("\n" + "="*80)
-    print("🚨 SCENARIO 3: TRENO PRIORITARIO EMERGENZA")
-    print("="*80)
-    
-    sections = create_realistic_italian_regional_line()
-    
     start_time = datetime(2025, 11, 19, 15, 0)
     end_time = datetime(2025, 11, 19, 16, 0)
     
@@ -377,40 +448,58 @@ def test_scenario_3_emergency_high_priority():
         priority=10  # MASSIMA PRIORITÀ
     )
     
-    scheduler = OppositeTrainScheduler(sections)
-    
-    print(f"\n🚂 Treni:")
-    print(f"   {train1.train_id}: Priorità {train1.priority} (normale)")
-    print(f"   {train2.train_id}: Priorità {train2.priority} (EMERGENZA) ⚠️")
-    
-    proposals = scheduler.find_optimal_schedule(
+    return ScheduleProblem(
         train1, train2,
         start_time, end_time,
         frequency_minutes=15
     )
+
+
+def report_scenario_3_emergency_high_priority(problem: ScheduleProblem, proposals: List[ScheduleProposal]):
+    """Stampa configurazione e risultati dello scenario 3."""
+    # Report accumulato e scritto in blocco alla fine
+    lines = []
+    lines.append("\n" + "="*80)
+    lines.append("🚨 SCENARIO 3: TRENO PRIORITARIO EMERGENZA")
+    lines.append("="*80)
+    
+    train1, train2 = problem.train1, problem.train2
+    
+    lines.append(f"\n🚂 Treni:")
+    lines.append(f"   {train1.train_id}: Priorità {train1.priority} (normale)")
+    lines.append(f"   {train2.train_id}: Priorità {train2.priority} (EMERGENZA) ⚠️")
     
     if proposals:
         best = proposals[0]
-        print(f"\n🏆 SOLUZIONE:")
-        print(f"   {train1.train_id}: {best.train1_departure.strftime('%H:%M')}")
-        print(f"   {train2.train_id}: {best.train2_departure.strftime('%H:%M')}")
-        print(f"   Incrocio: km {best.crossing_point_km:.1f}")
+        lines.append(f"\n🏆 SOLUZIONE:")
+        lines.append(f"   {train1.train_id}: {hm(best.train1_departure)}")
+        lines.append(f"   {train2.train_id}: {hm(best.train2_departure)}")
+        lines.append(f"   Incrocio: km {best.crossing_point_km:.1f}")
         
         # Verifica chi attende di più
         priority_train_wait = best.train2_wait_minutes
         normal_train_wait = best.train1_wait_minutes
         
-        print(f"\n   Attese:")
-        print(f"   • Treno normale: {normal_train_wait:.1f} min")
-        print(f"   • Treno emergenza: {priority_train_wait:.1f} min")
+        lines.append(f"\n   Attese:")
+        lines.append(f"   • Treno normale: {normal_train_wait:.1f} min")
+        lines.append(f"   • Treno emergenza: {priority_train_wait:.1f} min")
         
         if priority_train_wait < normal_train_wait:
-            print(f"\n   ✅ CORRETTO: Treno emergenza attende meno ({priority_train_wait:.1f} vs {normal_train_wait:.1f} min)")
+            lines.append(f"\n   ✅ CORRETTO: Treno emergenza attende meno ({priority_train_wait:.1f} vs {normal_train_wait:.1f} min)")
         else:
-            print(f"\n   ⚠️  ATTENZIONE: Treno emergenza attende più del normale!")
+            lines.append(f"\n   ⚠️  ATTENZIONE: Treno emergenza attende più del normale!")
+    
+    print("\n".join(lines))
 
 
-def test_scenario_4_multiple_conflicts():
+def test_scenario_3_emergency_high_priority():
+    """Risolve e stampa lo scenario 3 da solo."""
+    problem = scenario_3_emergency_high_priority()
+    proposals = get_scheduler().find_optimal_schedule_batch([problem])[0]
+    report_scenario_3_emergency_high_priority(problem, proposals)
+
+
+def scenario_4_multiple_conflicts() -> ScheduleProblem:
     """
     SCENARIO 4: Congestione con Traffico Denso
     
@@ -418,12 +507,6 @@ def test_scenario_4_multiple_conflicts():
     
     Sfida: Coordinare con traffico già presente.
     """
-    print("\n" + "="*80)
-    print("🚦 SCENARIO 4: TRAFFICO DENSO CON CONGESTIONE")
-    print("="*80)
-    
-    sections = create_realistic_italian_regional_line()
-    
     start_time = datetime(2025, 11, 19, 16, 30)
     end_time = datetime(2025, 11, 19, 18, 30)
     
@@ -456,46 +539,66 @@ def test_scenario_4_multiple_conflicts():
         ExistingTrain("IC 605", 55.0, 110.0, "backward", {}),
     ]
     
-    scheduler = OppositeTrainScheduler(sections)
-    
-    print(f"\n🚂 Treni da schedulare:")
-    print(f"   {train1.train_id}: {train1.start_km}→{train1.end_km} km")
-    print(f"   {train2.train_id}: {train2.start_km}→{train2.end_km} km")
-    
-    print(f"\n🚧 Traffico esistente ({len(existing_traffic)} treni):")
-    for t in existing_traffic:
-        print(f"   • {t.train_id}: km {t.position_km}, {t.velocity_kmh} km/h, direzione {t.direction}")
-    
-    proposals = scheduler.find_optimal_schedule(
+    return ScheduleProblem(
         train1, train2,
         start_time, end_time,
         frequency_minutes=30,
         existing_traffic=existing_traffic
     )
+
+
+def report_scenario_4_multiple_conflicts(problem: ScheduleProblem, proposals: List[ScheduleProposal]):
+    """Stampa configurazione e risultati dello scenario 4."""
+    # Report accumulato e scritto in blocco alla fine
+    lines = []
+    lines.append("\n" + "="*80)
+    lines.append("🚦 SCENARIO 4: TRAFFICO DENSO CON CONGESTIONE")
+    lines.append("="*80)
+    
+    train1, train2 = problem.train1, problem.train2
+    existing_traffic = problem.existing_traffic
+    
+    lines.append(f"\n🚂 Treni da schedulare:")
+    lines.append(f"   {train1.train_id}: {train1.start_km}→{train1.end_km} km")
+    lines.append(f"   {train2.train_id}: {train2.start_km}→{train2.end_km} km")
+    
+    lines.append(f"\n🚧 Traffico esistente ({len(existing_traffic)} treni):")
+    for t in existing_traffic:
+        lines.append(f"   • {t.train_id}: km {t.position_km}, {t.velocity_kmh} km/h, direzione {t.direction}")
     
     if proposals:
-        print(f"\n✅ Trovate {len(proposals)} soluzioni valide con traffico denso")
+        lines.append(f"\n✅ Trovate {len(proposals)} soluzioni valide con traffico denso")
         best = proposals[0]
         
-        print(f"\n🏆 MIGLIORE SOLUZIONE:")
-        print(f"   {train1.train_id}: {best.train1_departure.strftime('%H:%M')}")
-        print(f"   {train2.train_id}: {best.train2_departure.strftime('%H:%M')}")
-        print(f"   Incrocio: km {best.crossing_point_km:.1f} alle {best.crossing_time.strftime('%H:%M')}")
-        print(f"   Ritardo totale: {best.total_delay_minutes:.1f} min")
-        print(f"   Conflitti evitati: {best.conflicts_avoided}")
-        print(f"   Confidence: {best.confidence:.2%}")
-        print(f"\n   {best.reasoning}")
+        lines.append(f"\n🏆 MIGLIORE SOLUZIONE:")
+        lines.append(f"   {train1.train_id}: {hm(best.train1_departure)}")
+        lines.append(f"   {train2.train_id}: {hm(best.train2_departure)}")
+        lines.append(f"   Incrocio: km {best.crossing_point_km:.1f} alle {hm(best.crossing_time)}")
+        lines.append(f"   Ritardo totale: {best.total_delay_minutes:.1f} min")
+        lines.append(f"   Conflitti evitati: {best.conflicts_avoided}")
+        lines.append(f"   Confidence: {best.confidence:.2%}")
+        lines.append(f"\n   {best.reasoning}")
     else:
-        print(f"\n❌ NESSUNA SOLUZIONE con traffico attuale!")
-        print(f"   → Necessario ritardare/cancellare treni esistenti")
+        lines.append(f"\n❌ NESSUNA SOLUZIONE con traffico attuale!")
+        lines.append(f"   → Necessario ritardare/cancellare treni esistenti")
+    
+    print("\n".join(lines))
+
+
+def test_scenario_4_multiple_conflicts():
+    """Risolve e stampa lo scenario 4 da solo."""
+    problem = scenario_4_multiple_conflicts()
+    proposals = get_scheduler().find_optimal_schedule_batch([problem])[0]
+    report_scenario_4_multiple_conflicts(problem, proposals)
 
 
-def calculate_journey_time(train: TrainPath) -> float:
-    """Calcola tempo totale di viaggio in minuti."""
-    distance = abs(train.end_km - train.start_km)
-    travel_time = (distance / train.avg_speed_kmh) * 60
-    stop_time = sum(stop[1] for stop in train.stops)
-    return travel_time + stop_time
+# Coppie (costruzione problema, report) nell'ordine di esecuzione
+SCENARIOS = [
+    (scenario_1_commuters_peak, report_scenario_1_commuters_peak),
+    (scenario_2_low_frequency_tourist, report_scenario_2_low_frequency_tourist),
+    (scenario_3_emergency_high_priority, report_scenario_3_emergency_high_priority),
+    (scenario_4_multiple_conflicts, report_scenario_4_multiple_conflicts),
+]
 
 
 def run_comprehensive_analysis():
@@ -512,11 +615,11 @@ def run_comprehensive_analysis():
     print("\n   [A]═══8km═══[B]───18km SINGOLO───[C]═══5km═══[D]")
     print("       ───12km SINGOLO───[E]═══10km═══[F]───5km SINGOLO───[G]")
     
-    # Esegui tutti gli scenari
-    test_scenario_1_commuters_peak()
-    test_scenario_2_low_frequency_tourist()
-    test_scenario_3_emergency_high_priority()
-    test_scenario_4_multiple_conflicts()
+    # Stessa rete per tutti gli scenari: una sola ricerca batch, poi i report
+    problems = [build() for build, _ in SCENARIOS]
+    results = get_scheduler().find_optimal_schedule_batch(problems)
+    for (_, report), problem, proposals in zip(SCENARIOS, problems, results):
+        report(problem, proposals)
     
     # Summary finale
     print("\n" + "="*80)
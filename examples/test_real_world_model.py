@@ -2,6 +2,7 @@
 Test del modello addestrato su dati realistici italiani e UK.
 """
 
+import functools
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -10,21 +11,21 @@ import torch
 import numpy as np
 from python.models.scheduler_network import SchedulerNetwork
 
-def test_model():
-    """Test rapido del modello real-world."""
+MODEL_PATH = 'models/scheduler_real_world.pth'
+
+
+@functools.lru_cache(maxsize=1)
+def load_model(path=MODEL_PATH):
+    """
+    Carica checkpoint e modello una sola volta per processo.
     
-    print("\n" + "="*70)
-    print("  🧪 TEST MODELLO REAL-WORLD (ITALIAN + UK DATA)")
-    print("="*70 + "\n")
+    Il modello viene tracciato con TorchScript (come in export_model.py),
+    così forward non passa dal dispatch Python a ogni inferenza.
     
-    # Carica modello
-    checkpoint = torch.load('models/scheduler_real_world.pth', map_location='cpu')
-    
-    print("📊 Informazioni modello:")
-    print(f"  • Epoca: {checkpoint['epoch']}")
-    print(f"  • Train loss: {checkpoint['train_loss']:.4f}")
-    print(f"  • Val loss: {checkpoint['val_loss']:.4f}")
-    print(f"  • Parametri: {sum(p.numel() for p in checkpoint['model_state_dict'].values()):,}")
+    Returns:
+        (checkpoint, modello TorchScript in eval)
+    """
+    checkpoint = torch.load(path, map_location='cpu')
     
     config = checkpoint['config']
     model = SchedulerNetwork(
@@ -38,27 +39,66 @@ def test_model():
     model.load_state_dict(checkpoint['model_state_dict'])
     model.eval()
     
+    example_inputs = (
+        torch.randn(1, model.num_tracks + model.num_stations),
+        torch.randn(1, model.num_trains, 8)
+    )
+    scripted = torch.jit.trace(model, example_inputs, strict=False)
+    
+    return checkpoint, scripted
+
+
+def test_model(num_runs=10):
+    """Test rapido del modello real-world (tempo medio su num_runs inferenze)."""
+    
+    print("\n" + "="*70)
+    print("  🧪 TEST MODELLO REAL-WORLD (ITALIAN + UK DATA)")
+    print("="*70 + "\n")
+    
+    # Carica modello (cache: disco e tracing solo alla prima chiamata)
+    checkpoint, model = load_model()
+    
+    print("📊 Informazioni modello:")
+    print(f"  • Epoca: {checkpoint['epoch']}")
+    print(f"  • Train loss: {checkpoint['train_loss']:.4f}")
+    print(f"  • Val loss: {checkpoint['val_loss']:.4f}")
+    # Conteggio salvato nel checkpoint dal training; i checkpoint vecchi non lo hanno
+    num_parameters = checkpoint.get('num_parameters')
+    if num_parameters is None:
+        num_parameters = sum(p.numel() for p in checkpoint['model_state_dict'].values())
+    print(f"  • Parametri: {num_parameters:,}")
+    
     # Test inference
     print("\n🚀 Test inference...")
     
-    # Scenario di esempio: Milano-Bologna
-    network_state = torch.randn(1, 80)  # 50 tracks + 30 stations
-    train_states = torch.randn(1, 50, 8)  # 50 treni, 8 features ciascuno
+    # Tensori piccoli: un solo thread evita l'avvio del pool e rende i tempi stabili
+    torch.set_num_threads(1)
+    
+    # Scenario di esempio: Milano-Bologna. Input allocati una volta e
+    # riempiti in place a ogni run
+    network_state = torch.empty(1, 80)  # 50 tracks + 30 stations
+    train_states = torch.empty(1, 50, 8)  # 50 treni, 8 features ciascuno
     
     import time
-    start = time.time()
+    inference_time = 0.0
     
-    with torch.no_grad():
-        outputs = model(network_state, train_states)
+    with torch.inference_mode():
+        for _ in range(num_runs):
+            network_state.normal_()
+            train_states.normal_()
+            
+            start = time.perf_counter()
+            outputs = model(network_state, train_states)
+            inference_time += time.perf_counter() - start
     
-    inference_time = (time.time() - start) * 1000
+    inference_time = inference_time / num_runs * 1000
     
     if isinstance(outputs, dict):
         time_adjustments = outputs['time_adjustments']
     else:
         time_adjustments = outputs[0]
     
-    print(f"  • Inference time: {inference_time:.2f}ms")
+    print(f"  • Inference time: {inference_time:.2f}ms (media su {num_runs} run)")
     print(f"  • Output shape: {time_adjustments.shape}")
     print(f"  • Sample adjustments: {time_adjustments[0][:5].tolist()}")
     
@@ -8,15 +8,32 @@ Uses real parameters from Italian (RFI) and UK (Network Rail) railways:
 - Typical delays
 """
 
+import random
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 import numpy as np
 import argparse
+from dataclasses import dataclass
+from typing import Tuple
 from tqdm import tqdm
 from python.data.data_generator import RailwayNetworkGenerator
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op decorator used when numba is not installed."""
+        def decorator(func):
+            return func
+        return decorator
+
 
 # Real-world railway parameters
 ITALIAN_NETWORKS = {
@@ -75,182 +92,266 @@ UK_NETWORKS = {
 }
 
 
-def generate_realistic_scenario(network_config, num_trains):
-    """Generate scenario based on real network parameters"""
+@dataclass(frozen=True, slots=True)
+class NetworkConfig:
+    """Real-world parameters of one line, built once from the tables above"""
+    name: str
+    country: str  # 'IT' or 'UK'
+    distance_km: int
+    stations: Tuple[str, ...]
+    avg_speed_kmh: int
+    single_track_ratio: float
+    daily_trains: int
+
+
+def _network_configs(networks, country):
+    """Convert a table of network dicts to NetworkConfig instances"""
+    return [
+        NetworkConfig(name=name, country=country, distance_km=cfg["distance_km"],
+                      stations=tuple(cfg["stations"]), avg_speed_kmh=cfg["avg_speed_kmh"],
+                      single_track_ratio=cfg["single_track_ratio"],
+                      daily_trains=cfg["daily_trains"])
+        for name, cfg in networks.items()
+    ]
+
+
+# Italian and UK networks, in dataset order
+NETWORKS = _network_configs(ITALIAN_NETWORKS, 'IT') + _network_configs(UK_NETWORKS, 'UK')
+
+# Per-type train parameters, indexed by type: 0 high_speed, 1 regional, 2 freight
+_SPEED_FACTOR = np.array([1.0, 0.7, 0.5])
+_PRIORITY_LOW = np.array([8, 5, 2])
+_PRIORITY_HIGH = np.array([11, 8, 5])  # exclusive
+_DELAY_PROB = np.array([0.15, 0.25, 0.10])
+
+# Delay minutes of a delayed train, P = 0.4, 0.3, 0.15, 0.1, 0.04, 0.01,
+# stored as the cumulative distribution
+_DELAY_VALUES = np.array([2, 5, 10, 15, 30, 60], dtype=np.int8)
+_DELAY_CDF = np.array([0.4, 0.7, 0.85, 0.95, 0.99, 1.0])
+
+# Divisors of the 8 train_states features: position, velocity, delay,
+# priority, track, destination, time, is_delayed
+_TRAIN_STATE_SCALE = np.array([100.0, 200.0, 60.0, 10.0, 20.0, 10.0, 1.0, 1.0], dtype=np.float32)
+
+# One record per sample in the saved 'metadata' array
+_METADATA_DTYPE = np.dtype([
+    ('network', 'U32'),
+    ('country', 'U2'),
+    ('num_trains', np.int32),
+    ('num_delayed', np.int32),
+    ('num_conflicts', np.int32)
+])
+
+
+@njit
+def _build_conflict_matrix(tracks, positions, out):
+    """
+    Mark pairs of trains on the same track and closer than 10 km.
     
-    num_stations = len(network_config["stations"])
-    total_distance = network_config["distance_km"]
+    One pass over the upper triangle, writing both (i, j) and (j, i) into
+    the zeroed uint8 matrix `out`; no temporary N x N arrays.
     
-    # Create generator with realistic parameters
+    Returns:
+        Number of conflicting pairs
+    """
+    n = tracks.shape[0]
+    num_conflicts = 0
+    for i in range(n):
+        track_i = tracks[i]
+        pos_i = positions[i]
+        for j in range(i + 1, n):
+            if tracks[j] == track_i and abs(positions[j] - pos_i) < 10.0:
+                out[i, j] = 1
+                out[j, i] = 1
+                num_conflicts += 1
+    return num_conflicts
+
+
+def generate_realistic_scenario(network_config: NetworkConfig, num_trains: int):
+    """
+    Generate scenario based on real network parameters.
+    
+    Trains are returned as Structure-of-Arrays: scenario['trains'] maps each
+    field to a [num_trains] array, and every random field is drawn in bulk.
+    """
+    
+    num_stations = len(network_config.stations)
+    total_distance = network_config.distance_km
+    avg_speed = network_config.avg_speed_kmh
+    
+    # Create generator with realistic parameters (a fresh random layout
+    # for every scenario)
     generator = RailwayNetworkGenerator(
         num_stations=num_stations,
         num_tracks=num_stations * 2,  # ~2 tracks per station pair
-        single_track_ratio=network_config["single_track_ratio"]
+        single_track_ratio=network_config.single_track_ratio
     )
     
-    # Generate trains with realistic distribution
-    trains = []
-    for i in range(num_trains):
-        # Realistic speed distribution (high speed, regional, freight)
-        train_type = np.random.choice(
-            ["high_speed", "regional", "freight"],
-            p=[0.4, 0.5, 0.1]
-        )
-        
-        if train_type == "high_speed":
-            base_speed = network_config["avg_speed_kmh"]
-            priority = np.random.randint(8, 11)
-            delay_prob = 0.15
-        elif train_type == "regional":
-            base_speed = network_config["avg_speed_kmh"] * 0.7
-            priority = np.random.randint(5, 8)
-            delay_prob = 0.25
-        else:  # freight
-            base_speed = network_config["avg_speed_kmh"] * 0.5
-            priority = np.random.randint(2, 5)
-            delay_prob = 0.10
-        
-        # Random position along route
-        position = np.random.uniform(0, total_distance)
-        
-        # Realistic delays (when they occur)
-        is_delayed = np.random.random() < delay_prob
-        if is_delayed:
-            # Realistic delay distribution: most are small, few are large
-            delay = np.random.choice(
-                [2, 5, 10, 15, 30, 60],
-                p=[0.4, 0.3, 0.15, 0.1, 0.04, 0.01]
-            )
-        else:
-            delay = 0
-        
-        train = type('Train', (), {
-            'id': i,
-            'position_km': position,
-            'velocity_kmh': base_speed + np.random.uniform(-10, 10),
-            'current_track': np.random.randint(0, num_stations * 2),
-            'destination_station': np.random.randint(0, num_stations),
-            'delay_minutes': delay,
-            'priority': priority,
-            'is_delayed': is_delayed
-        })()
-        
-        trains.append(train)
+    # Realistic speed distribution (high speed, regional, freight): one
+    # draw for the whole scenario, per-type parameters via lookup tables
+    type_idx = np.random.choice(3, size=num_trains, p=[0.4, 0.5, 0.1])
+    base_speed = avg_speed * _SPEED_FACTOR[type_idx]
+    priority = np.random.randint(_PRIORITY_LOW[type_idx], _PRIORITY_HIGH[type_idx])
+    delay_prob = _DELAY_PROB[type_idx]
+    
+    # Random position along route
+    position = np.random.uniform(0, total_distance, num_trains)
+    
+    # Realistic delays (when they occur): most are small, few are large.
+    # Drawn only for delayed trains, by inverting the tabulated CDF
+    is_delayed = np.random.random(num_trains) < delay_prob
+    delay = np.zeros(num_trains, dtype=np.int8)
+    delay[is_delayed] = _DELAY_VALUES[
+        np.searchsorted(_DELAY_CDF, np.random.random(np.count_nonzero(is_delayed)), side='right')
+    ]
+    
+    trains = {
+        'position_km': position,
+        'velocity_kmh': base_speed + np.random.uniform(-10, 10, num_trains),
+        'current_track': np.random.randint(0, num_stations * 2, num_trains),
+        'destination_station': np.random.randint(0, num_stations, num_trains),
+        'delay_minutes': delay,
+        'priority': priority,
+        'is_delayed': is_delayed
+    }
     
     return {
         'generator': generator,
         'trains': trains,
-        'network_name': network_config.get('name', 'Unknown'),
+        'network_name': network_config.name,
         'metadata': {
             'distance_km': total_distance,
             'num_stations': num_stations,
-            'avg_speed': network_config["avg_speed_kmh"],
-            'single_track_ratio': network_config["single_track_ratio"]
+            'avg_speed': avg_speed,
+            'single_track_ratio': network_config.single_track_ratio
         }
     }
 
 
-def create_multi_country_dataset(samples_per_network=50, output_file='data/real_training_data.npz'):
-    """Create dataset from multiple Italian and UK networks"""
+def _generate_sample(network_config: NetworkConfig, seed: int):
+    """
+    Generate and encode one scenario of the given network.
+    
+    Runs in a worker process; seeding both RNGs from `seed` makes the sample
+    independent of which process draws it.
+    
+    Returns:
+        (network_state, train_states, conflict_matrix, time_targets,
+         track_targets, num_trains, num_delayed, num_conflicts)
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    
+    # Variable number of trains per scenario
+    num_trains = np.random.randint(
+        network_config.daily_trains // 4,
+        network_config.daily_trains // 2
+    )
+    
+    scenario = generate_realistic_scenario(network_config, num_trains)
+    generator = scenario['generator']
+    
+    # Encode network state
+    raw_network_state = generator._encode_network_state()
+    network_state = np.zeros(80, dtype=np.float32)
+    network_state[:min(len(raw_network_state), 80)] = raw_network_state[:80]
+    
+    # Encode train states (max 50 trains): one broadcast divide
+    # over the [n, 8] feature block
+    trains = scenario['trains']
+    n = min(num_trains, 50)
+    train_states = np.zeros((50, 8), dtype=np.float32)
+    train_states[:n] = np.stack([
+        trains['position_km'][:n],
+        trains['velocity_kmh'][:n],
+        trains['delay_minutes'][:n],
+        trains['priority'][:n],
+        trains['current_track'][:n],
+        trains['destination_station'][:n],
+        np.zeros(n),
+        trains['is_delayed'][:n]
+    ], axis=1) / _TRAIN_STATE_SCALE
+    
+    # Create conflict matrix: same track and closer than 10 km
+    # (JIT kernel when numba is available)
+    tracks = trains['current_track'][:n]
+    conflict_matrix = np.zeros((50, 50), dtype=np.uint8)
+    num_conflicts = _build_conflict_matrix(tracks, trains['position_km'][:n], conflict_matrix)
+    
+    # Simple targets (can be improved with C++ solver): delayed
+    # trains only, every train at once
+    is_delayed = trains['is_delayed'][:n]
+    time_targets = np.zeros(50, dtype=np.float32)
+    track_targets = np.zeros(50, dtype=np.float32)
+    time_targets[:n] = np.where(
+        is_delayed, -np.minimum(trains['delay_minutes'][:n] / 2.0, 10.0), 0.0
+    )
+    track_targets[:n] = np.where(
+        is_delayed, (tracks + 1) % (len(network_config.stations) * 2), 0.0
+    )
+    
+    num_delayed = int(trains['is_delayed'].sum())
+    return (network_state, train_states, conflict_matrix, time_targets, track_targets,
+            num_trains, num_delayed, num_conflicts)
+
+
+def create_multi_country_dataset(samples_per_network=50, output_file='data/real_training_data.npz',
+                                 workers=None):
+    """
+    Create dataset from multiple Italian and UK networks.
+    
+    Samples are generated in a process pool of `workers` processes
+    (default: one per CPU).
+    """
     
     print("\n" + "="*70)
     print("  CREAZIONE DATASET REALISTICO ITALIA + UK")
     print("="*70 + "\n")
     
-    all_network_states = []
-    all_train_states = []
-    all_conflict_matrices = []
-    all_time_targets = []
-    all_track_targets = []
-    all_metadata = []
+    total_samples = len(NETWORKS) * samples_per_network
     
-    # Combine Italian and UK networks
-    all_networks = {**ITALIAN_NETWORKS, **UK_NETWORKS}
+    # Output arrays allocated once (zeros = padding) and filled in place:
+    # float32 features/targets, uint8 for the 0/1 conflict flags
+    network_states = np.zeros((total_samples, 80), dtype=np.float32)
+    train_states = np.zeros((total_samples, 50, 8), dtype=np.float32)
+    conflict_matrices = np.zeros((total_samples, 50, 50), dtype=np.uint8)
+    time_targets = np.zeros((total_samples, 50), dtype=np.float32)
+    track_targets = np.zeros((total_samples, 50), dtype=np.float32)
+    # Per-sample metadata as a structured array: saved in the npz without
+    # pickling a list of dicts
+    metadata = np.zeros(total_samples, dtype=_METADATA_DTYPE)
+    idx = 0
     
-    total_samples = len(all_networks) * samples_per_network
     pbar = tqdm(total=total_samples, desc="Generazione scenari")
     
-    for network_name, network_config in all_networks.items():
-        network_config['name'] = network_name
-        
-        country = "🇮🇹 Italia" if network_name in ITALIAN_NETWORKS else "🇬🇧 UK"
-        print(f"\n{country} - {network_name}")
-        print(f"  Distanza: {network_config['distance_km']} km")
-        print(f"  Stazioni: {len(network_config['stations'])}")
-        print(f"  Treni/giorno: {network_config['daily_trains']}")
-        
-        for sample_idx in range(samples_per_network):
-            # Variable number of trains per scenario
-            num_trains = np.random.randint(
-                network_config['daily_trains'] // 4,
-                network_config['daily_trains'] // 2
-            )
-            
-            scenario = generate_realistic_scenario(network_config, num_trains)
-            generator = scenario['generator']
-            
-            # Encode network state
-            raw_network_state = generator._encode_network_state()
-            network_state = np.zeros(80)
-            network_state[:min(len(raw_network_state), 80)] = raw_network_state[:80]
-            
-            # Encode train states (max 50 trains)
-            train_states = np.zeros((50, 8))
-            for j, train in enumerate(scenario['trains'][:50]):
-                train_states[j] = [
-                    train.position_km / 100.0,
-                    train.velocity_kmh / 200.0,
-                    train.delay_minutes / 60.0,
-                    train.priority / 10.0,
-                    train.current_track / 20.0,
-                    train.destination_station / 10.0,
-                    0.0,
-                    1.0 if train.is_delayed else 0.0
-                ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for network_config in NETWORKS:
+            # One line per network through tqdm, so it does not break the bar
+            country = "🇮🇹 Italia" if network_config.country == 'IT' else "🇬🇧 UK"
+            tqdm.write(f"{country} - {network_config.name}: {network_config.distance_km} km, "
+                       f"{len(network_config.stations)} stazioni, "
+                       f"{network_config.daily_trains} treni/giorno")
             
-            # Create conflict matrix
-            conflict_matrix = np.zeros((50, 50))
-            for i in range(min(len(scenario['trains']), 50)):
-                for j in range(i+1, min(len(scenario['trains']), 50)):
-                    t1, t2 = scenario['trains'][i], scenario['trains'][j]
-                    if t1.current_track == t2.current_track:
-                        distance = abs(t1.position_km - t2.position_km)
-                        if distance < 10.0:
-                            conflict_matrix[i, j] = 1.0
-                            conflict_matrix[j, i] = 1.0
-            
-            # Simple targets (can be improved with C++ solver)
-            time_targets = np.zeros(50)
-            track_targets = np.zeros(50)
-            
-            for i, train in enumerate(scenario['trains'][:50]):
-                if train.is_delayed:
-                    time_targets[i] = -min(train.delay_minutes / 2.0, 10.0)
-                    track_targets[i] = (train.current_track + 1) % (len(network_config['stations']) * 2)
-            
-            all_network_states.append(network_state)
-            all_train_states.append(train_states)
-            all_conflict_matrices.append(conflict_matrix)
-            all_time_targets.append(time_targets)
-            all_track_targets.append(track_targets)
-            all_metadata.append({
-                'network': network_name,
-                'country': 'IT' if network_name in ITALIAN_NETWORKS else 'UK',
-                'num_trains': len(scenario['trains']),
-                'num_delayed': sum(1 for t in scenario['trains'] if t.is_delayed)
-            })
+            # Independent samples, generated in parallel and stored in order.
+            # One seed per sample: worker processes do not share RNG state
+            seeds = [random.getrandbits(32) for _ in range(samples_per_network)]
+            samples = executor.map(
+                _generate_sample, repeat(network_config, samples_per_network), seeds,
+                chunksize=8
+            )
             
-            pbar.update(1)
+            for sample in samples:
+                (network_states[idx], train_states[idx], conflict_matrices[idx],
+                 time_targets[idx], track_targets[idx], num_trains, num_delayed,
+                 num_conflicts) = sample
+                metadata[idx] = (network_config.name, network_config.country,
+                                 num_trains, num_delayed, num_conflicts)
+                
+                idx += 1
+                pbar.update(1)
     
     pbar.close()
     
-    # Convert to numpy arrays
-    network_states = np.array(all_network_states)
-    train_states = np.array(all_train_states)
-    conflict_matrices = np.array(all_conflict_matrices)
-    time_targets = np.array(all_time_targets)
-    track_targets = np.array(all_track_targets)
-    
     # Save to file
     np.savez_compressed(
         output_file,
@@ -259,28 +360,28 @@ def create_multi_country_dataset(samples_per_network=50, output_file='data/real_
         conflict_matrices=conflict_matrices,
         time_targets=time_targets,
         track_targets=track_targets,
-        metadata=all_metadata
+        metadata=metadata
     )
     
-    # Statistics
-    total_trains = sum(m['num_trains'] for m in all_metadata)
-    total_delayed = sum(m['num_delayed'] for m in all_metadata)
-    total_conflicts = np.sum(conflict_matrices) / 2
+    # Statistics: vectorized reductions over the metadata fields
+    total_trains = int(metadata['num_trains'].sum())
+    total_delayed = int(metadata['num_delayed'].sum())
+    total_conflicts = int(metadata['num_conflicts'].sum())
     
-    italian_samples = sum(1 for m in all_metadata if m['country'] == 'IT')
-    uk_samples = sum(1 for m in all_metadata if m['country'] == 'UK')
+    italian_samples = int((metadata['country'] == 'IT').sum())
+    uk_samples = int((metadata['country'] == 'UK').sum())
     
     print("\n" + "="*70)
     print("  STATISTICHE DATASET")
     print("="*70)
-    print(f"\nCampioni totali: {len(all_metadata)}")
+    print(f"\nCampioni totali: {total_samples}")
     print(f"  🇮🇹 Italiani: {italian_samples}")
     print(f"  🇬🇧 UK: {uk_samples}")
     print(f"\nTreni totali: {total_trains}")
     print(f"  Ritardati: {total_delayed} ({total_delayed/total_trains*100:.1f}%)")
     print(f"  Puntuali: {total_trains - total_delayed} ({(1-total_delayed/total_trains)*100:.1f}%)")
-    print(f"\nConflitti totali: {int(total_conflicts)}")
-    print(f"  Media per scenario: {total_conflicts/len(all_metadata):.1f}")
+    print(f"\nConflitti totali: {total_conflicts}")
+    print(f"  Media per scenario: {total_conflicts/total_samples:.1f}")
     print(f"\nFile salvato: {output_file}")
     print(f"Dimensione: {Path(output_file).stat().st_size / 1024**2:.2f} MB")
     print("\n" + "="*70 + "\n")
@@ -292,12 +393,15 @@ def main():
                        help='Samples per network (default: 100)')
     parser.add_argument('--output', type=str, default='data/real_training_data.npz',
                        help='Output file path')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes (default: one per CPU)')
     
     args = parser.parse_args()
     
     create_multi_country_dataset(
         samples_per_network=args.samples,
-        output_file=args.output
+        output_file=args.output,
+        workers=args.workers
     )
 
 
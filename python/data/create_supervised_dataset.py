@@ -3,7 +3,11 @@ Crea dataset con target realistici usando C++ solver.
 I target sono soluzioni calcolate euristicamente dal C++ engine.
 """
 
+import contextlib
+import random
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -12,6 +16,11 @@ from data.data_generator import RailwayNetworkGenerator
 import numpy as np
 from tqdm import tqdm
 
+# Divisori delle 8 feature di train_states: posizione, velocità, ritardo,
+# priorità, binario, destinazione, tempo, in ritardo. Binario e destinazione
+# sono sostituiti per campione con num_tracks e num_stations
+_TRAIN_STATE_SCALE = np.array([100.0, 200.0, 60.0, 10.0, 1.0, 1.0, 1.0, 1.0], dtype=np.float32)
+
 
 def solve_with_cpp_engine(scenario, generator):
     """
@@ -74,105 +83,158 @@ def solve_with_cpp_engine(scenario, generator):
     }
 
 
-def generate_supervised_dataset(num_samples=1000, output_path='../../data/supervised_training_data.npz'):
-    """Genera dataset con target realistici."""
+def _generate_sample(seed):
+    """
+    Genera uno scenario, lo risolve con il C++ engine e lo codifica.
+    
+    Eseguita in un processo figlio: il seed inizializza entrambi i RNG, così
+    il campione non dipende dal processo che lo genera. Lo scheduler C++ è
+    creato dentro solve_with_cpp_engine, quindi nulla va serializzato.
+    
+    Returns:
+        (network_state, train_states, conflict_matrix, time_targets,
+         track_targets, num_conflicts, num_trains)
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    
+    # Parametri variabili (garantisce almeno 30% binari singoli)
+    num_stations = np.random.randint(5, 15)
+    num_tracks = np.random.randint(8, 25)
+    num_trains = np.random.randint(15, 50)
+    single_ratio = np.random.uniform(0.3, 0.6)  # Min 30% per garantire almeno 1 singolo
+    
+    # Genera scenario (retry se fallisce per mancanza binari singoli)
+    max_retries = 3
+    for retry in range(max_retries):
+        try:
+            generator = RailwayNetworkGenerator(num_stations, num_tracks, single_ratio)
+            scenario = generator.generate_scenario(num_trains, conflict_probability=0.4)
+            break
+        except IndexError:
+            # Nessun binario singolo, aumenta il ratio
+            single_ratio = min(0.8, single_ratio + 0.2)
+            if retry == max_retries - 1:
+                # Fallback: usa più binari singoli
+                generator = RailwayNetworkGenerator(num_stations, num_tracks, 0.5)
+                scenario = generator.generate_scenario(num_trains, conflict_probability=0.3)
+    
+    # Calcola soluzione con C++
+    solution = solve_with_cpp_engine(scenario, generator)
+    
+    # Estrai features (con padding a dimensione fissa)
+    raw_network_state = generator._encode_network_state()
+    network_state = np.zeros(80, dtype=np.float32)  # Dimensione fissa
+    network_state[:min(len(raw_network_state), 80)] = raw_network_state[:80]
+    
+    trains = scenario['trains'][:50]
+    n = len(trains)
+    raw_train_states = np.array([
+        (t.position_km, t.velocity_kmh, t.delay_minutes, t.priority,
+         t.current_track, t.destination_station,
+         0.0,  # time (sarà aggiornato durante simulazione)
+         t.is_delayed)
+        for t in trains
+    ], dtype=np.float64).reshape(n, 8)
+    
+    # Binari e stazioni cambiano per campione: scala costruita una volta qui,
+    # poi una sola divisione in broadcast su tutti i treni
+    scale = _TRAIN_STATE_SCALE.copy()
+    scale[4] = num_tracks
+    scale[5] = num_stations
+    train_states = np.zeros((50, 8), dtype=np.float32)
+    train_states[:n] = raw_train_states / scale
+    
+    # Coppie in conflitto come array [K, 2]: riempimento simmetrico in blocco
+    pairs = scenario['conflict_pairs']
+    pairs = pairs[(pairs < 50).all(axis=1)]
+    conflict_matrix = np.zeros((50, 50), dtype=np.uint8)
+    conflict_matrix[pairs[:, 0], pairs[:, 1]] = 1
+    conflict_matrix[pairs[:, 1], pairs[:, 0]] = 1
+    
+    # Padding targets
+    time_targets = np.zeros(50, dtype=np.float32)
+    track_targets = np.zeros(50, dtype=np.float32)
+    time_targets[:len(solution['time_adjustments'])] = solution['time_adjustments']
+    track_targets[:len(solution['track_assignments'])] = solution['track_assignments']
+    
+    return (network_state, train_states, conflict_matrix, time_targets, track_targets,
+            solution['num_conflicts'], len(scenario['trains']))
+
+
+def _output_arrays(num_samples, tmp_dir=None):
+    """
+    Array di output allocati una volta (zeri = padding) e riempiti in place:
+    float32 per features/target, uint8 per i flag di conflitto 0/1.
+    
+    Con tmp_dir gli array sono memmap .npy su disco: la RAM usata resta
+    quella delle pagine toccate, non l'intero dataset.
+    """
+    specs = {
+        'network_states': ((num_samples, 80), np.float32),
+        'train_states': ((num_samples, 50, 8), np.float32),
+        'conflict_matrices': ((num_samples, 50, 50), np.uint8),
+        'time_targets': ((num_samples, 50), np.float32),
+        'track_targets': ((num_samples, 50), np.float32)
+    }
+    if tmp_dir is None:
+        return {name: np.zeros(shape, dtype=dtype) for name, (shape, dtype) in specs.items()}
+    # File nuovi: il contenuto iniziale è già a zero
+    return {
+        name: np.lib.format.open_memmap(
+            str(Path(tmp_dir) / f'{name}.npy'), mode='w+', dtype=dtype, shape=shape
+        )
+        for name, (shape, dtype) in specs.items()
+    }
+
+
+def generate_supervised_dataset(num_samples=1000, output_path='../../data/supervised_training_data.npz',
+                                workers=None, on_disk=False):
+    """
+    Genera dataset con target realistici.
+    
+    I campioni sono generati in un pool di `workers` processi
+    (default: uno per CPU). Con on_disk=True gli array sono tenuti su disco
+    durante la generazione, per dataset che non entrano in RAM.
+    """
     
     print(f"\n{'='*70}")
     print(f"  🎯 GENERAZIONE DATASET SUPERVISED")
     print(f"{'='*70}\n")
     print(f"Target: {num_samples} samples con soluzioni C++ engine\n")
     
-    all_network_states = []
-    all_train_states = []
-    all_conflict_matrices = []
-    all_time_targets = []
-    all_track_targets = []
-    
     stats = {
         'total_conflicts': 0,
         'total_trains': 0,
         'scenarios_with_conflicts': 0
     }
     
-    for i in tqdm(range(num_samples), desc="Generazione"):
-        # Parametri variabili (garantisce almeno 30% binari singoli)
-        num_stations = np.random.randint(5, 15)
-        num_tracks = np.random.randint(8, 25)
-        num_trains = np.random.randint(15, 50)
-        single_ratio = np.random.uniform(0.3, 0.6)  # Min 30% per garantire almeno 1 singolo
-        
-        # Genera scenario (retry se fallisce per mancanza binari singoli)
-        max_retries = 3
-        for retry in range(max_retries):
-            try:
-                generator = RailwayNetworkGenerator(num_stations, num_tracks, single_ratio)
-                scenario = generator.generate_scenario(num_trains, conflict_probability=0.4)
-                break
-            except IndexError:
-                # Nessun binario singolo, aumenta il ratio
-                single_ratio = min(0.8, single_ratio + 0.2)
-                if retry == max_retries - 1:
-                    # Fallback: usa più binari singoli
-                    generator = RailwayNetworkGenerator(num_stations, num_tracks, 0.5)
-                    scenario = generator.generate_scenario(num_trains, conflict_probability=0.3)
-        
-        # Calcola soluzione con C++
-        solution = solve_with_cpp_engine(scenario, generator)
-        
-        # Estrai features (con padding a dimensione fissa)
-        raw_network_state = generator._encode_network_state()
-        network_state = np.zeros(80)  # Dimensione fissa
-        network_state[:min(len(raw_network_state), 80)] = raw_network_state[:80]
-        
-        train_states = np.zeros((50, 8))
-        for j, train in enumerate(scenario['trains'][:50]):
-            train_states[j] = [
-                train.position_km / 100.0,
-                train.velocity_kmh / 200.0,
-                train.delay_minutes / 60.0,
-                train.priority / 10.0,
-                train.current_track / float(num_tracks),
-                train.destination_station / float(num_stations),
-                0.0,  # time (sarà aggiornato durante simulazione)
-                1.0 if train.is_delayed else 0.0
-            ]
-        
-        conflict_matrix = np.zeros((50, 50))
-        for t1_id, t2_id in scenario['conflicts']:
-            if t1_id < 50 and t2_id < 50:
-                conflict_matrix[t1_id, t2_id] = 1
-                conflict_matrix[t2_id, t1_id] = 1
-        
-        # Padding targets
-        time_targets = np.zeros(50)
-        track_targets = np.zeros(50)
-        time_targets[:len(solution['time_adjustments'])] = solution['time_adjustments']
-        track_targets[:len(solution['track_assignments'])] = solution['track_assignments']
+    # Campioni indipendenti, generati in parallelo e salvati in ordine.
+    # Un seed per campione: i processi figli non condividono lo stato del RNG
+    seeds = [random.getrandbits(32) for _ in range(num_samples)]
+    
+    # Con on_disk gli array vivono in file .npy temporanei accanto all'output
+    with (tempfile.TemporaryDirectory(dir=Path(output_path).parent) if on_disk
+          else contextlib.nullcontext()) as tmp_dir:
+        data = _output_arrays(num_samples, tmp_dir)
         
-        # Accumula
-        all_network_states.append(network_state)
-        all_train_states.append(train_states)
-        all_conflict_matrices.append(conflict_matrix)
-        all_time_targets.append(time_targets)
-        all_track_targets.append(track_targets)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            samples = executor.map(_generate_sample, seeds, chunksize=8)
+            for i, sample in enumerate(tqdm(samples, total=num_samples, desc="Generazione")):
+                (data['network_states'][i], data['train_states'][i],
+                 data['conflict_matrices'][i], data['time_targets'][i],
+                 data['track_targets'][i], num_conflicts, num_trains) = sample
+                
+                # Stats
+                stats['total_conflicts'] += num_conflicts
+                stats['total_trains'] += num_trains
+                if num_conflicts > 0:
+                    stats['scenarios_with_conflicts'] += 1
         
-        # Stats
-        stats['total_conflicts'] += solution['num_conflicts']
-        stats['total_trains'] += len(scenario['trains'])
-        if solution['num_conflicts'] > 0:
-            stats['scenarios_with_conflicts'] += 1
-    
-    # Converti in numpy arrays
-    data = {
-        'network_states': np.array(all_network_states),
-        'train_states': np.array(all_train_states),
-        'conflict_matrices': np.array(all_conflict_matrices),
-        'time_targets': np.array(all_time_targets),
-        'track_targets': np.array(all_track_targets)
-    }
-    
-    # Salva
-    np.savez_compressed(output_path, **data)
+        # Salva (da memmap la copia nell'npz procede a blocchi)
+        np.savez_compressed(output_path, **data)
+        network_bytes = data['network_states'].nbytes
+        del data  # chiude i memmap prima di rimuovere la cartella temporanea
     
     # Report
     print(f"\n{'='*70}")
@@ -186,7 +248,7 @@ def generate_supervised_dataset(num_samples=1000, output_path='../../data/superv
     print(f"  • Treni totali: {stats['total_trains']}")
     print(f"  • Media treni/scenario: {stats['total_trains']/num_samples:.1f}")
     print(f"\n💾 Salvato in: {output_path}")
-    print(f"  • Dimensione: {data['network_states'].nbytes / 1024**2:.1f} MB")
+    print(f"  • Dimensione: {network_bytes / 1024**2:.1f} MB")
     print(f"\n🎯 Prossimo passo: python training/train_supervised.py")
     print()
 
@@ -196,6 +258,9 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--samples', type=int, default=1000, help='Numero di samples da generare')
     parser.add_argument('--output', type=str, default='../../data/supervised_training_data.npz')
+    parser.add_argument('--workers', type=int, default=None, help='Processi worker (default: uno per CPU)')
+    parser.add_argument('--on-disk', action='store_true',
+                        help='Tiene gli array su disco durante la generazione (dataset grandi)')
     args = parser.parse_args()
     
-    generate_supervised_dataset(args.samples, args.output)
+    generate_supervised_dataset(args.samples, args.output, args.workers, args.on_disk)
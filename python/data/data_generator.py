@@ -9,7 +9,7 @@ from dataclasses import dataclass
 import random
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Track:
     """Rappresenta un binario."""
     id: int
@@ -19,7 +19,7 @@ class Track:
     stations: List[int]  # IDs delle stazioni collegate
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Station:
     """Rappresenta una stazione."""
     id: int
@@ -28,7 +28,7 @@ class Station:
     connected_tracks: List[int]
 
 
-@dataclass
+@dataclass(slots=True)
 class Train:
     """Rappresenta un treno."""
     id: int
@@ -58,6 +58,11 @@ class RailwayNetworkGenerator:
         self.stations = self._generate_stations()
         self.tracks = self._generate_tracks()
         
+        # Vista SoA dei binari per interrogazioni vettoriali
+        self.track_is_single = np.fromiter(
+            (t.is_single_track for t in self.tracks), dtype=np.bool_, count=len(self.tracks)
+        )
+        
     def _generate_stations(self) -> List[Station]:
         """Genera stazioni con capacità variabili."""
         stations = []
@@ -115,9 +120,11 @@ class RailwayNetworkGenerator:
             conflict_probability: Probabilità di conflitti intenzionali
             
         Returns:
-            Dict con network_state, train_states, conflicts
+            Dict con network_state, train_states, conflicts, più le viste
+            NumPy conflict_pairs [K, 2], train_tracks [N], train_priorities [N],
+            train_positions [N] e train_delayed [N]
         """
-        trains = []
+        trains = [None] * num_trains
         
         for i in range(num_trains):
             # Seleziona track random
@@ -144,7 +151,7 @@ class RailwayNetworkGenerator:
                 is_delayed=is_delayed,
                 delay_minutes=delay
             )
-            trains.append(train)
+            trains[i] = train
         
         # Rilevamento conflitti
         conflicts = self._detect_conflicts(trains)
@@ -164,9 +171,29 @@ class RailwayNetworkGenerator:
             'train_states': train_states,
             'conflict_matrix': conflict_matrix,
             'trains': trains,
-            'conflicts': conflicts
+            'conflicts': conflicts,
+            'conflict_pairs': np.array(conflicts, dtype=np.int32).reshape(-1, 2),
+            'train_tracks': np.fromiter(
+                (t.current_track for t in trains), dtype=np.int32, count=len(trains)
+            ),
+            'train_priorities': np.fromiter(
+                (t.priority for t in trains), dtype=np.int8, count=len(trains)
+            ),
+            'train_positions': np.fromiter(
+                (t.position_km for t in trains), dtype=np.float64, count=len(trains)
+            ),
+            'train_delayed': self.trains_delayed_mask(trains)
         }
     
+    @staticmethod
+    def trains_delayed_mask(trains: List[Train]) -> np.ndarray:
+        """
+        Maschera booleana [N] dei treni in ritardo.
+        """
+        return np.fromiter(
+            (t.is_delayed for t in trains), dtype=np.bool_, count=len(trains)
+        )
+    
     def _detect_conflicts(self, trains: List[Train]) -> List[Tuple[int, int]]:
         """
         Rileva conflitti tra treni sullo stesso binario.
@@ -0,0 +1,58 @@
+"""
+Statistiche numeriche sui conflitti di uno scenario generato.
+Lavora sulle viste NumPy restituite da RailwayNetworkGenerator.generate_scenario.
+"""
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Decoratore neutro usato quando numba non è installato."""
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(fastmath=True)
+def conflict_stats(priorities, train_tracks, track_is_single, positions, conflict_pairs,
+                   delay_minutes=10):
+    """
+    Calcola in un solo passaggio le statistiche delle coppie in conflitto.
+
+    Args:
+        priorities: Priorità per treno [N]
+        train_tracks: Binario corrente per treno [N]
+        track_is_single: Maschera binari singoli [num_tracks]
+        positions: Posizione in km per treno [N]
+        conflict_pairs: Coppie di treni in conflitto [K, 2]
+        delay_minutes: Ritardo assegnato al treno che cede
+
+    Returns:
+        (conflitti critici su binario singolo,
+         ritardo ai treni a priorità minore,
+         ritardo agli altri treni,
+         distanza media tra i treni in conflitto)
+    """
+    num_conflicts = conflict_pairs.shape[0]
+    critical = 0
+    low_yields = 0
+    total_distance = 0.0
+
+    for k in range(num_conflicts):
+        i = conflict_pairs[k, 0]
+        j = conflict_pairs[k, 1]
+        if track_is_single[train_tracks[i]]:
+            critical += 1
+        # Il primo treno cede se ha priorità minore
+        if priorities[i] < priorities[j]:
+            low_yields += 1
+        total_distance += abs(positions[i] - positions[j])
+
+    mean_distance = total_distance / num_conflicts if num_conflicts > 0 else 0.0
+    return (critical,
+            low_yields * delay_minutes,
+            (num_conflicts - low_yields) * delay_minutes,
+            mean_distance)
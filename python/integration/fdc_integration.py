@@ -8,7 +8,14 @@ secondo le specifiche in RAILWAY_AI_INTEGRATION_SPECS.md
 from typing import List, Dict, Optional, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
-from enum import Enum
+from enum import Enum, IntEnum
+import json
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 
 class ModificationType(Enum):
@@ -24,12 +31,29 @@ class ModificationType(Enum):
     ROUTE_CHANGE = "route_change"
 
 
-class ConflictType(Enum):
-    """Tipi di conflitti rilevabili."""
-    PLATFORM_CONFLICT = "platform_conflict"
-    SPEED_CONFLICT = "speed_conflict"
-    TIMING_CONFLICT = "timing_conflict"
-    CAPACITY_CONFLICT = "capacity_conflict"
+class ConflictType(IntEnum):
+    """Tipi di conflitti rilevabili (serializzati come nome minuscolo)."""
+    PLATFORM_CONFLICT = 1
+    SPEED_CONFLICT = 2
+    TIMING_CONFLICT = 3
+    CAPACITY_CONFLICT = 4
+
+
+class Severity(IntEnum):
+    """Gravità di un conflitto (serializzata come nome minuscolo)."""
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    
+    @classmethod
+    def from_value(cls, value) -> 'Severity':
+        """Accetta un Severity, un intero o una stringa ("low", "medium", "high")."""
+        if isinstance(value, str):
+            try:
+                return cls[value.upper()]
+            except KeyError:
+                raise ValueError(f"Gravità non valida: {value!r}") from None
+        return cls(value)
 
 
 @dataclass
@@ -88,7 +112,7 @@ class Impact:
     passenger_impact_score: Optional[float] = None  # 0.0-1.0
 
 
-@dataclass
+@dataclass(slots=True)
 class Modification:
     """Singola modifica a un treno."""
     train_id: str
@@ -133,19 +157,23 @@ class Alternative:
 @dataclass
 class ConflictDetail:
     """Dettaglio di un conflitto."""
-    type: str  # ConflictType as string
+    type: ConflictType
     location: str
     trains: List[str]
-    severity: str  # "low", "medium", "high"
+    severity: Severity
     time_overlap_seconds: Optional[int] = None
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Converte in dizionario per JSON."""
+    def to_dict(self, enums_as_int: bool = False) -> Dict[str, Any]:
+        """
+        Converte in dizionario per JSON.
+        
+        Con enums_as_int=True tipo e gravità restano interi (RPC interne).
+        """
         result = {
-            "type": self.type,
+            "type": int(self.type) if enums_as_int else self.type.name.lower(),
             "location": self.location,
             "trains": self.trains,
-            "severity": self.severity
+            "severity": int(self.severity) if enums_as_int else self.severity.name.lower()
         }
         if self.time_overlap_seconds is not None:
             result["time_overlap_seconds"] = self.time_overlap_seconds
@@ -229,6 +257,29 @@ class FDCResponse:
         return result
 
 
+def _json_default(obj: Any) -> Any:
+    """Fallback di orjson per le dataclass del modulo e gli enum."""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if isinstance(obj, IntEnum):
+        return obj.name.lower()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Tipo non serializzabile: {type(obj).__name__}")
+
+
+def _dumps(response: FDCResponse) -> bytes:
+    """Serializza una risposta in JSON indentato (orjson se disponibile)."""
+    if HAS_ORJSON:
+        # PASSTHROUGH: le dataclass passano da to_dict(), che omette i campi None
+        return orjson.dumps(
+            response,
+            default=_json_default,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+    return json.dumps(response.to_dict(), indent=2, ensure_ascii=False).encode()
+
+
 class FDCIntegrationBuilder:
     """Builder per creare risposte FDC-compliant."""
     
@@ -253,7 +304,117 @@ class FDCIntegrationBuilder:
         confidence: float = 0.9
     ) -> 'FDCIntegrationBuilder':
         """Aggiunge modifica velocità."""
-        mod = Modification(
+        self.modifications.append(self._speed_modification(
+            train_id=train_id,
+            from_station=from_station,
+            to_station=to_station,
+            new_speed_kmh=new_speed_kmh,
+            original_speed_kmh=original_speed_kmh,
+            time_increase_seconds=time_increase_seconds,
+            affected_stations=affected_stations,
+            reason=reason,
+            confidence=confidence
+        ))
+        return self
+    
+    def add_platform_change(
+        self,
+        train_id: str,
+        station: str,
+        new_platform: int,
+        original_platform: int,
+        affected_stations: List[str],
+        reason: str,
+        confidence: float = 0.95
+    ) -> 'FDCIntegrationBuilder':
+        """Aggiunge cambio binario."""
+        self.modifications.append(self._platform_change(
+            train_id=train_id,
+            station=station,
+            new_platform=new_platform,
+            original_platform=original_platform,
+            affected_stations=affected_stations,
+            reason=reason,
+            confidence=confidence
+        ))
+        return self
+    
+    def add_dwell_time_change(
+        self,
+        train_id: str,
+        station: str,
+        additional_seconds: int,
+        original_dwell_seconds: int,
+        affected_stations: List[str],
+        reason: str,
+        confidence: float = 0.88
+    ) -> 'FDCIntegrationBuilder':
+        """Aggiunge modifica tempo di sosta."""
+        self.modifications.append(self._dwell_time_change(
+            train_id=train_id,
+            station=station,
+            additional_seconds=additional_seconds,
+            original_dwell_seconds=original_dwell_seconds,
+            affected_stations=affected_stations,
+            reason=reason,
+            confidence=confidence
+        ))
+        return self
+    
+    def add_departure_delay(
+        self,
+        train_id: str,
+        station: str,
+        delay_seconds: int,
+        affected_stations: List[str],
+        reason: str,
+        confidence: float = 0.85
+    ) -> 'FDCIntegrationBuilder':
+        """Aggiunge ritardo/anticipo partenza."""
+        self.modifications.append(self._departure_delay(
+            train_id=train_id,
+            station=station,
+            delay_seconds=delay_seconds,
+            affected_stations=affected_stations,
+            reason=reason,
+            confidence=confidence
+        ))
+        return self
+    
+    def add_modifications_bulk(
+        self,
+        kind: str,
+        records: List[Dict[str, Any]],
+        confidence: Optional[float] = None
+    ) -> 'FDCIntegrationBuilder':
+        """
+        Aggiunge in blocco più modifiche dello stesso tipo.
+        
+        Args:
+            kind: "speed", "platform_change", "dwell_time" o "departure_delay"
+            records: Dict con gli stessi argomenti del metodo add_* corrispondente
+            confidence: Se indicata, sostituisce la confidence di tutti i record
+        """
+        factory = self._MODIFICATION_FACTORIES[kind]
+        if confidence is not None:
+            records = [{**r, "confidence": confidence} for r in records]
+        self.modifications.extend(factory(**r) for r in records)
+        return self
+    
+    @staticmethod
+    def _speed_modification(
+        train_id: str,
+        from_station: str,
+        to_station: str,
+        new_speed_kmh: float,
+        original_speed_kmh: float,
+        time_increase_seconds: int,
+        affected_stations: List[str],
+        reason: str,
+        confidence: float = 0.9
+    ) -> Modification:
+        """Costruisce una modifica velocità."""
+        return Modification(
             train_id=train_id,
             modification_type=ModificationType.SPEED_REDUCTION.value if new_speed_kmh < original_speed_kmh else ModificationType.SPEED_INCREASE.value,
             section={"from_station": from_station, "to_station": to_station},
@@ -268,11 +429,9 @@ class FDCIntegrationBuilder:
             reason=reason,
             confidence=confidence
         )
-        self.modifications.append(mod)
-        return self
     
-    def add_platform_change(
-        self,
+    @staticmethod
+    def _platform_change(
         train_id: str,
         station: str,
         new_platform: int,
@@ -280,9 +439,9 @@ class FDCIntegrationBuilder:
         affected_stations: List[str],
         reason: str,
         confidence: float = 0.95
-    ) -> 'FDCIntegrationBuilder':
-        """Aggiunge cambio binario."""
-        mod = Modification(
+    ) -> Modification:
+        """Costruisce un cambio binario."""
+        return Modification(
             train_id=train_id,
             modification_type=ModificationType.PLATFORM_CHANGE.value,
             section={"station": station},
@@ -297,11 +456,9 @@ class FDCIntegrationBuilder:
             reason=reason,
             confidence=confidence
         )
-        self.modifications.append(mod)
-        return self
     
-    def add_dwell_time_change(
-        self,
+    @staticmethod
+    def _dwell_time_change(
         train_id: str,
         station: str,
         additional_seconds: int,
@@ -309,10 +466,10 @@ class FDCIntegrationBuilder:
         affected_stations: List[str],
         reason: str,
         confidence: float = 0.88
-    ) -> 'FDCIntegrationBuilder':
-        """Aggiunge modifica tempo di sosta."""
+    ) -> Modification:
+        """Costruisce una modifica del tempo di sosta."""
         mod_type = ModificationType.DWELL_TIME_INCREASE if additional_seconds > 0 else ModificationType.DWELL_TIME_DECREASE
-        mod = Modification(
+        return Modification(
             train_id=train_id,
             modification_type=mod_type.value,
             section={"station": station},
@@ -327,21 +484,19 @@ class FDCIntegrationBuilder:
             reason=reason,
             confidence=confidence
         )
-        self.modifications.append(mod)
-        return self
     
-    def add_departure_delay(
-        self,
+    @staticmethod
+    def _departure_delay(
         train_id: str,
         station: str,
         delay_seconds: int,
         affected_stations: List[str],
         reason: str,
         confidence: float = 0.85
-    ) -> 'FDCIntegrationBuilder':
-        """Aggiunge ritardo/anticipo partenza."""
+    ) -> Modification:
+        """Costruisce un ritardo/anticipo di partenza."""
         mod_type = ModificationType.DEPARTURE_DELAY if delay_seconds > 0 else ModificationType.DEPARTURE_ADVANCE
-        mod = Modification(
+        return Modification(
             train_id=train_id,
             modification_type=mod_type.value,
             section={"station": station},
@@ -353,23 +508,29 @@ class FDCIntegrationBuilder:
             reason=reason,
             confidence=confidence
         )
-        self.modifications.append(mod)
-        return self
+    
+    # Costruttori usati da add_modifications_bulk, per tipo di modifica
+    _MODIFICATION_FACTORIES = {
+        "speed": _speed_modification,
+        "platform_change": _platform_change,
+        "dwell_time": _dwell_time_change,
+        "departure_delay": _departure_delay,
+    }
     
     def add_conflict(
         self,
         conflict_type: ConflictType,
         location: str,
         trains: List[str],
-        severity: str = "medium",
+        severity: Severity = Severity.MEDIUM,
         time_overlap_seconds: Optional[int] = None
     ) -> 'FDCIntegrationBuilder':
-        """Aggiunge conflitto originale."""
+        """Aggiunge conflitto originale (severity anche come stringa)."""
         conflict = ConflictDetail(
-            type=conflict_type.value,
+            type=ConflictType(conflict_type),
             location=location,
             trains=trains,
-            severity=severity,
+            severity=Severity.from_value(severity),
             time_overlap_seconds=time_overlap_seconds
         )
         self.original_conflicts.append(conflict)
@@ -447,6 +608,19 @@ class FDCIntegrationBuilder:
             suggestions=suggestions,
             conflict_analysis=conflict_analysis
         )
+    
+    def build_success_json(self) -> bytes:
+        """Costruisce la risposta di successo già serializzata in JSON."""
+        return _dumps(self.build_success())
+    
+    def build_failure_json(
+        self,
+        error_message: str,
+        error_code: str,
+        suggestions: Optional[List[str]] = None
+    ) -> bytes:
+        """Costruisce la risposta di fallimento già serializzata in JSON."""
+        return _dumps(self.build_failure(error_message, error_code, suggestions))
 
 
 def create_minimal_fdc_response(
@@ -461,17 +635,34 @@ def create_minimal_fdc_response(
     Crea risposta FDC minimale (backward compatible).
     
     Da usare quando non si hanno informazioni dettagliate.
+    
+    Equivale a un builder con un solo add_departure_delay seguito da
+    build_success().to_dict(), ma compila direttamente il dizionario
+    senza istanziare builder e dataclass intermedi.
     """
-    builder = FDCIntegrationBuilder()
-    builder.add_departure_delay(
-        train_id=train_id,
-        station=origin_station,
-        delay_seconds=delay_seconds,
-        affected_stations=affected_stations,
-        reason=reason,
-        confidence=confidence
-    )
-    builder.set_ml_confidence(confidence)
+    mod_type = ModificationType.DEPARTURE_DELAY if delay_seconds > 0 else ModificationType.DEPARTURE_ADVANCE
+    time_increase = abs(delay_seconds)
     
-    response = builder.build_success()
-    return response.to_dict()
+    return {
+        "success": True,
+        "optimization_type": "multi_train_coordination",
+        "total_impact_minutes": time_increase / 60.0,
+        "ml_confidence": confidence,
+        "modifications": [{
+            "train_id": train_id,
+            "modification_type": mod_type.value,
+            "section": {"station": origin_station},
+            "parameters": {"delay_seconds": delay_seconds},
+            "impact": {
+                "time_increase_seconds": time_increase,
+                "affected_stations": affected_stations
+            },
+            "reason": reason,
+            "confidence": confidence
+        }],
+        "conflict_analysis": {
+            "original_conflicts": [],
+            "resolved_conflicts": 0,
+            "remaining_conflicts": 0
+        }
+    }
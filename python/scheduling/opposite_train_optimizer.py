@@ -12,18 +12,39 @@ Features:
 - Considerazione traffico esistente
 """
 
+import functools
+import heapq
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Tuple, Optional, Dict
 from datetime import datetime, timedelta
 import numpy as np
 
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Decoratore neutro usato quando numba non è installato."""
+        def decorator(func):
+            return func
+        return decorator
+
 logger = logging.getLogger(__name__)
 
+# I tempi del kernel sono microsecondi interi: stessa risoluzione di datetime
+_MICROSECOND = timedelta(microseconds=1)
 
-@dataclass
+# Gap minimo tra le partenze dei due treni (5 minuti)
+_MIN_DEPARTURE_GAP_US = 300 * 1_000_000
+
+
+@dataclass(frozen=True, slots=True)
 class TrackSection:
-    """Sezione di binario con caratteristiche."""
+    """Sezione di binario con caratteristiche (immutabile, hashable)."""
     section_id: int
     start_km: float
     end_km: float
@@ -43,17 +64,157 @@ class TrackSection:
         return self.num_tracks >= 2
 
 
-@dataclass
+def _sections_to_soa(sections: List[TrackSection]) -> Dict[str, np.ndarray]:
+    """
+    Impacchetta le sezioni in array paralleli (uno per attributo).
+    
+    Returns:
+        Dict con start, end, vmax (float64), ntrack (int32) e is_single (bool)
+    """
+    n = len(sections)
+    ntrack = np.fromiter((s.num_tracks for s in sections), dtype=np.int32, count=n)
+    return {
+        'start': np.fromiter((s.start_km for s in sections), dtype=np.float64, count=n),
+        'end': np.fromiter((s.end_km for s in sections), dtype=np.float64, count=n),
+        'ntrack': ntrack,
+        'vmax': np.fromiter((s.max_speed_kmh for s in sections), dtype=np.float64, count=n),
+        'is_single': ntrack == 1
+    }
+
+
+def _timeline_to_arrays(
+    timeline: Dict[float, datetime],
+    reference: datetime
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Converte una timeline {km: orario} in (km, microsecondi da reference)."""
+    n = len(timeline)
+    kms = np.fromiter(timeline.keys(), dtype=np.float64, count=n)
+    offsets = np.fromiter(
+        ((t - reference) // _MICROSECOND for t in timeline.values()),
+        dtype=np.int64, count=n
+    )
+    return kms, offsets
+
+
+@njit(parallel=True)
+def _score_schedule(departures, num_slots,
+                    enters1, first1, last1, reach1, arrival1,
+                    enters2, first2, last2, reach2, arrival2,
+                    min_gap):
+    """
+    Valuta in un solo passaggio tutte le coppie di partenze di B problemi
+    sulla stessa rete.
+    
+    Tempi in microsecondi interi: le partenze sono relative all'inizio della
+    finestra del problema, i passaggi del treno relativi alla sua partenza.
+    
+    Args:
+        departures: Slot di partenza per problema [B, N], validi i primi num_slots[b]
+        num_slots: Numero di slot per problema [B]
+        enters1, first1, last1: Per sezione a binario singolo [B, S]: il treno 1
+            la attraversa? primo e ultimo passaggio
+        reach1, arrival1: Per stazione di incrocio [B, C]: arrivo del treno 1
+            definito? orario di arrivo
+        enters2, first2, last2, reach2, arrival2: Idem per il treno 2
+        min_gap: Gap minimo tra le partenze
+    
+    Returns:
+        Array [B, N*N], coppia (i, j) in posizione i*N + j:
+        (esito: -1 scartata, 0 nessun conflitto, 1 incrocio trovato,
+         conflitti su binario singolo, stazione di incrocio,
+         orario di incrocio, attesa treno 1, attesa treno 2)
+    """
+    batch, n = departures.shape
+    num_pairs = n * n
+    status = np.full((batch, num_pairs), -1, dtype=np.int8)
+    num_conflicts = np.zeros((batch, num_pairs), dtype=np.int64)
+    station = np.full((batch, num_pairs), -1, dtype=np.int64)
+    crossing_time = np.zeros((batch, num_pairs), dtype=np.int64)
+    wait1 = np.zeros((batch, num_pairs), dtype=np.float64)
+    wait2 = np.zeros((batch, num_pairs), dtype=np.float64)
+    
+    for q in prange(batch * num_pairs):
+        b = q // num_pairs
+        p = q % num_pairs
+        i = p // n
+        j = p % n
+        if i >= num_slots[b] or j >= num_slots[b]:
+            continue
+        d1 = departures[b, i]
+        d2 = departures[b, j]
+        # Evita slot troppo vicini
+        if abs(d2 - d1) < min_gap:
+            continue
+        
+        # Conflitto se entrambi attraversano la sezione e le finestre si sovrappongono
+        k = 0
+        for s in range(enters1.shape[1]):
+            if enters1[b, s] and enters2[b, s]:
+                if not (d1 + last1[b, s] < d2 + first2[b, s] or
+                        d2 + last2[b, s] < d1 + first1[b, s]):
+                    k += 1
+        num_conflicts[b, p] = k
+        if k == 0:
+            status[b, p] = 0
+            continue
+        
+        # Stazione con attesa totale minima (max 30 minuti ragionevoli)
+        min_total_wait = np.inf
+        for c in range(reach1.shape[1]):
+            if not (reach1[b, c] and reach2[b, c]):
+                continue
+            a1 = d1 + arrival1[b, c]
+            a2 = d2 + arrival2[b, c]
+            time_diff = (a2 - a1) / 1e6 / 60.0
+            if time_diff > 0:
+                w1, w2, t = time_diff, 0.0, a2
+            else:
+                w1, w2, t = 0.0, -time_diff, a1
+            total_wait = w1 + w2
+            if total_wait < 30 and total_wait < min_total_wait:
+                min_total_wait = total_wait
+                status[b, p] = 1
+                station[b, p] = c
+                crossing_time[b, p] = t
+                wait1[b, p] = w1
+                wait2[b, p] = w2
+    
+    return status, num_conflicts, station, crossing_time, wait1, wait2
+
+
+def warm_up_kernels():
+    """Compila il kernel di ricerca su input minimi (una volta per processo)."""
+    if not HAS_NUMBA:
+        return
+    departures = np.zeros((1, 1), dtype=np.int64)
+    num_slots = np.ones(1, dtype=np.int64)
+    profile = (np.zeros((1, 1), dtype=np.bool_), np.zeros((1, 1), dtype=np.int64),
+               np.zeros((1, 1), dtype=np.int64), np.zeros((1, 1), dtype=np.bool_),
+               np.zeros((1, 1), dtype=np.int64))
+    _score_schedule(departures, num_slots, *profile, *profile, _MIN_DEPARTURE_GAP_US)
+
+
+@dataclass(frozen=True, slots=True)
 class TrainPath:
-    """Percorso di un treno sulla rete."""
+    """Percorso di un treno sulla rete (immutabile, hashable)."""
     train_id: str
     direction: str  # 'forward' o 'backward'
     start_km: float
     end_km: float
     avg_speed_kmh: float
     departure_time: datetime
-    stops: List[Tuple[float, int]]  # (km, duration_minutes)
+    stops: Tuple[Tuple[float, int], ...]  # (km, duration_minutes)
     priority: int = 5  # 1-10
+    # Viaggio + soste in minuti, calcolato una volta alla creazione
+    journey_time_minutes: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Le fermate possono arrivare come liste (es. da JSON): tuple per l'hash
+        object.__setattr__(self, 'stops', tuple(tuple(stop) for stop in self.stops))
+        # slots=True esclude cached_property: il valore è un campo derivato
+        travel_mins = self.travel_time_minutes(abs(self.end_km - self.start_km))
+        stop_mins = sum(duration for _, duration in self.stops)
+        object.__setattr__(self, 'journey_time_minutes', travel_mins + stop_mins)
     
     def travel_time_minutes(self, distance_km: float) -> float:
         """Tempo di viaggio per una distanza."""
@@ -61,25 +222,23 @@ class TrainPath:
     
     def arrival_time(self) -> datetime:
         """Orario arrivo finale."""
-        total_distance = abs(self.end_km - self.start_km)
-        travel_mins = self.travel_time_minutes(total_distance)
-        stop_mins = sum(duration for _, duration in self.stops)
-        return self.departure_time + timedelta(minutes=travel_mins + stop_mins)
+        return self.departure_time + timedelta(minutes=self.journey_time_minutes)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ExistingTrain:
-    """Treno già presente sul traffico."""
+    """Treno già presente sul traffico (immutabile, hashable)."""
     train_id: str
     position_km: float
     velocity_kmh: float
     direction: str
-    estimated_times: Dict[float, datetime]  # km -> orario passaggio
+    # km -> orario passaggio; confrontato ma escluso dall'hash (dict non hashable)
+    estimated_times: Dict[float, datetime] = field(hash=False)
 
 
-@dataclass
+@dataclass(frozen=True)
 class ScheduleProposal:
-    """Proposta di orario ottimizzato."""
+    """Proposta di orario ottimizzato (immutabile: condivisa dalla cache delle ricerche)."""
     train1_departure: datetime
     train2_departure: datetime
     crossing_point_km: float
@@ -92,6 +251,18 @@ class ScheduleProposal:
     reasoning: str
 
 
+@dataclass
+class ScheduleProblem:
+    """Coppia di treni opposti da schedulare (argomenti di find_optimal_schedule)."""
+    train1: TrainPath
+    train2: TrainPath
+    time_window_start: datetime
+    time_window_end: datetime
+    frequency_minutes: int = 60
+    existing_traffic: Optional[List[ExistingTrain]] = None
+    top_k: int = 10
+
+
 class OppositeTrainScheduler:
     """
     Ottimizzatore orari per treni in senso opposto.
@@ -105,6 +276,8 @@ class OppositeTrainScheduler:
     """
     
     def __init__(self, track_sections: List[TrackSection]):
+        # Sezioni nell'ordine originale: chiave della cache delle ricerche
+        self._sections_key = tuple(track_sections)
         self.track_sections = sorted(track_sections, key=lambda s: s.start_km)
         self.total_length_km = max(s.end_km for s in track_sections)
         
@@ -112,6 +285,10 @@ class OppositeTrainScheduler:
         self.single_track_sections = [s for s in track_sections if s.is_single_track()]
         self.crossing_stations = [s for s in track_sections if s.can_cross and s.has_station]
         
+        # Vista SoA dei binari singoli per i controlli di conflitto vettoriali
+        self._single_soa = _sections_to_soa(self.single_track_sections)
+        self._crossing_kms = [(s.start_km + s.end_km) / 2 for s in self.crossing_stations]
+        
         logger.info(f"📊 Rete analizzata: {len(track_sections)} sezioni")
         logger.info(f"   Singolo binario: {len(self.single_track_sections)} sezioni")
         logger.info(f"   Stazioni incrocio: {len(self.crossing_stations)}")
@@ -123,7 +300,8 @@ class OppositeTrainScheduler:
         time_window_start: datetime,
         time_window_end: datetime,
         frequency_minutes: int = 60,
-        existing_traffic: Optional[List[ExistingTrain]] = None
+        existing_traffic: Optional[List[ExistingTrain]] = None,
+        top_k: int = 10
     ) -> List[ScheduleProposal]:
         """
         Trova orari ottimali per coppia di treni in senso opposto.
@@ -135,6 +313,7 @@ class OppositeTrainScheduler:
             time_window_end: Fine finestra temporale
             frequency_minutes: Frequenza indicativa servizio
             existing_traffic: Traffico già presente sulla linea
+            top_k: Numero massimo di proposte restituite
             
         Returns:
             Lista di proposte ordinate per qualità (migliore prima)
@@ -142,55 +321,163 @@ class OppositeTrainScheduler:
         if train1.direction == train2.direction:
             raise ValueError("I due treni devono avere direzioni opposte!")
         
-        logger.info("🚂 OTTIMIZZAZIONE ORARI TRENI OPPOSTI")
-        logger.info(f"   Treno 1: {train1.train_id} {train1.direction}")
-        logger.info(f"   Treno 2: {train2.train_id} {train2.direction}")
-        logger.info(f"   Finestra: {time_window_start} - {time_window_end}")
-        logger.info(f"   Frequenza: {frequency_minutes} min")
+        if existing_traffic:
+            return self._search_schedule(
+                train1, train2, time_window_start, time_window_end,
+                frequency_minutes, existing_traffic, top_k
+            )
         
-        existing_traffic = existing_traffic or []
-        proposals = []
+        # Senza traffico esistente il risultato dipende solo da input immutabili
+        return list(_cached_schedule(
+            _NetworkKey(self), train1, train2, time_window_start, time_window_end,
+            frequency_minutes, top_k
+        ))
+    
+    def find_optimal_schedule_batch(
+        self,
+        problems: List[ScheduleProblem]
+    ) -> List[List[ScheduleProposal]]:
+        """
+        Risolve più coppie di treni sulla stessa rete con un solo kernel.
+        
+        Equivale a chiamare find_optimal_schedule su ogni problema, ma
+        senza passare dalla cache delle ricerche.
+        
+        Returns:
+            Per ogni problema, le proposte ordinate per qualità
+        """
+        for problem in problems:
+            if problem.train1.direction == problem.train2.direction:
+                raise ValueError("I due treni devono avere direzioni opposte!")
+        
+        return self._search_schedules(problems)
+    
+    def _search_schedule(
+        self,
+        train1: TrainPath,
+        train2: TrainPath,
+        time_window_start: datetime,
+        time_window_end: datetime,
+        frequency_minutes: int,
+        existing_traffic: List[ExistingTrain],
+        top_k: int = 10
+    ) -> List[ScheduleProposal]:
+        """Ricerca esaustiva sulle combinazioni di slot (vedi find_optimal_schedule)."""
+        return self._search_schedules([ScheduleProblem(
+            train1, train2, time_window_start, time_window_end,
+            frequency_minutes, existing_traffic, top_k
+        )])[0]
+    
+    def _search_schedules(
+        self,
+        problems: List[ScheduleProblem]
+    ) -> List[List[ScheduleProposal]]:
+        """Ricerca esaustiva per più problemi in una sola chiamata al kernel."""
+        if not problems:
+            return []
         
         # Genera combinazioni di orari possibili
-        time_slots = self._generate_time_slots(
-            time_window_start, 
-            time_window_end, 
-            frequency_minutes
+        slots_per_problem = []
+        for problem in problems:
+            logger.info("🚂 OTTIMIZZAZIONE ORARI TRENI OPPOSTI")
+            logger.info(f"   Treno 1: {problem.train1.train_id} {problem.train1.direction}")
+            logger.info(f"   Treno 2: {problem.train2.train_id} {problem.train2.direction}")
+            logger.info(f"   Finestra: {problem.time_window_start} - {problem.time_window_end}")
+            logger.info(f"   Frequenza: {problem.frequency_minutes} min")
+            
+            time_slots = self._generate_time_slots(
+                problem.time_window_start, 
+                problem.time_window_end, 
+                problem.frequency_minutes
+            )
+            
+            logger.info(f"   Slot temporali da testare: {len(time_slots)}")
+            slots_per_problem.append(time_slots)
+        
+        # Slot impilati [B, N], righe più corte riempite in coda
+        num_slots = np.array([len(slots) for slots in slots_per_problem], dtype=np.int64)
+        departures = np.zeros((len(problems), num_slots.max()), dtype=np.int64)
+        for b, (problem, time_slots) in enumerate(zip(problems, slots_per_problem)):
+            departures[b, :len(time_slots)] = [
+                (slot - problem.time_window_start) // _MICROSECOND for slot in time_slots
+            ]
+        
+        # Profilo di marcia simulato una volta per treno, il kernel lo trasla
+        # su ogni combinazione di slot
+        profiles1 = [np.stack(arrays) for arrays in
+                     zip(*(self._train_profile(problem.train1) for problem in problems))]
+        profiles2 = [np.stack(arrays) for arrays in
+                     zip(*(self._train_profile(problem.train2) for problem in problems))]
+        
+        scores = _score_schedule(
+            departures, num_slots, *profiles1, *profiles2, _MIN_DEPARTURE_GAP_US
         )
         
-        logger.info(f"   Slot temporali da testare: {len(time_slots)}")
-        
-        # Testa ogni combinazione
-        for i, slot1 in enumerate(time_slots):
-            for j, slot2 in enumerate(time_slots):
-                # Evita slot troppo vicini (almeno 5 minuti di gap)
-                if abs((slot2 - slot1).total_seconds()) < 300:
-                    continue
-                
-                # Crea percorsi con orari proposti
-                test_train1 = self._create_test_train(train1, slot1)
-                test_train2 = self._create_test_train(train2, slot2)
-                
-                # Valuta questa combinazione
-                proposal = self._evaluate_schedule(
-                    test_train1, 
-                    test_train2, 
-                    existing_traffic
-                )
-                
-                if proposal:
-                    proposals.append(proposal)
-        
-        # Ordina per qualità (meno ritardo totale, più confidence)
-        proposals.sort(key=lambda p: (p.total_delay_minutes, -p.confidence))
+        return [
+            self._collect_proposals(problem, time_slots, departures.shape[1],
+                                    *(array[b] for array in scores))
+            for b, (problem, time_slots) in enumerate(zip(problems, slots_per_problem))
+        ]
+    
+    def _collect_proposals(
+        self,
+        problem: ScheduleProblem,
+        time_slots: List[datetime],
+        row_length: int,
+        status: np.ndarray,
+        num_conflicts: np.ndarray,
+        station: np.ndarray,
+        crossing_us: np.ndarray,
+        wait1: np.ndarray,
+        wait2: np.ndarray
+    ) -> List[ScheduleProposal]:
+        """Trasforma gli esiti del kernel per un problema in proposte ordinate."""
+        proposals = []
+        for p in np.flatnonzero(status >= 0).tolist():
+            slot1 = time_slots[p // row_length]
+            slot2 = time_slots[p % row_length]
+            
+            if status[p] == 0:
+                # Nessun conflitto: orari perfetti!
+                proposals.append(ScheduleProposal(
+                    train1_departure=slot1,
+                    train2_departure=slot2,
+                    crossing_point_km=-1,
+                    crossing_time=slot1,
+                    train1_wait_minutes=0.0,
+                    train2_wait_minutes=0.0,
+                    total_delay_minutes=0.0,
+                    conflicts_avoided=0,
+                    confidence=1.0,
+                    reasoning="Nessun conflitto: percorsi completamente separati temporalmente"
+                ))
+                continue
+            
+            proposals.append(self._build_proposal(
+                problem.train1, problem.train2, slot1, slot2,
+                crossing_km=self._crossing_kms[station[p]],
+                crossing_time=problem.time_window_start + timedelta(microseconds=int(crossing_us[p])),
+                wait1=float(wait1[p]),
+                wait2=float(wait2[p]),
+                conflicts=int(num_conflicts[p]),
+                existing_traffic=problem.existing_traffic or []
+            ))
         
         logger.info(f"✅ Trovate {len(proposals)} proposte valide")
-        if proposals:
-            best = proposals[0]
+        
+        # Migliori top_k per qualità (meno ritardo totale, più confidence):
+        # stesso ordine di sorted()[:top_k] senza ordinare tutte le proposte
+        best_proposals = heapq.nsmallest(
+            problem.top_k, proposals,
+            key=lambda p: (p.total_delay_minutes, -p.confidence)
+        )
+        
+        if best_proposals:
+            best = best_proposals[0]
             logger.info(f"   Migliore: ritardo {best.total_delay_minutes:.1f} min, "
                        f"incrocio km {best.crossing_point_km:.1f}")
         
-        return proposals[:10]  # Top 10
+        return best_proposals
     
     def _generate_time_slots(
         self, 
@@ -208,90 +495,81 @@ class OppositeTrainScheduler:
         
         return slots
     
-    def _create_test_train(self, template: TrainPath, departure: datetime) -> TrainPath:
-        """Crea treno test con orario specifico."""
-        return TrainPath(
-            train_id=template.train_id,
-            direction=template.direction,
-            start_km=template.start_km,
-            end_km=template.end_km,
-            avg_speed_kmh=template.avg_speed_kmh,
-            departure_time=departure,
-            stops=template.stops,
-            priority=template.priority
-        )
-    
-    def _evaluate_schedule(
+    def _train_profile(
         self,
-        train1: TrainPath,
-        train2: TrainPath,
-        existing_traffic: List[ExistingTrain]
-    ) -> Optional[ScheduleProposal]:
+        train: TrainPath
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
-        Valuta una combinazione di orari.
+        Passaggi del treno relativi alla sua partenza, in microsecondi.
+        
+        Il profilo non dipende dall'orario di partenza: spostare la partenza
+        trasla tutti i passaggi della stessa quantità.
         
         Returns:
-            ScheduleProposal se valida, None se impossibile
+            (per sezione a binario singolo: attraversata, primo e ultimo passaggio;
+             per stazione di incrocio: arrivo definito, orario di arrivo)
         """
-        # 1. Simula movimento treni
-        train1_timeline = self._simulate_train_movement(train1)
-        train2_timeline = self._simulate_train_movement(train2)
-        
-        # 2. Trova punti di conflitto su singolo binario
-        conflicts = self._find_conflicts_on_single_track(
-            train1_timeline, 
-            train2_timeline
-        )
-        
-        if not conflicts:
-            # Nessun conflitto: orari perfetti!
-            return ScheduleProposal(
-                train1_departure=train1.departure_time,
-                train2_departure=train2.departure_time,
-                crossing_point_km=-1,
-                crossing_time=train1.departure_time,
-                train1_wait_minutes=0.0,
-                train2_wait_minutes=0.0,
-                total_delay_minutes=0.0,
-                conflicts_avoided=0,
-                confidence=1.0,
-                reasoning="Nessun conflitto: percorsi completamente separati temporalmente"
-            )
-        
-        # 3. Trova punto di incrocio ottimale
-        crossing = self._find_optimal_crossing_point(train1_timeline, train2_timeline)
-        
-        if not crossing:
-            return None  # Impossibile risolvere
-        
-        crossing_km, crossing_time, wait1, wait2 = crossing
-        
-        # 4. Verifica conflitti con traffico esistente
-        conflicts_with_traffic = self._check_conflicts_with_traffic(
-            train1_timeline,
-            train2_timeline,
-            existing_traffic
-        )
+        timeline = self._simulate_train_movement(train)
+        origin = train.departure_time
+        kms, offsets = _timeline_to_arrays(timeline, origin)
+        
+        # Sezioni a binario singolo [S] contro punti della timeline [K]
+        inside = ((kms >= self._single_soa['start'][:, None]) &
+                  (kms <= self._single_soa['end'][:, None]))  # [S, K]
+        enters = inside.any(axis=1)
+        first = np.where(inside, offsets, np.iinfo(np.int64).max).min(axis=1)
+        last = np.where(inside, offsets, np.iinfo(np.int64).min).max(axis=1)
+        
+        # Arrivo alle stazioni di incrocio [C]
+        num_stations = len(self._crossing_kms)
+        reach = np.zeros(num_stations, dtype=np.bool_)
+        arrival = np.zeros(num_stations, dtype=np.int64)
+        for c, station_km in enumerate(self._crossing_kms):
+            arrival_time = self._interpolate_arrival_time(timeline, station_km)
+            if arrival_time is not None:
+                reach[c] = True
+                arrival[c] = (arrival_time - origin) // _MICROSECOND
+        
+        return (enters,
+                np.where(enters, first, 0),
+                np.where(enters, last, 0),
+                reach,
+                arrival)
+    
+    def _build_proposal(
+        self,
+        train1: TrainPath,
+        train2: TrainPath,
+        departure1: datetime,
+        departure2: datetime,
+        crossing_km: float,
+        crossing_time: datetime,
+        wait1: float,
+        wait2: float,
+        conflicts: int,
+        existing_traffic: List[ExistingTrain]
+    ) -> ScheduleProposal:
+        """Completa una combinazione con incrocio trovato dal kernel."""
+        # Verifica conflitti con traffico esistente
+        conflicts_with_traffic = self._check_conflicts_with_traffic(existing_traffic)
         
-        # 5. Calcola confidence
         confidence = self._calculate_confidence(
             wait1, wait2, conflicts_with_traffic, crossing_km
         )
         
-        # 6. Genera reasoning
         reasoning = self._generate_reasoning(
             train1, train2, crossing_km, wait1, wait2, conflicts_with_traffic
         )
         
         return ScheduleProposal(
-            train1_departure=train1.departure_time,
-            train2_departure=train2.departure_time,
+            train1_departure=departure1,
+            train2_departure=departure2,
             crossing_point_km=crossing_km,
             crossing_time=crossing_time,
             train1_wait_minutes=wait1,
             train2_wait_minutes=wait2,
             total_delay_minutes=wait1 + wait2,
-            conflicts_avoided=len(conflicts),
+            conflicts_avoided=conflicts,
             confidence=confidence,
             reasoning=reasoning
         )
@@ -356,89 +634,6 @@ class OppositeTrainScheduler:
         
         return timeline
     
-    def _find_conflicts_on_single_track(
-        self,
-        train1_timeline: Dict[float, datetime],
-        train2_timeline: Dict[float, datetime]
-    ) -> List[Tuple[float, float]]:
-        """
-        Trova conflitti su sezioni a singolo binario.
-        
-        Returns:
-            Lista di (start_km, end_km) sezioni in conflitto
-        """
-        conflicts = []
-        
-        for section in self.single_track_sections:
-            # Verifica se entrambi i treni attraversano questa sezione
-            train1_enters = any(section.start_km <= km <= section.end_km for km in train1_timeline.keys())
-            train2_enters = any(section.start_km <= km <= section.end_km for km in train2_timeline.keys())
-            
-            if train1_enters and train2_enters:
-                # Trova orari ingresso/uscita
-                train1_times = [t for km, t in train1_timeline.items() 
-                               if section.start_km <= km <= section.end_km]
-                train2_times = [t for km, t in train2_timeline.items() 
-                               if section.start_km <= km <= section.end_km]
-                
-                if train1_times and train2_times:
-                    # Verifica sovrapposizione temporale
-                    train1_min, train1_max = min(train1_times), max(train1_times)
-                    train2_min, train2_max = min(train2_times), max(train2_times)
-                    
-                    # Conflitto se finestre temporali si sovrappongono
-                    if not (train1_max < train2_min or train2_max < train1_min):
-                        conflicts.append((section.start_km, section.end_km))
-        
-        return conflicts
-    
-    def _find_optimal_crossing_point(
-        self,
-        train1_timeline: Dict[float, datetime],
-        train2_timeline: Dict[float, datetime]
-    ) -> Optional[Tuple[float, datetime, float, float]]:
-        """
-        Trova punto e tempo ottimale per incrocio.
-        
-        Returns:
-            (crossing_km, crossing_time, wait_train1_min, wait_train2_min) o None
-        """
-        best_crossing = None
-        min_total_wait = float('inf')
-        
-        # Prova ogni stazione di incrocio
-        for station in self.crossing_stations:
-            station_km = (station.start_km + station.end_km) / 2
-            
-            # Trova quando ciascun treno arriverebbe
-            train1_arrival = self._interpolate_arrival_time(train1_timeline, station_km)
-            train2_arrival = self._interpolate_arrival_time(train2_timeline, station_km)
-            
-            if train1_arrival and train2_arrival:
-                # Calcola attese necessarie
-                time_diff = (train2_arrival - train1_arrival).total_seconds() / 60.0
-                
-                if time_diff > 0:
-                    # Train1 arriva prima, deve aspettare train2
-                    wait1 = abs(time_diff)
-                    wait2 = 0
-                    crossing_time = train2_arrival
-                else:
-                    # Train2 arriva prima, deve aspettare train1
-                    wait1 = 0
-                    wait2 = abs(time_diff)
-                    crossing_time = train1_arrival
-                
-                total_wait = wait1 + wait2
-                
-                # Penalizza attese molto lunghe
-                if total_wait < 30:  # Max 30 minuti attesa ragionevole
-                    if total_wait < min_total_wait:
-                        min_total_wait = total_wait
-                        best_crossing = (station_km, crossing_time, wait1, wait2)
-        
-        return best_crossing
-    
     def _interpolate_arrival_time(
         self, 
         timeline: Dict[float, datetime], 
@@ -476,8 +671,6 @@ class OppositeTrainScheduler:
     
     def _check_conflicts_with_traffic(
         self,
-        train1_timeline: Dict[float, datetime],
-        train2_timeline: Dict[float, datetime],
         existing_traffic: List[ExistingTrain]
     ) -> int:
         """Conta conflitti con traffico esistente."""
@@ -551,6 +744,47 @@ class OppositeTrainScheduler:
         return ". ".join(parts) + "."
 
 
+class _NetworkKey:
+    """
+    Chiave della cache delle ricerche: uguale per scheduler sulla stessa rete.
+    
+    Confronta solo _sections_key, così l'uguaglianza degli scheduler resta
+    quella di default.
+    """
+    __slots__ = ('scheduler',)
+    
+    def __init__(self, scheduler: OppositeTrainScheduler):
+        self.scheduler = scheduler
+    
+    def __eq__(self, other):
+        if not isinstance(other, _NetworkKey):
+            return NotImplemented
+        return self.scheduler._sections_key == other.scheduler._sections_key
+    
+    def __hash__(self):
+        return hash(self.scheduler._sections_key)
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_schedule(
+    network: _NetworkKey,
+    train1: TrainPath,
+    train2: TrainPath,
+    time_window_start: datetime,
+    time_window_end: datetime,
+    frequency_minutes: int,
+    top_k: int
+) -> Tuple[ScheduleProposal, ...]:
+    """
+    Ricerca memoizzata tra istanze diverse sulla stessa rete.
+    
+    Le proposte (immutabili) sono condivise tra le chiamate con gli
+    stessi argomenti.
+    """
+    return tuple(network.scheduler._search_schedule(
+        train1, train2, time_window_start, time_window_end, frequency_minutes, [], top_k
+    ))
+
 def demo_opposite_train_scheduler():
     """Demo funzionalità."""
     print("\n" + "="*70)
@@ -0,0 +1,50 @@
+"""
+Salvataggio checkpoint in background.
+
+La scrittura su disco avviene su un thread separato mentre il training
+prosegue; il checkpoint viene prima copiato in RAM, così i pesi che
+continuano ad aggiornarsi non finiscono a metà nel file.
+"""
+
+import threading
+
+import torch
+
+
+def snapshot_to_cpu(obj):
+    """Copia ricorsiva su CPU dei tensori in dict/list/tuple (state_dict inclusi)."""
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to('cpu', copy=True)
+    if isinstance(obj, dict):
+        return {k: snapshot_to_cpu(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(snapshot_to_cpu(v) for v in obj)
+    return obj
+
+
+class AsyncCheckpointer:
+    """
+    Scrive i checkpoint con torch.save su un thread in background.
+    
+    Un solo salvataggio alla volta: un nuovo save() attende quello in
+    corso, così un disco lento non accumula thread. Chiamare wait()
+    prima di uscire per non perdere l'ultimo checkpoint.
+    """
+    
+    def __init__(self):
+        self._thread = None
+    
+    def save(self, checkpoint, path):
+        """Copia checkpoint su CPU e avvia la scrittura su path."""
+        self.wait()
+        cpu_checkpoint = snapshot_to_cpu(checkpoint)
+        self._thread = threading.Thread(
+            target=torch.save, args=(cpu_checkpoint, path), daemon=True
+        )
+        self._thread.start()
+    
+    def wait(self):
+        """Attende la fine dell'eventuale scrittura in corso."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
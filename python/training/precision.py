@@ -0,0 +1,40 @@
+"""
+Selezione della precisione di training: FP32, oppure autocast FP16/BF16.
+
+FP16 richiede il GradScaler; BF16 (GPU Ampere+) ha lo stesso range
+esponenziale di FP32 e non ne ha bisogno.
+"""
+
+import warnings
+
+import torch
+
+PRECISION_DTYPES = {
+    'fp32': torch.float32,
+    'fp16': torch.float16,
+    'bf16': torch.bfloat16,
+}
+
+
+def add_precision_argument(parser):
+    """Aggiunge --precision {bf16,fp16,fp32} a un ArgumentParser."""
+    parser.add_argument('--precision', choices=sorted(PRECISION_DTYPES), default=None,
+                        help="Precisione di training (default: fp16 su CUDA, fp32 altrove)")
+
+
+def resolve_amp_dtype(precision, device):
+    """
+    dtype di autocast per la precisione richiesta, None se si resta in FP32.
+    
+    L'autocast è usato solo su CUDA. Se la GPU non supporta BF16 si
+    ripiega su FP16.
+    """
+    if device.type != 'cuda':
+        return None
+    dtype = PRECISION_DTYPES[precision or 'fp16']
+    if dtype == torch.float32:
+        return None
+    if dtype == torch.bfloat16 and not torch.cuda.is_bf16_supported():
+        warnings.warn("BF16 non supportato da questa GPU, uso FP16")
+        return torch.float16
+    return dtype
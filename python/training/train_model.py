@@ -83,8 +83,16 @@ def create_targets(batch, model):
     }
 
 
-def train_epoch(model, dataloader, optimizer, device, epoch):
-    """Training per una epoch."""
+def train_epoch(model, dataloader, optimizer, device, epoch, scaler=None, amp_dtype=None):
+    """
+    Training per una epoch.
+    
+    Con amp_dtype (torch.float16 o torch.bfloat16) forward e loss girano
+    in autocast; uno scaler (torch.cuda.amp.GradScaler) abilitato scala
+    la loss nel backward, necessario solo in FP16.
+    """
+    use_amp = amp_dtype is not None
+    use_scaler = scaler is not None and scaler.is_enabled()
     model.train()
     total_loss = 0
     total_batches = 0
@@ -97,24 +105,34 @@ def train_epoch(model, dataloader, optimizer, device, epoch):
         train_states = batch['train_states'].to(device)
         conflict_matrix = batch['conflict_matrix'].to(device)
         
-        # Forward pass
-        predictions = model(network_state, train_states)
-        
         # Crea targets
         targets = create_targets(batch, model)
         targets = {k: v.to(device) for k, v in targets.items()}
         
-        # Calcola loss
-        loss, loss_dict = model.compute_loss(predictions, targets, conflict_matrix)
+        with torch.autocast(device_type=device.type, dtype=amp_dtype or torch.float16, enabled=use_amp):
+            # Forward pass
+            predictions = model(network_state, train_states)
+            
+            # Calcola loss
+            loss, loss_dict = model.compute_loss(predictions, targets, conflict_matrix)
         
         # Backward pass
-        optimizer.zero_grad()
-        loss.backward()
+        optimizer.zero_grad(set_to_none=True)
+        if use_scaler:
+            scaler.scale(loss).backward()
+            # Riporta i gradienti in scala reale prima del clipping
+            scaler.unscale_(optimizer)
+        else:
+            loss.backward()
         
         # Gradient clipping per stabilità
         torch.nn.utils.clip_grad_norm_(model.parameters(), max_norm=1.0)
         
-        optimizer.step()
+        if use_scaler:
+            scaler.step(optimizer)
+            scaler.update()
+        else:
+            optimizer.step()
         
         # Accumula metriche
         total_loss += loss.item()
@@ -134,25 +152,27 @@ def train_epoch(model, dataloader, optimizer, device, epoch):
     return avg_loss, avg_components
 
 
-def validate(model, dataloader, device):
-    """Validazione del modello."""
+def validate(model, dataloader, device, amp_dtype=None):
+    """Validazione del modello (con amp_dtype: forward in autocast)."""
     model.eval()
     total_loss = 0
     total_batches = 0
     
     loss_components = {'time': 0, 'track': 0, 'conflict': 0}
     
-    with torch.no_grad():
+    with torch.inference_mode():
         for batch in dataloader:
             network_state = batch['network_state'].to(device)
             train_states = batch['train_states'].to(device)
             conflict_matrix = batch['conflict_matrix'].to(device)
             
-            predictions = model(network_state, train_states)
             targets = create_targets(batch, model)
             targets = {k: v.to(device) for k, v in targets.items()}
             
-            loss, loss_dict = model.compute_loss(predictions, targets, conflict_matrix)
+            with torch.autocast(device_type=device.type, dtype=amp_dtype or torch.float16,
+                                enabled=amp_dtype is not None):
+                predictions = model(network_state, train_states)
+                loss, loss_dict = model.compute_loss(predictions, targets, conflict_matrix)
             
             total_loss += loss.item()
             total_batches += 1
@@ -204,7 +224,8 @@ def train_model(config: dict):
         num_stations=config['num_stations']
     ).to(device)
     
-    print(f"Modello inizializzato: {sum(p.numel() for p in model.parameters())} parametri")
+    num_parameters = sum(p.numel() for p in model.parameters())
+    print(f"Modello inizializzato: {num_parameters} parametri")
     
     # Optimizer e scheduler
     optimizer = optim.AdamW(
@@ -270,7 +291,8 @@ def train_model(config: dict):
                 'model_state_dict': model.state_dict(),
                 'optimizer_state_dict': optimizer.state_dict(),
                 'val_loss': val_loss,
-                'config': config
+                'config': config,
+                'num_parameters': num_parameters
             }
             torch.save(checkpoint, config['checkpoint_path'])
             print(f"✓ Nuovo best model salvato (val_loss: {val_loss:.4f})")
@@ -195,7 +195,8 @@ def train_supervised(
                     'num_trains': 50,
                     'num_tracks': 50,
                     'num_stations': 30
-                }
+                },
+                'num_parameters': params
             }, output_path)
             marker = " 💾"
         
@@ -67,6 +67,21 @@ class TestRailwayNetworkGenerator:
             assert 0 <= t1_id < len(scenario['trains'])
             assert 0 <= t2_id < len(scenario['trains'])
     
+    def test_scenario_array_views(self):
+        """Test viste NumPy di conflitti e treni."""
+        generator = RailwayNetworkGenerator(num_stations=5, num_tracks=6, single_track_ratio=1.0)
+        scenario = generator.generate_scenario(num_trains=10, conflict_probability=0.8)
+        
+        # Le coppie in array coincidono con la lista di conflitti
+        assert scenario['conflict_pairs'].shape == (len(scenario['conflicts']), 2)
+        assert [tuple(p) for p in scenario['conflict_pairs'].tolist()] == scenario['conflicts']
+        
+        assert scenario['train_tracks'].tolist() == [t.current_track for t in scenario['trains']]
+        assert scenario['train_priorities'].tolist() == [t.priority for t in scenario['trains']]
+        assert scenario['train_positions'].tolist() == [t.position_km for t in scenario['trains']]
+        assert scenario['train_delayed'].tolist() == [t.is_delayed for t in scenario['trains']]
+        assert generator.track_is_single.tolist() == [t.is_single_track for t in generator.tracks]
+        
     def test_network_state_encoding(self):
         """Test encoding dello stato della rete."""
         generator = RailwayNetworkGenerator(num_stations=5, num_tracks=10)
@@ -129,6 +144,26 @@ class TestRailwayNetworkGenerator:
         # Verifica nessun conflitto su altri
         assert matrix[0, 2] == 0.0
 
+    
+    def test_conflict_stats(self):
+        """Test statistiche dei conflitti sulle viste NumPy."""
+        from data.scenario_stats import conflict_stats
+        
+        priorities = np.array([3, 8, 5, 5], dtype=np.int8)
+        train_tracks = np.array([0, 0, 1, 1], dtype=np.int32)
+        track_is_single = np.array([True, False])
+        positions = np.array([10.0, 14.0, 20.0, 21.0])
+        conflict_pairs = np.array([[0, 1], [2, 3]], dtype=np.int32)
+        
+        critical, delay_low, delay_high, mean_distance = conflict_stats(
+            priorities, train_tracks, track_is_single, positions, conflict_pairs
+        )
+        
+        assert critical == 1
+        assert delay_low == 10   # Treno 0 cede (priorità 3 < 8)
+        assert delay_high == 10  # Parità: cede il secondo
+        assert mean_distance == pytest.approx(2.5)
+
 
 class TestDatasetGeneration:
     """Test per generazione dataset."""